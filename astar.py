@@ -1,5 +1,7 @@
 import heapq
 import math
+import numpy as np
+from search_counters import SearchCounters
 
 def octile_distance(a, b):
     """
@@ -55,19 +57,54 @@ class AStar:
         heuristic (function): Heuristiikkafunktio etäisyyden arvioimiseen
         rows (int): Ruudukon rivien määrä
         cols (int): Ruudukon sarakkeiden määrä
+        cost_grid (numpy.ndarray or None): Solujen läpikulkukustannukset tai None
+        min_cost (float): Pienin läpikulkukustannus, jolla heuristiikka skaalataan
+        goal_bounds (GoalBounds or None): Goal bounding -taulukko seuraajien karsintaan
+        dead_ends (DeadEndIndex or None): Umpikuja-alueiden indeksi solujen karsintaan
+        g_score_size (int): Viimeisimmän haun g-arvotaulun koko muistinkäytön mittaamista varten
+        open_set_peak (int): Viimeisimmän haun avoimen joukon (keon) suurin koko
+        counters (SearchCounters or None): Viimeisimmän haun laskurit, tai None jos
+            instrumentointi ei ole käytössä
     """
-    def __init__(self, grid, heuristic=octile_distance):
+    def __init__(self, grid, heuristic=octile_distance, cost_grid=None, goal_bounds=None,
+                 dead_ends=None, instrument=False):
         """
         Alustaa A* algoritmin.
         
+        Kun kustannusruudukko annetaan, siirtymän hinta kerrotaan kohdesolun
+        kustannuksella ja heuristiikka kerrotaan pienimmällä kustannuksella,
+        jotta se pysyy hyväksyttävänä.
+        
         Args:
             grid (list): 2D lista joka esittää ruudukkoa (0 = vapaa, 1 = este)
             heuristic (function, optional): Heuristiikkafunktio. Oletuksena octile_distance.
+            cost_grid (numpy.ndarray, optional): Solujen läpikulkukustannukset,
+                ks. map_loader.map_to_cost_grid. Oletuksena kaikki vapaat solut maksavat 1.
+            goal_bounds (GoalBounds, optional): Goal bounding -taulukko, ks. goal_bounding.
+                Taulukko olettaa tasaiset kustannukset, joten sitä ei käytetä yhdessä
+                kustannusruudukon kanssa.
+            dead_ends (DeadEndIndex, optional): Umpikuja-alueiden indeksi, ks. dead_ends.
+            instrument (bool, optional): Kerätäänkö hauista laskurit, ks. search_counters.
         """
         self.grid = grid
         self.heuristic = heuristic
         self.rows = len(grid)
         self.cols = len(grid[0])
+        self.cost_grid = cost_grid
+        self.goal_bounds = goal_bounds
+        self.dead_ends = dead_ends
+        self.min_cost = 1.0
+        self.g_score_size = 0
+        self.open_set_peak = 0
+        self.counters = SearchCounters() if instrument else None
+        self._heuristic = heuristic
+
+        if cost_grid is not None:
+            passable = cost_grid[np.isfinite(cost_grid)]
+            self.min_cost = float(passable.min()) if passable.size else 1.0
+            if self.min_cost != 1.0:
+                min_cost = self.min_cost
+                self._heuristic = lambda a, b: min_cost * heuristic(a, b)
 
     def find_path(self, start, goal):
         """
@@ -85,13 +122,21 @@ class AStar:
                 - path (list or None): Lista solmuista jotka muodostavat reitin,
                   tai None jos reittiä ei löydy
                 - closed_set (set): Joukko tutkituista solmuista
-                - nodes_added (int): Avoimeen joukkoon lisättyjen solmujen määrä
+                - nodes_added (int): Avoimeen joukkoon lisättyjen solmujen määrä,
+                  sama kuin counters.heap_pushes
         """
         g_scores = {start: 0}
+        counters = self.counters
+        if counters is not None:
+            counters.reset()
 
         # lasketaan heuristinen etäisyys aloitussolmusta maalisolmuun
 
-        f_scores = {start: self.heuristic(start, goal)}
+        heuristic = self._heuristic
+        cost_grid = self.cost_grid
+        goal_bounds = self.goal_bounds
+        allowed = self.dead_ends.query_filter(start, goal) if self.dead_ends is not None else None
+        f_scores = {start: heuristic(start, goal)}
 
         # edellinen solmu, josta on tultu nykyiseen solmuun, tätä käytetään reitin jäljittämiseen
 
@@ -103,6 +148,7 @@ class AStar:
 
         open_set = [(f_scores[start], start)]
         nodes_added = 1  # Aloitussolmu lisätään heti
+        open_peak = 1
 
 
         # kunnes löydetään maalisolmu tai jono on tyhjentynyt
@@ -117,6 +163,10 @@ class AStar:
                     path.append(current)
                     current = came_from[current]
                 path.append(start)
+                self.g_score_size = len(g_scores)
+                self.open_set_peak = open_peak
+                if counters is not None:
+                    self._count(counters, closed_set, open_set, nodes_added, True)
                 return path[::-1], closed_set, nodes_added
             
             # lisätään nykyinen solmu suljettuun joukkoon
@@ -125,18 +175,51 @@ class AStar:
 
             # käydään läpi kaikki naapurisolmut
 
-            for neighbor in get_neighbors(current, self.grid):
+            neighbors = get_neighbors(current, self.grid)
+            if counters is not None:
+                counters.neighbor_checks += len(neighbors)
+            for neighbor in neighbors:
                 if neighbor in closed_set:
                     continue
+                # Ohitetaan suunnat, joihin yksikään optimaalinen reitti maaliin ei lähde
+                if goal_bounds is not None and not goal_bounds.allows(
+                        current, (neighbor[0] - current[0], neighbor[1] - current[1]), goal):
+                    continue
+                # Ohitetaan umpikuja-alueet, joissa ei ole lähtö- eikä maalisolmua
+                if allowed is not None and not allowed(neighbor):
+                    continue
                 # Lasketaan etäisyys (1 tai √2)
-                tentative_g = g_scores[current] + (
-                    math.sqrt(2) if abs(neighbor[0] - current[0]) + abs(neighbor[1] - current[1]) == 2 else 1
-                )
+                step = math.sqrt(2) if abs(neighbor[0] - current[0]) + abs(neighbor[1] - current[1]) == 2 else 1
+                if cost_grid is not None:
+                    # Painotettu siirtymä: hinta kerrotaan kohdesolun kustannuksella
+                    step *= cost_grid.item(neighbor[0], neighbor[1])
+                tentative_g = g_scores[current] + step
                 if neighbor not in g_scores or tentative_g < g_scores[neighbor]:
                     came_from[neighbor] = current
                     g_scores[neighbor] = tentative_g
-                    f_scores[neighbor] = tentative_g + self.heuristic(neighbor, goal)
+                    f_scores[neighbor] = tentative_g + heuristic(neighbor, goal)
                     heapq.heappush(open_set, (f_scores[neighbor], neighbor))
                     nodes_added += 1
+            # Keko kasvaa vain lisäyksissä, joten huippu nähdään laajennuksen jälkeen
+            if len(open_set) > open_peak:
+                open_peak = len(open_set)
+
+        self.g_score_size = len(g_scores)
+        self.open_set_peak = open_peak
+        if counters is not None:
+            self._count(counters, closed_set, open_set, nodes_added, False)
+        return None, closed_set, nodes_added
+
+    @staticmethod
+    def _count(counters, closed_set, open_set, nodes_added, found):
+        """
+        Johtaa keon laskurit haun lopputilasta.
 
-        return None, closed_set, nodes_added
\ No newline at end of file
+        Jokainen keosta poistettu alkio on joko maali tai laajennetaan.
+        A* ei ohita jo laajennettuja solmuja, joten niiden uudet poistot
+        ovat vanhentuneita poistoja.
+        """
+        counters.heap_pushes = nodes_added
+        counters.heap_pops = nodes_added - len(open_set)
+        counters.expansions = len(closed_set)
+        counters.stale_pops = counters.heap_pops - counters.expansions - found
\ No newline at end of file
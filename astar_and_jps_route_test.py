@@ -3,17 +3,21 @@ import matplotlib.pyplot as plt
 import math
 from astar import AStar
 from jps import JPS  
+from path_result import PathResult
 
 def calculate_path_length(path):
     """
     Laskee reitin todellisen pituuden käyttäen Octile-etäisyyttä.
     
     Args:
-        path: Lista koordinaattipareista [(x1, y1), (x2, y2), ...]
+        path: Lista koordinaattipareista [(x1, y1), (x2, y2), ...] tai PathResult
         
     Returns:
         float: Reitin kokonaispituus
     """
+    # PathResult-olion pituus on laskettu valmiiksi
+    if isinstance(path, PathResult):
+        return path.cost
     if not path or len(path) < 2:
         return 0.0
     
@@ -0,0 +1,479 @@
+"""
+Toistettava suorituskykymittaus reitinhakualgoritmeille.
+
+Yksittäinen time.time()-mittaus ja neljän desimaalin pyöristys antaa
+useimmille kyselyille ajaksi 0.0, eikä ajastimen tarkkuus tai taustakohina
+erotu tuloksista. Tämä moduuli mittaa jokaisen kyselyn perf_counter_ns-
+ajastimella useita kertoja lämmittelyajojen jälkeen, roskienkeruu pois
+päältä, ja raportoi mediaanin, kvartiilivälin (IQR) ja 95. persentiilin
+skenaarioittain ja skenaariotiedoston ryhmittäin. Tulokset voidaan
+tallentaa JSON-muodossa.
+
+Valinnainen muistiprofilointi ajaa jokaisen kyselyn vielä kerran
+tracemalloc-seurannan alla, joten se ei vaikuta aikamittauksiin. Samoin
+hakulaskurit (ks. search_counters) kerätään omalla ylimääräisellä ajolla.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import map_loader as ml
+from astar import AStar
+from jps import JPS
+from path_result import path_cost
+from prefilter import QueryPrefilter
+from search_counters import SearchCounters, sum_counters
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def clear_query_caches(engine):
+    """
+    Tyhjentää algoritmin kyselyjen välillä säilyvät välimuistit.
+
+    JPS:n JumpCache täyttyy hauissa, joten saman kyselyn toistot ilman
+    tyhjennystä mittaavat lämmintä välimuistia ja suosivat JPS:ää muihin
+    algoritmeihin nähden. Esisuodattimen reittivälimuisti ja sen käärimän
+    algoritmin välimuisti tyhjennetään samalla.
+
+    Args:
+        engine: Algoritmi, jolla on find_path(start, goal) -metodi
+    """
+    while engine is not None:
+        if hasattr(engine, "jump_cache"):
+            engine.jump_cache.clear()
+        if isinstance(engine, QueryPrefilter):
+            engine.invalidate()
+        engine = getattr(engine, "engine", None)
+
+
+def time_query(func, warmup=1, repeats=5, disable_gc=True, setup=None):
+    """
+    Mittaa funktiokutsun keston useaan kertaan.
+
+    Args:
+        func (function): Mitattava funktio ilman argumentteja
+        warmup (int, optional): Mittaamattomien lämmittelykutsujen määrä
+        repeats (int, optional): Mitattujen kutsujen määrä
+        disable_gc (bool, optional): Poistetaanko automaattinen roskienkeruu
+            käytöstä mittauksen ajaksi. Roskat kerätään ennen mittausta.
+        setup (function, optional): Funktio ilman argumentteja, joka kutsutaan
+            ennen jokaista kutsua ajanoton ulkopuolella, esim. clear_query_caches
+
+    Returns:
+        tuple: (viimeisen kutsun palautusarvo, kestot nanosekunteina listana)
+    """
+    result = None
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        result = func()
+
+    gc_was_enabled = gc.isenabled()
+    if disable_gc:
+        gc.collect()
+        gc.disable()
+    samples = []
+    try:
+        for _ in range(repeats):
+            if setup is not None:
+                setup()
+            started = time.perf_counter_ns()
+            result = func()
+            samples.append(time.perf_counter_ns() - started)
+    finally:
+        if disable_gc and gc_was_enabled:
+            gc.enable()
+    return result, samples
+
+
+def trace_memory(func):
+    """
+    Mittaa funktiokutsun muistinvarausten huipun tracemalloc-moduulilla.
+
+    Roskat kerätään ennen mittausta ja automaattinen roskienkeruu on pois
+    päältä sen ajan, jotta huippu ei riipu keruun ajoituksesta.
+
+    Args:
+        func (function): Mitattava funktio ilman argumentteja
+
+    Returns:
+        tuple: (kutsun palautusarvo, varausten huippu tavuina kutsun aikana)
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        result = func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        if gc_was_enabled:
+            gc.enable()
+    return result, peak
+
+
+def max_rss():
+    """
+    Palauttaa prosessin muistinkäytön huippuarvon (ru_maxrss) tavuina.
+
+    Returns:
+        int or None: Huippuarvo, tai None jos resource-moduulia ei ole
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux ilmoittaa arvon kilotavuina, macOS tavuina
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def summarize(samples):
+    """
+    Laskee mittausten tilastot.
+
+    Args:
+        samples (list): Kestot nanosekunteina
+
+    Returns:
+        dict: n, median_ns, iqr_ns, p95_ns, min_ns ja mean_ns
+    """
+    if len(samples) == 0:
+        return {"n": 0, "median_ns": None, "iqr_ns": None, "p95_ns": None,
+                "min_ns": None, "mean_ns": None}
+    values = np.asarray(samples, dtype=np.float64)
+    q1, median, q3, p95 = np.percentile(values, [25, 50, 75, 95])
+    return {
+        "n": len(values),
+        "median_ns": float(median),
+        "iqr_ns": float(q3 - q1),
+        "p95_ns": float(p95),
+        "min_ns": float(values.min()),
+        "mean_ns": float(values.mean()),
+    }
+
+
+class BenchmarkRunner:
+    """
+    Ajaa algoritmit skenaarioilla ja kokoaa tilastot.
+
+    Algoritmit annetaan valmiina olioina, joten niiden hakujen välillä
+    säilyvät välimuistit (esim. JPS:n hyppyvälimuisti) täyttyisivät
+    lämmittelyajoissa. Oletuksena välimuistit tyhjennetään ennen jokaista
+    kutsua, ks. clear_query_caches, ja kaikki algoritmit mitataan kylminä.
+
+    Attributes:
+        warmup (int): Lämmittelykutsujen määrä kyselyä kohti
+        repeats (int): Mitattujen kutsujen määrä kyselyä kohti
+        disable_gc (bool): Poistetaanko roskienkeruu käytöstä mittauksen ajaksi
+        cold (bool): Tyhjennetäänkö välimuistit ennen jokaista kutsua
+        profile_memory (bool): Mitataanko kyselyiden muistinkäyttö
+        collect_counters (bool): Kerätäänkö kyselyiden hakulaskurit
+    """
+
+    def __init__(self, warmup=1, repeats=5, disable_gc=True, profile_memory=False,
+                 collect_counters=False, cold=True):
+        """
+        Args:
+            warmup (int, optional): Lämmittelykutsujen määrä
+            repeats (int, optional): Mitattujen kutsujen määrä
+            disable_gc (bool, optional): Roskienkeruun hallinta
+            cold (bool, optional): Mitataanko kylmät kyselyt. False mittaa
+                lämmittelyn täyttämillä välimuisteilla.
+            profile_memory (bool, optional): Ajaa jokaisen kyselyn lisäksi kerran
+                tracemalloc-seurannassa, ks. memory_profile
+            collect_counters (bool, optional): Ajaa jokaisen kyselyn lisäksi kerran
+                laskurit päällä, ks. search_counters
+        """
+        self.warmup = warmup
+        self.repeats = repeats
+        self.disable_gc = disable_gc
+        self.profile_memory = profile_memory
+        self.collect_counters = collect_counters
+        self.cold = cold
+
+    def config(self):
+        """Palauttaa mittausasetukset ja ympäristön tiedot sanakirjana."""
+        return {
+            "warmup": self.warmup,
+            "repeats": self.repeats,
+            "disable_gc": self.disable_gc,
+            "profile_memory": self.profile_memory,
+            "collect_counters": self.collect_counters,
+            "cold": self.cold,
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        }
+
+    def run(self, engines, scenarios, buckets=None):
+        """
+        Mittaa jokaisen algoritmin jokaisella skenaariolla.
+
+        Args:
+            engines (dict): {nimi: algoritmi, jolla on find_path(start, goal) -metodi}
+            scenarios (list): Lista skenaarioita (alku, loppu, optimaalinen_pituus)
+            buckets (list, optional): Skenaarioiden ryhmät, ks. map_loader.load_scenario_buckets.
+                Oletuksena kaikki skenaariot ovat ryhmässä 0.
+
+        Returns:
+            dict: {"config": ..., "scenarios": [...], "buckets": {...}, "engines": {...}}.
+                  Ryhmä- ja algoritmikohtaiset tilastot lasketaan skenaarioiden mediaaneista.
+        """
+        if buckets is None:
+            buckets = [0] * len(scenarios)
+
+        rows = []
+        for index, ((start, goal, optimal_length), bucket) in enumerate(zip(scenarios, buckets)):
+            row = {"index": index, "bucket": int(bucket), "start": list(start),
+                   "goal": list(goal), "optimal": optimal_length, "engines": {}}
+            for name, engine in engines.items():
+                setup = (lambda: clear_query_caches(engine)) if self.cold else None
+                (path, closed_set, count), samples = time_query(
+                    lambda: engine.find_path(start, goal),
+                    self.warmup, self.repeats, self.disable_gc, setup)
+                stats = summarize(samples)
+                stats["length"] = path_cost(path) if path else None
+                stats["expanded"] = len(closed_set)
+                stats["count"] = count
+                if self.profile_memory:
+                    if setup is not None:
+                        setup()
+                    stats.update(self.memory_profile(engine, start, goal))
+                if self.collect_counters:
+                    if setup is not None:
+                        setup()
+                    stats["counters"] = self.search_counters(engine, start, goal)
+                row["engines"][name] = stats
+            rows.append(row)
+
+        return {
+            "config": self.config(),
+            "scenarios": rows,
+            "buckets": {str(bucket): self._aggregate(rows, lambda row, b=bucket: row["bucket"] == b, engines)
+                        for bucket in sorted(set(int(b) for b in buckets))},
+            "engines": self._aggregate(rows, lambda row: True, engines),
+        }
+
+    @staticmethod
+    def memory_profile(engine, start, goal):
+        """
+        Mittaa yhden kyselyn muistinkäytön.
+
+        Args:
+            engine: Algoritmi, jolla on find_path(start, goal) -metodi
+            start (tuple): Aloitussolmu
+            goal (tuple): Maalisolmu
+
+        Returns:
+            dict: peak_bytes (tracemalloc-huippu), closed_set_size,
+                  g_score_size ja open_set_peak (avoimen joukon suurin koko; None,
+                  jos algoritmi ei raportoi niitä) ja bytes_per_expanded (peak_bytes
+                  laajennettua solmua kohti). Prosessin ru_maxrss ei laske kyselyjen
+                  välillä, joten se raportoidaan vain yhteenvedossa, ks. print_memory_table.
+        """
+        (_, closed_set, _), peak = trace_memory(lambda: engine.find_path(start, goal))
+        expanded = len(closed_set)
+        return {
+            "peak_bytes": peak,
+            "closed_set_size": expanded,
+            "g_score_size": getattr(engine, "g_score_size", None),
+            "open_set_peak": getattr(engine, "open_set_peak", None),
+            "bytes_per_expanded": peak / expanded if expanded else None,
+        }
+
+    @staticmethod
+    def search_counters(engine, start, goal):
+        """
+        Ajaa yhden kyselyn hakulaskurit päällä.
+
+        Algoritmin omat laskurit palautetaan ennalleen kyselyn jälkeen.
+
+        Args:
+            engine: Algoritmi, jolla on find_path(start, goal) -metodi
+            start (tuple): Aloitussolmu
+            goal (tuple): Maalisolmu
+
+        Returns:
+            dict or None: SearchCounters.as_dict-muotoiset laskurit, tai None
+                          jos algoritmilla ei ole counters-attribuuttia
+        """
+        if not hasattr(engine, "counters"):
+            return None
+        previous = engine.counters
+        engine.counters = SearchCounters()
+        try:
+            engine.find_path(start, goal)
+            return engine.counters.as_dict()
+        finally:
+            engine.counters = previous
+
+    @staticmethod
+    def _aggregate(rows, include, engines):
+        """Laskee tilastot valittujen skenaarioiden mediaaneista algoritmeittain."""
+        aggregated = {}
+        for name in engines:
+            selected = [row["engines"][name] for row in rows if include(row)]
+            medians = [stats["median_ns"] for stats in selected]
+            aggregated_stats = summarize(medians)
+            aggregated_stats["total_median_ns"] = float(sum(medians))
+            if selected and "peak_bytes" in selected[0]:
+                per_node = [stats["bytes_per_expanded"] for stats in selected
+                            if stats["bytes_per_expanded"] is not None]
+                aggregated_stats["max_peak_bytes"] = max(stats["peak_bytes"] for stats in selected)
+                aggregated_stats["median_bytes_per_expanded"] = (
+                    float(np.median(per_node)) if per_node else None)
+                open_peaks = [stats["open_set_peak"] for stats in selected
+                              if stats["open_set_peak"] is not None]
+                aggregated_stats["max_open_set_peak"] = max(open_peaks) if open_peaks else None
+            if selected and "counters" in selected[0]:
+                counters = [stats["counters"] for stats in selected if stats["counters"] is not None]
+                aggregated_stats["counters"] = sum_counters(counters) if counters else None
+            aggregated[name] = aggregated_stats
+        return aggregated
+
+
+def print_bucket_table(results):
+    """
+    Tulostaa ryhmäkohtaiset mediaaniajat mikrosekunteina.
+
+    Ensimmäinen rivi kertoo, onko mitattu kylmiä vai lämpimiä kyselyitä.
+
+    Args:
+        results (dict): BenchmarkRunner.run-metodin tulos
+    """
+    names = list(results["engines"])
+    if results["config"].get("cold", False):
+        print("Kylmät kyselyt: välimuistit tyhjennetään ennen jokaista ajoa")
+    else:
+        print("Lämpimät kyselyt: lämmittelyajot täyttävät välimuistit")
+    header = f"{'Ryhmä':<7}{'n':<5}"
+    for name in names:
+        header += f"{name + ' med':<12}{name + ' IQR':<12}{name + ' p95':<12}"
+    print(header)
+    groups = list(results["buckets"].items()) + [("kaikki", results["engines"])]
+    for bucket, stats in groups:
+        line = f"{bucket:<7}{stats[names[0]]['n']:<5}"
+        for name in names:
+            s = stats[name]
+            line += f"{s['median_ns'] / 1000:<12.1f}{s['iqr_ns'] / 1000:<12.1f}{s['p95_ns'] / 1000:<12.1f}"
+        print(line)
+
+
+def print_memory_table(results):
+    """
+    Tulostaa ryhmäkohtaisen muistinkäytön, kun mittaus on tehty profile_memory-tilassa.
+
+    Args:
+        results (dict): BenchmarkRunner.run-metodin tulos
+    """
+    names = list(results["engines"])
+    header = f"{'Ryhmä':<7}"
+    for name in names:
+        header += f"{name + ' huippu kt':<16}{name + ' t/solmu':<14}{name + ' keko':<12}"
+    print(header)
+    groups = list(results["buckets"].items()) + [("kaikki", results["engines"])]
+    for bucket, stats in groups:
+        line = f"{bucket:<7}"
+        for name in names:
+            s = stats[name]
+            per_node = s["median_bytes_per_expanded"]
+            open_peak = s["max_open_set_peak"]
+            line += (f"{s['max_peak_bytes'] / 1024:<16.1f}{'-' if per_node is None else f'{per_node:.0f}':<14}"
+                     f"{'-' if open_peak is None else open_peak:<12}")
+        print(line)
+    rss = max_rss()
+    if rss is not None:
+        # ru_maxrss kattaa koko prosessin (myös kartan ja Pythonin), eikä se laske kyselyjen välillä
+        print(f"Koko prosessin muistinkäytön huippu (ru_maxrss): {rss / 2 ** 20:.1f} Mt")
+
+
+def print_counter_table(results):
+    """
+    Tulostaa algoritmien yhteenlasketut hakulaskurit, kun ne on kerätty.
+
+    Args:
+        results (dict): BenchmarkRunner.run-metodin tulos
+    """
+    for name, stats in results["engines"].items():
+        counters = stats.get("counters")
+        if counters is None:
+            continue
+        print(f"{name}:")
+        for field, value in counters.items():
+            if value is None:
+                value = "-"
+            elif isinstance(value, float):
+                value = f"{value:.1f}"
+            print(f"  {field:<18}{value}")
+
+
+def save_json(results, filename):
+    """
+    Tallentaa tulokset JSON-tiedostoon.
+
+    Args:
+        results (dict): BenchmarkRunner.run-metodin tulos
+        filename (str): Tiedoston nimi
+    """
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+def main(argv=None):
+    """
+    Komentorivikäyttö: mittaa A*:n ja JPS:n rmtst03-skenaarioilla.
+
+    --profile ajaa mittauksen sijaan valittujen ryhmien profiloinnin,
+    ks. profiling.profile_buckets.
+    """
+    parser = argparse.ArgumentParser(description="Reitinhakualgoritmien suorituskykymittaus")
+    parser.add_argument("--memory", action="store_true", help="Mittaa kyselyiden muistinkäyttö")
+    parser.add_argument("--counters", action="store_true", help="Kerää hakulaskurit")
+    parser.add_argument("--warm", action="store_true",
+                        help="Mittaa lämpimät kyselyt: välimuisteja ei tyhjennetä ajojen välillä")
+    parser.add_argument("--profile", nargs="*", type=int, metavar="RYHMÄ",
+                        help="Profiloi annetut ryhmät (oletuksena kaikki) mittauksen sijaan")
+    parser.add_argument("--profile-mode", choices=("cprofile", "sampling"), default="cprofile",
+                        help="Profiloija: cProfile tai näytteenotto")
+    parser.add_argument("--profile-dir", default="profiles", help="Profiilien hakemisto")
+    parser.add_argument("--sample-interval", type=float, default=0.001,
+                        help="Näytteenottoväli sekunteina sampling-tilassa")
+    args = parser.parse_args(argv)
+
+    np_map = ml.map_to_numpy(ml.load_map('maps/rmtst03.map.txt'))
+    scenarios = ml.load_scenarios('maps/rmtst03.map.scen.txt')
+    buckets = ml.load_scenario_buckets('maps/rmtst03.map.scen.txt')
+    engines = {"A*": AStar(np_map), "JPS": JPS(np_map)}
+
+    if args.profile is not None:
+        from profiling import profile_buckets
+        rows = profile_buckets(engines, scenarios, buckets, args.profile or None,
+                               args.profile_dir, args.profile_mode, args.sample_interval)
+        for name, bucket, count, files in rows:
+            print(f"{name:<5} ryhmä {bucket:<4} {count:>3} kyselyä: {', '.join(files)}")
+        return
+
+    runner = BenchmarkRunner(profile_memory=args.memory, collect_counters=args.counters,
+                             cold=not args.warm)
+    results = runner.run(engines, scenarios, buckets)
+    print_bucket_table(results)
+    if args.memory:
+        print_memory_table(results)
+    if args.counters:
+        print_counter_table(results)
+    save_json(results, "benchmark_results.json")
+
+
+if __name__ == "__main__":
+    main()
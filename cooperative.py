@@ -0,0 +1,397 @@
+"""
+Yhteistoiminnallinen monen agentin reitinhaku (Windowed Hierarchical Cooperative A*).
+
+Toisistaan riippumattomat A*-haut tuottavat reittejä, joilla agentit
+törmäävät samassa solussa samaan aikaan. WHCA* suunnittelee agentit
+prioriteettijärjestyksessä aika-avaruudessa: jokainen agentti varaa reittinsä
+solut aika-askelittain varaustauluun, ja myöhemmät agentit kiertävät varatut
+solut tai odottavat. Haku rajataan ikkunaan (window aika-askelta), jonka
+jälkeen jäljellä oleva matka arvioidaan maalin todellisella etäisyydellä
+virtauskentästä (ks. flow_field). Kentät säilyvät välimuistissa maaleittain.
+
+Agentit suunnittelevat uudelleen replan_interval askeleen välein, ja
+vanhentuneet aika-askeleet poistetaan varaustaulusta.
+
+Liikkumismalli on sama kuin astar.get_neighbors. Jokainen siirto ja
+odotus kestää yhden aika-askeleen; siirron hinta on 1 tai √2 ja odotuksen 1
+(maalissa 0).
+"""
+
+import heapq
+import math
+import time
+from collections import defaultdict
+
+import numpy as np
+
+import map_loader as ml
+from astar import AStar
+from flow_field import FlowFieldCache
+
+# Liikkeet: kahdeksan naapuria ja paikallaan odotus
+MOVES = [(-1, 0), (1, 0), (0, -1), (0, 1),
+         (-1, -1), (-1, 1), (1, -1), (1, 1), (0, 0)]
+MOVE_COSTS = [math.sqrt(2) if dx and dy else 1.0 for dx, dy in MOVES[:-1]] + [1.0]
+
+
+class ReservationTable:
+    """
+    Aika-avaruuden varaustaulu.
+
+    Solut varataan avaimella (x, y, t) ja siirrot avaimella
+    (x1, y1, x2, y2, t), jolloin kaksi agenttia ei voi vaihtaa paikkaa samalla
+    askeleella. Avaimet on ryhmitelty aika-askelittain, joten vanhentuneet
+    varaukset voidaan poistaa kerralla, ja agenteittain, joten agentin
+    varausten vapautus käy läpi vain sen omat avaimet.
+
+    Attributes:
+        cells (dict): {(x, y, t): agentti}
+        edges (dict): {(x1, y1, x2, y2, t): agentti}
+    """
+
+    def __init__(self):
+        self.cells = {}
+        self.edges = {}
+        self._by_time = defaultdict(list)
+        self._by_agent = defaultdict(list)
+        self._earliest = 0
+
+    def __len__(self):
+        """Palauttaa voimassa olevien varausten määrän."""
+        return len(self.cells) + len(self.edges)
+
+    def cell_owner(self, cell, t):
+        """Palauttaa solun varanneen agentin ajanhetkellä t, tai None."""
+        return self.cells.get((cell[0], cell[1], t))
+
+    def is_free(self, cell, t, agent):
+        """Tarkistaa, voiko agentti olla solussa ajanhetkellä t."""
+        owner = self.cells.get((cell[0], cell[1], t))
+        return owner is None or owner == agent
+
+    def move_allowed(self, a, b, t, agent):
+        """
+        Tarkistaa, voiko agentti siirtyä solusta a soluun b ajanhetkestä t alkaen.
+
+        Siirto on kielletty, jos b on varattu hetkellä t + 1 tai joku toinen
+        agentti siirtyy samalla askeleella solusta b soluun a.
+        """
+        if not self.is_free(b, t + 1, agent):
+            return False
+        owner = self.edges.get((b[0], b[1], a[0], a[1], t))
+        return owner is None or owner == agent
+
+    def reserve(self, path, start_time, agent):
+        """
+        Varaa reitin solut ja siirrot.
+
+        Args:
+            path (list): Solut aika-askelittain alkaen hetkestä start_time
+            start_time (int): Reitin ensimmäisen solun ajanhetki
+            agent (int): Agentin tunniste
+        """
+        own = self._by_agent[agent]
+        for k, cell in enumerate(path):
+            t = start_time + k
+            key = (cell[0], cell[1], t)
+            self.cells[key] = agent
+            self._by_time[t].append(key)
+            own.append((t, key))
+            if k + 1 < len(path):
+                nxt = path[k + 1]
+                edge = (cell[0], cell[1], nxt[0], nxt[1], t)
+                self.edges[edge] = agent
+                self._by_time[t].append(edge)
+                own.append((t, edge))
+
+    def release(self, agent, from_time):
+        """
+        Poistaa agentin varaukset ajanhetkestä from_time eteenpäin.
+
+        Args:
+            agent (int): Agentin tunniste
+            from_time (int): Ensimmäinen vapautettava ajanhetki
+        """
+        kept = []
+        for t, key in self._by_agent.get(agent, ()):
+            # Vanhentuneet avaimet on jo poistettu tauluista, joten ne jätetään pois myös indeksistä
+            if t < self._earliest:
+                continue
+            if t < from_time:
+                kept.append((t, key))
+                continue
+            table = self.cells if len(key) == 3 else self.edges
+            if table.get(key) == agent:
+                del table[key]
+        self._by_agent[agent] = kept
+
+    def evict_before(self, t):
+        """
+        Poistaa vanhentuneet varaukset ennen ajanhetkeä t.
+
+        Args:
+            t (int): Nykyinen ajanhetki
+
+        Returns:
+            int: Poistettujen varausten määrä
+        """
+        evicted = 0
+        for old in range(self._earliest, t):
+            for key in self._by_time.pop(old, ()):
+                table = self.cells if len(key) == 3 else self.edges
+                if table.pop(key, None) is not None:
+                    evicted += 1
+        self._earliest = max(self._earliest, t)
+        return evicted
+
+
+class CooperativePlanner:
+    """
+    WHCA*-suunnittelija.
+
+    Attributes:
+        grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+        window (int): Aika-avaruushaun syvyys aika-askelina
+        replan_interval (int): Kuinka monen askeleen välein agentit suunnitellaan uudelleen
+        reservations (ReservationTable): Varaustaulu
+        fields (FlowFieldCache): Maalikohtaiset etäisyyskentät heuristiikaksi
+        max_expansions (int): Yhden ikkunahaun laajennusten enimmäismäärä
+        stats (dict): Suunnittelun laskurit
+    """
+
+    def __init__(self, grid, window=16, replan_interval=None, fields=None, max_expansions=5000):
+        """
+        Args:
+            grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+            window (int, optional): Ikkunan pituus aika-askelina
+            replan_interval (int, optional): Uudelleensuunnitteluväli. Oletuksena window // 2.
+            fields (FlowFieldCache, optional): Jaettu kenttävälimuisti
+            max_expansions (int, optional): Yhden haun laajennusten enimmäismäärä
+        """
+        self.grid = np.asarray(grid)
+        self.window = window
+        self.replan_interval = replan_interval or max(window // 2, 1)
+        self.reservations = ReservationTable()
+        self.fields = fields if fields is not None else FlowFieldCache(self.grid, max_size=256)
+        self.max_expansions = max_expansions
+        self.stats = {"searches": 0, "expansions": 0, "fallbacks": 0, "evicted": 0,
+                      "blocked_waits": 0, "unfinished": 0}
+
+    def _windowed_search(self, agent, start, goal, now, distance):
+        """
+        Aika-avaruuden A*-haku ikkunan loppuun tai maaliin.
+
+        Args:
+            agent (int): Agentin tunniste
+            start (tuple): Agentin solu hetkellä now
+            goal (tuple): Maalisolu
+            now (int): Nykyinen ajanhetki
+            distance (numpy.ndarray): Maalin etäisyyskenttä
+
+        Returns:
+            list: Solut aika-askelittain hetkestä now alkaen, enintään hetkeen now + window.
+                  Reitti on lyhyempi, jos sen lopussa odottaminen osuisi toisen agentin varaukseen.
+        """
+        grid = self.grid
+        rows, cols = grid.shape
+        reservations = self.reservations
+        horizon = now + self.window
+
+        start_state = (start, now)
+        g_scores = {start_state: 0.0}
+        came_from = {}
+        open_set = [(distance[start], 0.0, start, now)]
+        best = None
+        expansions = 0
+
+        while open_set and expansions < self.max_expansions:
+            _, g, cell, t = heapq.heappop(open_set)
+            if g > g_scores[(cell, t)]:
+                continue
+            expansions += 1
+            if best is None or t > best[1] or (t == best[1] and g + distance[cell] < best[2]):
+                best = (cell, t, g + distance[cell])
+            if t == horizon:
+                break
+            # Maalissa agentti voi jäädä paikalleen, jos solu on vapaa ikkunan loppuun
+            if cell == goal and all(reservations.is_free(goal, k, agent)
+                                    for k in range(t + 1, horizon + 1)):
+                best = (cell, t, g)
+                break
+
+            for (dx, dy), cost in zip(MOVES, MOVE_COSTS):
+                nxt = (cell[0] + dx, cell[1] + dy)
+                if not (0 <= nxt[0] < rows and 0 <= nxt[1] < cols) or grid[nxt] != 0:
+                    continue
+                if not reservations.move_allowed(cell, nxt, t, agent):
+                    continue
+                h = distance[nxt]
+                if not math.isfinite(h):
+                    continue
+                if nxt == cell == goal:
+                    cost = 0.0
+                tentative = g + cost
+                state = (nxt, t + 1)
+                if tentative < g_scores.get(state, math.inf):
+                    g_scores[state] = tentative
+                    came_from[state] = (cell, t)
+                    heapq.heappush(open_set, (tentative + h, tentative, nxt, t + 1))
+
+        self.stats["searches"] += 1
+        self.stats["expansions"] += expansions
+
+        state = (best[0], best[1])
+        path = [state[0]]
+        while state in came_from:
+            state = came_from[state]
+            path.append(state[0])
+        path.reverse()
+        if best[1] < horizon:
+            if best[0] != goal:
+                self.stats["fallbacks"] += 1
+            # Ikkunan loppu odotetaan paikallaan niin pitkään kuin solu on vapaa
+            cell = path[-1]
+            for t in range(best[1] + 1, horizon + 1):
+                if not reservations.is_free(cell, t, agent):
+                    self.stats["blocked_waits"] += 1
+                    break
+                path.append(cell)
+        return path
+
+    def plan(self, agents, max_time=1000):
+        """
+        Suunnittelee törmäyksettömät reitit kaikille agenteille.
+
+        Agenttien prioriteetti kiertää uudelleensuunnittelukierroksittain,
+        jotta sama agentti ei aina väistä muita. Kierroksella edetään enintään
+        lyhimmän suunnitelman verran, ks. _windowed_search. Maaliin ehtimättömien
+        agenttien määrä tallennetaan laskuriin stats["unfinished"].
+
+        Args:
+            agents (list): Agentit muodossa [(lähtö, maali), ...]
+            max_time (int, optional): Simuloitavien aika-askelten enimmäismäärä
+
+        Returns:
+            list: Jokaisen agentin solut aika-askelittain hetkestä 0 alkaen.
+                  Kaikki reitit ovat yhtä pitkiä.
+        """
+        positions = [tuple(start) for start, _ in agents]
+        goals = [tuple(goal) for _, goal in agents]
+        distances = [self.fields.get(goal).distance for goal in goals]
+        trajectories = [[pos] for pos in positions]
+        for agent, pos in enumerate(positions):
+            self.reservations.reserve([pos], 0, agent)
+
+        now = 0
+        cycle = 0
+        while now < max_time and positions != goals:
+            self.stats["evicted"] += self.reservations.evict_before(now)
+            shift = cycle % len(agents)
+            order = list(range(shift, len(agents))) + list(range(shift))
+
+            plans = {}
+            for agent in order:
+                self.reservations.release(agent, now)
+                plan = self._windowed_search(agent, positions[agent], goals[agent], now,
+                                             distances[agent])
+                self.reservations.reserve(plan, now, agent)
+                plans[agent] = plan
+
+            steps = min(self.replan_interval, max_time - now,
+                        min(len(plan) - 1 for plan in plans.values()))
+            if steps == 0:
+                # Joku agentti ei voi edes odottaa yhtä askelta; se jää paikalleen ristiriidasta huolimatta
+                steps = 1
+                for plan in plans.values():
+                    if len(plan) == 1:
+                        plan.append(plan[0])
+            for agent, plan in plans.items():
+                trajectories[agent].extend(plan[1:steps + 1])
+                positions[agent] = plan[steps]
+            now += steps
+            cycle += 1
+
+        self.stats["unfinished"] = sum(pos != goal for pos, goal in zip(positions, goals))
+        return trajectories
+
+
+def count_conflicts(paths):
+    """
+    Laskee törmäykset aika-askelittaisilla reiteillä.
+
+    Reitin päätyttyä agentin oletetaan jäävän viimeiseen soluunsa.
+
+    Args:
+        paths (list): Agenttien solut aika-askelittain
+
+    Returns:
+        tuple: (solutörmäykset, paikanvaihdot)
+    """
+    paths = [path for path in paths if path]
+    length = max((len(path) for path in paths), default=0)
+    vertex = 0
+    swaps = 0
+    for t in range(length):
+        cells = [path[min(t, len(path) - 1)] for path in paths]
+        vertex += len(cells) - len(set(cells))
+        if t + 1 < length:
+            moves = {(a, path[min(t + 1, len(path) - 1)]) for a, path in zip(cells, paths)}
+            swaps += sum((b, a) in moves for a, b in moves if a != b)
+    return vertex, swaps // 2
+
+
+def run_cooperative_benchmark(np_map, agent_counts=(10, 50, 100), window=16, seed=0):
+    """
+    Mittaa WHCA*-suunnittelun läpäisyn agentteina sekunnissa ja vertaa törmäyksiä A*-reitteihin.
+
+    Jos osa agenteista ei ehdi maaliin (esim. jumittuvat toistensa väistelyyn),
+    ajo on keskeneräinen, eikä sille lasketa läpäisyä.
+
+    Args:
+        np_map (numpy.ndarray): Karttadata numpy-taulukkona
+        agent_counts (tuple, optional): Vertailtavat agenttimäärät
+        window (int, optional): Ikkunan pituus
+        seed (int, optional): Satunnaislukugeneraattorin siemen
+
+    Returns:
+        list: Rivit muodossa (agentit, agentit/s tai None, ikkunahaut, maaliin ehtimättömät,
+              A* törmäykset, WHCA* törmäykset)
+    """
+    rng = np.random.default_rng(seed)
+    free = [tuple(int(v) for v in cell) for cell in np.argwhere(np_map == 0)]
+    astar = AStar(np_map)
+    fields = FlowFieldCache(np_map, max_size=max(agent_counts))
+
+    rows = []
+    print(f"{'Agentit':<10}{'Aika (s)':<10}{'Agenttia/s':<12}{'Ikkunahaut':<12}{'Kesken':<8}"
+          f"{'Askeleet':<10}{'A* törmäykset':<15}{'WHCA* törmäykset':<18}")
+    for count in agent_counts:
+        cells = rng.choice(len(free), size=2 * count, replace=False)
+        agents = [(free[cells[i]], free[cells[count + i]]) for i in range(count)]
+
+        independent = [astar.find_path(start, goal)[0] or [start] for start, goal in agents]
+        astar_conflicts = sum(count_conflicts(independent))
+
+        # Kentät lasketaan etukäteen, jotta mitataan pelkkä suunnittelu
+        for _, goal in agents:
+            fields.get(goal)
+        planner = CooperativePlanner(np_map, window=window, fields=fields)
+        start_time = time.perf_counter()
+        paths = planner.plan(agents)
+        elapsed = time.perf_counter() - start_time
+        cooperative_conflicts = sum(count_conflicts(paths))
+
+        # Jokainen agentti suunnitellaan useassa ikkunassa, joten hakujen määrä raportoidaan erikseen
+        unfinished = planner.stats["unfinished"]
+        rate = count / elapsed if unfinished == 0 else None
+        searches = planner.stats["searches"]
+        rows.append((count, rate, searches, unfinished, astar_conflicts, cooperative_conflicts))
+        rate_text = "-" if rate is None else f"{rate:.0f}"
+        print(f"{count:<10}{elapsed:<10.3f}{rate_text:<12}{searches:<12}{unfinished:<8}"
+              f"{len(paths[0]) - 1:<10}{astar_conflicts:<15}{cooperative_conflicts:<18}")
+    return rows
+
+
+if __name__ == "__main__":
+    np_map = ml.map_to_numpy(ml.load_map('maps/rmtst03.map.txt'))
+    run_cooperative_benchmark(np_map)
@@ -0,0 +1,182 @@
+"""
+MovingAI-karttakorpuksen lataus.
+
+Moduuli etsii hakemistosta kaikki kartta- ja skenaariotiedostoparit
+(esim. ``rmtst03.map`` + ``rmtst03.map.scen`` tai ``rmtst03.map.txt`` +
+``rmtst03.map.scen.txt``) ja jäsentää ne rinnakkain prosessipoolissa.
+Yksittäiset kartat voidaan ladata myös laiskasti nimen perusteella.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import map_loader as ml
+
+# Tuetut karttatiedostojen päätteet ja niitä vastaavat skenaariopäätteet
+MAP_SUFFIXES = (('.map.txt', '.map.scen.txt'), ('.map', '.map.scen'))
+
+
+def discover_pairs(directory):
+    """
+    Etsii hakemistosta kaikki kartta- ja skenaariotiedostoparit.
+
+    Karttatiedostot, joille ei löydy skenaariotiedostoa, jätetään pois.
+
+    Args:
+        directory (str): Hakemisto, josta tiedostoja etsitään
+
+    Returns:
+        dict: Sanakirja muodossa {map_id: (kartan polku, skenaarioiden polku)}
+              järjestettynä kartan tunnisteen mukaan
+    """
+    pairs = {}
+    for filename in sorted(os.listdir(directory)):
+        for map_suffix, scen_suffix in MAP_SUFFIXES:
+            if not filename.endswith(map_suffix):
+                continue
+            map_id = filename[:-len(map_suffix)]
+            map_path = os.path.join(directory, filename)
+            scen_path = os.path.join(directory, map_id + scen_suffix)
+            if os.path.isfile(scen_path) and map_id not in pairs:
+                pairs[map_id] = (map_path, scen_path)
+            break
+    return pairs
+
+
+def parse_pair(map_path, scen_path):
+    """
+    Jäsentää yhden kartta- ja skenaariotiedostoparin.
+
+    Funktio on moduulitasolla, jotta se voidaan ajaa prosessipoolissa.
+
+    Args:
+        map_path (str): Karttatiedoston polku
+        scen_path (str): Skenaariotiedoston polku
+
+    Returns:
+        tuple: (karttadata numpy-taulukkona, skenaariolista)
+    """
+    np_map = ml.map_to_numpy(ml.load_map(map_path))
+    scenarios = ml.load_scenarios(scen_path)
+    return np_map, scenarios
+
+
+def _parse_entry(entry):
+    """Apufunktio prosessipoolille: jäsentää (map_id, map_path, scen_path) -kolmikon."""
+    map_id, map_path, scen_path = entry
+    np_map, scenarios = parse_pair(map_path, scen_path)
+    return map_id, np_map, scenarios
+
+
+class MapCorpus:
+    """
+    Hakemistollinen MovingAI-karttoja ja niiden skenaarioita.
+
+    Kartat ladataan laiskasti: ``load`` jäsentää kartan vasta kun sitä
+    pyydetään ja tallentaa sen välimuistiin. Koko korpuksen läpikäynti
+    jäsentää kartat rinnakkain prosessipoolissa.
+
+    Attributes:
+        directory (str): Korpuksen hakemisto
+        pairs (dict): Löydetyt tiedostoparit {map_id: (map_path, scen_path)}
+        max_workers (int or None): Prosessipoolin työntekijöiden määrä
+    """
+
+    def __init__(self, directory, max_workers=None):
+        """
+        Alustaa korpuksen ja etsii hakemistosta tiedostoparit.
+
+        Args:
+            directory (str): Korpuksen hakemisto
+            max_workers (int, optional): Prosessipoolin koko. Oletuksena prosessorien määrä.
+        """
+        self.directory = directory
+        self.max_workers = max_workers
+        self.pairs = discover_pairs(directory)
+        self._cache = {}
+
+    @property
+    def map_ids(self):
+        """list: Korpuksen karttojen tunnisteet aakkosjärjestyksessä."""
+        return list(self.pairs)
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def __contains__(self, map_id):
+        return map_id in self.pairs
+
+    def load(self, map_id):
+        """
+        Lataa yksittäisen kartan ja sen skenaariot nimen perusteella.
+
+        Args:
+            map_id (str): Kartan tunniste, esim. 'rmtst03'
+
+        Returns:
+            tuple: (karttadata numpy-taulukkona, skenaariolista)
+
+        Raises:
+            KeyError: Jos korpuksessa ei ole annettua karttaa
+        """
+        if map_id not in self._cache:
+            map_path, scen_path = self.pairs[map_id]
+            self._cache[map_id] = parse_pair(map_path, scen_path)
+        return self._cache[map_id]
+
+    def iter_maps(self, map_ids=None):
+        """
+        Käy läpi korpuksen kartat ja jäsentää ne rinnakkain.
+
+        Jo välimuistissa olevia karttoja ei jäsennetä uudelleen. Rinnakkain
+        jäsennettyjä karttoja ei tallenneta välimuistiin, jotta koko korpuksen
+        läpikäynti ei pidä kaikkia karttoja muistissa yhtä aikaa. Poolille
+        annetaan kerrallaan enintään kaksi karttaa työntekijää kohti, ja uusi
+        kartta lähetetään jäsennettäväksi vasta, kun edellinen on palautettu.
+        Hidas kuluttaja ei siis kasvata valmiiden karttojen jonoa.
+
+        Args:
+            map_ids (list, optional): Läpikäytävät kartat. Oletuksena kaikki.
+
+        Yields:
+            tuple: (map_id, karttadata numpy-taulukkona, skenaariolista)
+        """
+        if map_ids is None:
+            map_ids = self.map_ids
+
+        # Jako tehdään kerran, jotta läpikäynnin aikana ladattu kartta ei siirrä
+        # tuloksia väärille kartoille
+        cached = {map_id for map_id in map_ids if map_id in self._cache}
+        pending = [(map_id, *self.pairs[map_id]) for map_id in map_ids
+                   if map_id not in cached]
+
+        # Yksi jäsennettävä kartta ei kannata prosessipoolin käynnistämistä
+        if len(pending) <= 1:
+            for map_id in map_ids:
+                yield (map_id, *self.load(map_id))
+            return
+
+        workers = self.max_workers or os.cpu_count() or 1
+        lookahead = 2 * workers
+        entries = iter(pending)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = deque()
+
+            def submit_next():
+                entry = next(entries, None)
+                if entry is not None:
+                    futures.append(executor.submit(_parse_entry, entry))
+
+            for _ in range(lookahead):
+                submit_next()
+            for map_id in map_ids:
+                if map_id in cached:
+                    yield (map_id, *self.load(map_id))
+                else:
+                    result = futures.popleft().result()
+                    submit_next()
+                    yield result
+
+    def __iter__(self):
+        return self.iter_maps()
@@ -0,0 +1,285 @@
+"""
+Umpikuja-alueiden tunnistus ja karsinta.
+
+Alue on umpikuja, jos siihen pääsee muualta kartalta vain yhden solun
+(artikulaatiopisteen) kautta. Lyhin reitti kahden alueen ulkopuolisen solun
+välillä ei koskaan käy tällaisessa alueessa, koska se joutuisi kulkemaan
+saman oviaukon kautta kahdesti. Esikäsittely etsii artikulaatiopisteet
+Tarjanin algoritmilla ja merkitsee jokaisen umpikuja-alueen omalla
+tunnisteellaan. Alueet voivat olla sisäkkäisiä, joten jokaiselle alueelle
+tallennetaan myös sen ympäröivä alue.
+
+Haku ohittaa solut, joiden alue ei sisällä lähtö- tai maalisolmua.
+"""
+
+import time
+
+import numpy as np
+
+import map_loader as ml
+from astar import AStar
+from grid_preprocessing import free_cell_graph
+from jps import JPS
+
+
+def _label_regions(neighbors, roots):
+    """
+    Merkitsee umpikuja-alueet syvyyshaulla annetuista juurisoluista alkaen.
+
+    Args:
+        neighbors (list): Naapurilistat, ks. grid_preprocessing.free_cell_graph
+        roots (list): Juurisolujen indeksit. Jokaisesta vielä käsittelemättömästä
+            juuresta aloitetaan oma syvyyshaku.
+
+    Returns:
+        tuple: (solujen aluetunnisteet, alueiden ympäröivät alueet, solujen komponentit)
+    """
+    count = len(neighbors)
+    disc = [-1] * count
+    low = [0] * count
+    parent = [-1] * count
+    component = [-1] * count
+    region_head = [False] * count
+    order = []
+    timer = 0
+
+    # Iteratiivinen syvyyshaku, jotta suuret kartat eivät ylitä rekursiorajaa
+    for root in roots:
+        if disc[root] != -1:
+            continue
+        disc[root] = low[root] = timer
+        timer += 1
+        component[root] = root
+        order.append(root)
+        root_children = []
+        stack = [(root, iter(neighbors[root]))]
+
+        while stack:
+            current, edges = stack[-1]
+            advanced = False
+            for target, _, _ in edges:
+                if disc[target] == -1:
+                    parent[target] = current
+                    disc[target] = low[target] = timer
+                    timer += 1
+                    component[target] = root
+                    order.append(target)
+                    if current == root:
+                        root_children.append(target)
+                    stack.append((target, iter(neighbors[target])))
+                    advanced = True
+                    break
+                if target != parent[current]:
+                    low[current] = min(low[current], disc[target])
+            if advanced:
+                continue
+
+            stack.pop()
+            if stack:
+                above = stack[-1][0]
+                low[above] = min(low[above], low[current])
+                # Alipuu on erillinen komponentti, jos siitä ei ole yhteyttä above-solun ohi
+                if above != root and low[current] >= disc[above]:
+                    region_head[current] = True
+
+        # Juuri on artikulaatiopiste, jos sillä on useampi lapsi syvyyshakupuussa
+        if len(root_children) > 1:
+            for child in root_children:
+                region_head[child] = True
+
+    # Esijärjestyksessä vanhempi käsitellään aina ennen lastaan
+    cell_labels = [0] * count
+    parents = [0]
+    for cell in order:
+        outer = cell_labels[parent[cell]] if parent[cell] != -1 else 0
+        if region_head[cell]:
+            cell_labels[cell] = len(parents)
+            parents.append(outer)
+        else:
+            cell_labels[cell] = outer
+    return cell_labels, parents, component
+
+
+def build_dead_end_labels(grid):
+    """
+    Merkitsee ruudukon umpikuja-alueet.
+
+    Karsinta on oikein mistä tahansa juuresta aloitettuna, mutta juuren
+    alue jää aina karsimatta. Siksi ensimmäisen kierroksen jälkeen juureksi
+    valitaan jokaisessa yhtenäisessä komponentissa solu siitä alueesta, jossa
+    on eniten omia (ei sisempiin alueisiin kuuluvia) soluja, ja alueet
+    merkitään uudelleen. Näin pienet taskut ja huoneet jäävät umpikujiksi.
+
+    Args:
+        grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+
+    Returns:
+        tuple: (labels, parents), jossa labels on int32-taulukko ruudukon
+               muodossa (0 = ei umpikujaa tai este) ja parents[i] on alueen i
+               ympäröivän alueen tunniste (parents[0] = 0)
+    """
+    grid = np.asarray(grid)
+    cells, neighbors = free_cell_graph(grid)
+    count = len(cells)
+
+    cell_labels, _, component = _label_regions(neighbors, range(count))
+
+    # Valitaan jokaiselle komponentille juuri sen suurimmasta alueesta
+    sizes = {}
+    for cell in range(count):
+        key = (component[cell], cell_labels[cell])
+        size, first = sizes.get(key, (0, cell))
+        sizes[key] = (size + 1, first)
+    best = {}
+    for (root, _), (size, first) in sizes.items():
+        if size > best.get(root, (0, None))[0]:
+            best[root] = (size, first)
+    roots = [first for _, first in best.values()]
+
+    cell_labels, parents, _ = _label_regions(neighbors, roots)
+
+    labels = np.zeros(grid.shape, dtype=np.int32)
+    if count:
+        labels[cells[:, 0], cells[:, 1]] = cell_labels
+    return labels, np.array(parents, dtype=np.int32)
+
+
+class DeadEndIndex:
+    """
+    Umpikuja-alueiden indeksi.
+
+    Attributes:
+        labels (numpy.ndarray): Solujen sisimmän umpikuja-alueen tunnisteet (0 = ei aluetta)
+        parents (numpy.ndarray): Alueiden ympäröivien alueiden tunnisteet
+    """
+
+    def __init__(self, labels, parents):
+        """
+        Args:
+            labels (numpy.ndarray): build_dead_end_labels-funktion alueet
+            parents (numpy.ndarray): build_dead_end_labels-funktion ympäröivät alueet
+        """
+        self.labels = labels
+        self.parents = parents
+
+    @classmethod
+    def build(cls, grid):
+        """
+        Laskee indeksin annetulle ruudukolle.
+
+        Args:
+            grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+
+        Returns:
+            DeadEndIndex: Valmis indeksi
+        """
+        return cls(*build_dead_end_labels(grid))
+
+    @property
+    def region_count(self):
+        """int: Umpikuja-alueiden määrä."""
+        return len(self.parents) - 1
+
+    def active_regions(self, start, goal):
+        """
+        Palauttaa alueet, joissa haku saa käydä.
+
+        Sallittuja ovat lähtö- ja maalisolmun alueet ympäröivine alueineen
+        sekä alue 0.
+
+        Args:
+            start (tuple): Aloitussolmu (x, y)
+            goal (tuple): Maalisolmu (x, y)
+
+        Returns:
+            set: Sallittujen alueiden tunnisteet
+        """
+        active = {0}
+        for x, y in (start, goal):
+            region = int(self.labels[x, y])
+            while region not in active:
+                active.add(region)
+                region = int(self.parents[region])
+        return active
+
+    def query_filter(self, start, goal):
+        """
+        Palauttaa hakukohtaisen suodattimen, joka kertoo saako solussa käydä.
+
+        Args:
+            start (tuple): Aloitussolmu (x, y)
+            goal (tuple): Maalisolmu (x, y)
+
+        Returns:
+            function or None: Funktio pos -> bool, tai None jos mitään ei karsita
+        """
+        active = self.active_regions(start, goal)
+        if len(active) == len(self.parents):
+            return None
+        labels = self.labels
+        return lambda pos: labels.item(pos[0], pos[1]) in active
+
+    def pruned_mask(self, start, goal):
+        """
+        Palauttaa maskin soluista, jotka haku ohittaa.
+
+        Args:
+            start (tuple): Aloitussolmu (x, y)
+            goal (tuple): Maalisolmu (x, y)
+
+        Returns:
+            numpy.ndarray: bool-taulukko ruudukon muodossa
+        """
+        active = np.fromiter(self.active_regions(start, goal), dtype=np.int32)
+        return ~np.isin(self.labels, active)
+
+
+def run_dead_end_benchmark(np_map, scenarios, buckets):
+    """
+    Vertailee laajennettujen solmujen määrää ilman umpikujakarsintaa ja sen kanssa.
+
+    Args:
+        np_map (numpy.ndarray): Karttadata numpy-taulukkona
+        scenarios (list): Lista skenaarioita (alku, loppu, optimaalinen_pituus)
+        buckets (list): Skenaarioiden ryhmänumerot, ks. map_loader.load_scenario_buckets
+
+    Returns:
+        dict: Ryhmäkohtaiset summat muodossa
+              {ryhmä: {"A*": (ilman, kanssa), "JPS": (ilman, kanssa)}}
+    """
+    start_time = time.perf_counter()
+    index = DeadEndIndex.build(np_map)
+    build_time = time.perf_counter() - start_time
+    print(f"Umpikujaindeksi: {index.region_count} aluetta, rakennusaika {build_time:.3f} s")
+
+    engines = {
+        "A*": (AStar(np_map), AStar(np_map, dead_ends=index)),
+        "JPS": (JPS(np_map), JPS(np_map, dead_ends=index)),
+    }
+
+    results = {}
+    for (start, goal, _), bucket in zip(scenarios, buckets):
+        row = results.setdefault(bucket, {name: (0, 0) for name in engines})
+        for name, (plain, pruned) in engines.items():
+            _, closed_plain, _ = plain.find_path(start, goal)
+            _, closed_pruned, _ = pruned.find_path(start, goal)
+            before, after = row[name]
+            row[name] = (before + len(closed_plain), after + len(closed_pruned))
+
+    print(f"{'Ryhmä':<7}{'A* ilman':<11}{'A* kanssa':<11}{'A* säästö':<11}"
+          f"{'JPS ilman':<11}{'JPS kanssa':<11}{'JPS säästö':<11}")
+    for bucket, row in sorted(results.items()):
+        line = f"{bucket:<7}"
+        for name in engines:
+            before, after = row[name]
+            saved = 100 * (before - after) / before if before else 0.0
+            line += f"{before:<11}{after:<11}{saved:<11.1f}"
+        print(line)
+    return results
+
+
+if __name__ == "__main__":
+    np_map = ml.map_to_numpy(ml.load_map('maps/rmtst03.map.txt'))
+    scenarios = ml.load_scenarios('maps/rmtst03.map.scen.txt')
+    buckets = ml.load_scenario_buckets('maps/rmtst03.map.scen.txt')
+    run_dead_end_benchmark(np_map, scenarios, buckets)
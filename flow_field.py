@@ -0,0 +1,344 @@
+"""
+Virtauskentät usealle samaan maaliin kulkevalle yksikölle.
+
+Kun sadat yksiköt kulkevat samaan kokoontumispisteeseen, jokaiselle ei
+kannata ajaa omaa A*-hakua. Virtauskenttä laskee kerralla jokaisen solun
+etäisyyden maaliin (tai lähimpään maalijoukon soluun) ja suunnan, johon
+solusta kannattaa siirtyä. Yksikön reitti saadaan seuraamalla suuntia.
+
+Etäisyydet lasketaan vektoroidulla Bellman-Ford-aaltorintamalla: jokaisella
+kierroksella koko ruudukko päivitetään kahdeksan siirretyn numpy-taulukon
+minimillä, kunnes mikään arvo ei enää pienene. Liikkumismalli on sama kuin
+astar.get_neighbors: siirtymä maksaa 1 tai √2 kerrottuna kohdesolun
+kustannuksella.
+"""
+
+import math
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import map_loader as ml
+from astar import AStar
+from grid_preprocessing import DIRECTIONS
+
+STEP_LENGTHS = np.array([math.sqrt(2) if dx and dy else 1.0 for dx, dy in DIRECTIONS])
+
+# Suuntakentän arvo soluille, joista ei siirrytä minnekään (este, maali, saavuttamaton)
+NO_DIRECTION = -1
+
+
+def _shifted(padded, direction, shape):
+    """Palauttaa reunustetusta taulukosta jokaisen solun naapurin arvon annetussa suunnassa."""
+    dx, dy = direction
+    rows, cols = shape
+    return padded[1 + dx:1 + dx + rows, 1 + dy:1 + dy + cols]
+
+
+def _step_costs(grid, cost_grid=None):
+    """
+    Laskee jokaiselle solulle ja suunnalle siirtymän hinnan naapuriin.
+
+    Returns:
+        numpy.ndarray: float64-taulukko muodossa (8, rivit, sarakkeet), inf esteisiin
+    """
+    grid = np.asarray(grid)
+    costs = np.where(grid == 0, 1.0, np.inf)
+    if cost_grid is not None:
+        costs = np.where(grid == 0, np.asarray(cost_grid, dtype=np.float64), np.inf)
+    padded = np.pad(costs, 1, constant_values=np.inf)
+    return np.stack([STEP_LENGTHS[d] * _shifted(padded, direction, grid.shape)
+                     for d, direction in enumerate(DIRECTIONS)])
+
+
+def _relax(distance, step_costs, free, max_iterations=None):
+    """
+    Päivittää etäisyyksiä, kunnes ne eivät enää pienene.
+
+    Args:
+        distance (numpy.ndarray): Etäisyyksien yläraja, päivitetään paikallaan
+        step_costs (numpy.ndarray): _step_costs-funktion siirtymähinnat
+        free (numpy.ndarray): Vapaiden solujen maski
+        max_iterations (int, optional): Kierrosten enimmäismäärä
+
+    Returns:
+        int: Suoritettujen kierrosten määrä
+    """
+    shape = distance.shape
+    padded = np.full((shape[0] + 2, shape[1] + 2), np.inf)
+    candidate = np.empty(shape)
+    iterations = 0
+    while max_iterations is None or iterations < max_iterations:
+        iterations += 1
+        padded[1:-1, 1:-1] = distance
+        best = distance.copy()
+        for d, direction in enumerate(DIRECTIONS):
+            np.add(_shifted(padded, direction, shape), step_costs[d], out=candidate)
+            np.minimum(best, candidate, out=best)
+        best[~free] = np.inf
+        if np.array_equal(best, distance):
+            break
+        distance[...] = best
+    return iterations
+
+
+def _directions(distance, step_costs):
+    """
+    Valitsee jokaiselle solulle suunnan naapuriin, jonka kautta etäisyys maaliin on pienin.
+
+    Returns:
+        numpy.ndarray: int8-taulukko suuntien indekseistä (ks. DIRECTIONS), NO_DIRECTION
+            esteissä, maaleissa ja saavuttamattomissa soluissa
+    """
+    shape = distance.shape
+    padded = np.pad(distance, 1, constant_values=np.inf)
+    totals = np.stack([_shifted(padded, direction, shape) + step_costs[d]
+                       for d, direction in enumerate(DIRECTIONS)])
+    directions = totals.argmin(axis=0).astype(np.int8)
+    directions[~np.isfinite(distance) | (distance == 0)] = NO_DIRECTION
+    return directions
+
+
+class FlowField:
+    """
+    Etäisyys- ja suuntakenttä maaliin tai maalijoukkoon.
+
+    Attributes:
+        goals (tuple): Maalisolut (x, y)
+        distance (numpy.ndarray): Jokaisen solun lyhimmän reitin pituus lähimpään maaliin (inf = ei reittiä)
+        directions (numpy.ndarray): int8-suuntakenttä, arvot ovat DIRECTIONS-listan indeksejä
+        iterations (int): Laskennan aaltorintamakierrosten määrä
+    """
+
+    def __init__(self, grid, goals, cost_grid=None, _step_costs_cache=None, _initial=None):
+        """
+        Laskee kentän.
+
+        Args:
+            grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+            goals (tuple or list): Maalisolu (x, y) tai lista maalisoluja
+            cost_grid (numpy.ndarray, optional): Solujen läpikulkukustannukset,
+                ks. map_loader.map_to_cost_grid
+        """
+        self.grid = np.asarray(grid)
+        self.cost_grid = cost_grid
+        if len(goals) == 2 and np.isscalar(goals[0]):
+            goals = [goals]
+        self.goals = tuple((int(x), int(y)) for x, y in goals)
+
+        self._step_costs = (_step_costs_cache if _step_costs_cache is not None
+                            else _step_costs(self.grid, cost_grid))
+        self._free = self.grid == 0
+
+        distance = np.full(self.grid.shape, np.inf) if _initial is None else _initial
+        for x, y in self.goals:
+            if self._free[x, y]:
+                distance[x, y] = 0.0
+        self.iterations = _relax(distance, self._step_costs, self._free)
+        self.distance = distance
+        self.directions = _directions(distance, self._step_costs)
+
+    def moved(self, new_goal):
+        """
+        Laskee kentän siirtyneelle maalille nykyisen kentän avulla.
+
+        Tasaisilla kustannuksilla etäisyys on symmetrinen, joten
+        d(c, uusi) <= d(c, vanha) + d(vanha, uusi) = distance[c] + distance[uusi].
+        Tästä ylärajasta aloitettu aaltorintama pysähtyy, kun muuttuneet
+        alueet ovat asettuneet. Maalijoukoille ja kustannusruudukoille kenttä
+        lasketaan alusta.
+
+        Args:
+            new_goal (tuple): Uusi maalisolu (x, y)
+
+        Returns:
+            FlowField: Uusi kenttä
+        """
+        new_goal = (int(new_goal[0]), int(new_goal[1]))
+        if len(self.goals) != 1 or self.cost_grid is not None:
+            return FlowField(self.grid, [new_goal], self.cost_grid, self._step_costs)
+        initial = self.distance + self.distance[new_goal]
+        return FlowField(self.grid, [new_goal], None, self._step_costs, initial)
+
+    def direction_at(self, pos):
+        """
+        Palauttaa suunnan, johon solusta siirrytään.
+
+        Args:
+            pos (tuple): Solu (x, y)
+
+        Returns:
+            tuple or None: Suunta (dx, dy), tai None maalissa, esteessä ja saavuttamattomassa solussa
+        """
+        d = int(self.directions[pos[0], pos[1]])
+        return DIRECTIONS[d] if d != NO_DIRECTION else None
+
+    def path_from(self, start):
+        """
+        Seuraa suuntakenttää solusta maaliin.
+
+        Args:
+            start (tuple): Lähtösolu (x, y)
+
+        Returns:
+            list or None: Reitin solut lähtösolusta maaliin, tai None jos maaliin ei pääse
+        """
+        if not np.isfinite(self.distance[start[0], start[1]]):
+            return None
+        directions = self.directions
+        x, y = start
+        path = [(x, y)]
+        # Etäisyys pienenee joka askeleella, joten silmukka päättyy maaliin
+        while True:
+            d = directions.item(x, y)
+            if d == NO_DIRECTION:
+                return path
+            dx, dy = DIRECTIONS[d]
+            x, y = x + dx, y + dy
+            path.append((x, y))
+
+
+class FlowFieldCache:
+    """
+    LRU-välimuisti maalikohtaisille virtauskentille.
+
+    Attributes:
+        grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+        cost_grid (numpy.ndarray or None): Solujen läpikulkukustannukset
+        max_size (int): Välimuistissa pidettävien kenttien enimmäismäärä
+        hits (int): Välimuistista löytyneiden kenttien määrä
+        misses (int): Laskettujen kenttien määrä
+    """
+
+    def __init__(self, grid, cost_grid=None, max_size=16):
+        """
+        Args:
+            grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+            cost_grid (numpy.ndarray, optional): Solujen läpikulkukustannukset
+            max_size (int, optional): Kenttien enimmäismäärä
+        """
+        self.grid = np.asarray(grid)
+        self.cost_grid = cost_grid
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._fields = OrderedDict()
+        self._step_costs = _step_costs(self.grid, cost_grid)
+
+    @staticmethod
+    def _key(goals):
+        if len(goals) == 2 and np.isscalar(goals[0]):
+            goals = [goals]
+        return frozenset((int(x), int(y)) for x, y in goals)
+
+    def _store(self, key, field):
+        self._fields[key] = field
+        if len(self._fields) > self.max_size:
+            self._fields.popitem(last=False)
+        return field
+
+    def get(self, goals):
+        """
+        Palauttaa kentän maalille tai maalijoukolle, laskien sen tarvittaessa.
+
+        Args:
+            goals (tuple or list): Maalisolu (x, y) tai lista maalisoluja
+
+        Returns:
+            FlowField: Kenttä
+        """
+        key = self._key(goals)
+        if key in self._fields:
+            self._fields.move_to_end(key)
+            self.hits += 1
+            return self._fields[key]
+        self.misses += 1
+        field = FlowField(self.grid, sorted(key), self.cost_grid, self._step_costs)
+        return self._store(key, field)
+
+    def move_goal(self, old_goal, new_goal):
+        """
+        Palauttaa kentän siirtyneelle maalille.
+
+        Jos vanhan maalin kenttä on välimuistissa, uusi kenttä lasketaan
+        siitä inkrementaalisesti (ks. FlowField.moved).
+
+        Args:
+            old_goal (tuple): Edellinen maalisolu (x, y)
+            new_goal (tuple): Uusi maalisolu (x, y)
+
+        Returns:
+            FlowField: Uuden maalin kenttä
+        """
+        new_key = self._key(new_goal)
+        old_field = self._fields.get(self._key(old_goal))
+        if new_key in self._fields or old_field is None:
+            return self.get(new_goal)
+        self.misses += 1
+        return self._store(new_key, old_field.moved(new_goal))
+
+    def invalidate(self):
+        """Tyhjentää välimuistin, esim. kun ruudukko muuttuu."""
+        self._fields.clear()
+
+
+def run_flow_field_benchmark(np_map, agent_counts=(10, 100, 500), seed=0):
+    """
+    Vertailee virtauskenttää erillisiin A*-hakuihin, kun kaikki yksiköt kulkevat samaan maaliin.
+
+    Args:
+        np_map (numpy.ndarray): Karttadata numpy-taulukkona
+        agent_counts (tuple, optional): Vertailtavat yksikkömäärät
+        seed (int, optional): Satunnaislukugeneraattorin siemen lähtösoluille
+
+    Returns:
+        list: Rivit muodossa (yksiköt, A* aika, kentän aika)
+    """
+    rng = np.random.default_rng(seed)
+    free = np.argwhere(np_map == 0)
+    goal = tuple(int(v) for v in free[rng.integers(len(free))])
+    astar = AStar(np_map)
+
+    start_time = time.perf_counter()
+    field = FlowField(np_map, goal)
+    build_time = time.perf_counter() - start_time
+    print(f"Virtauskenttä maaliin {goal}: {field.iterations} kierrosta, {build_time * 1000:.1f} ms")
+
+    rows = []
+    print(f"{'Yksiköt':<10}{'A* aika':<12}{'Kenttä aika':<14}{'Nopeutus':<10}")
+    for count in agent_counts:
+        starts = [tuple(int(v) for v in free[i]) for i in rng.integers(len(free), size=count)]
+
+        start_time = time.perf_counter()
+        for start in starts:
+            astar.find_path(start, goal)
+        astar_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        field = FlowField(np_map, goal)
+        for start in starts:
+            field.path_from(start)
+        field_time = time.perf_counter() - start_time
+
+        rows.append((count, astar_time, field_time))
+        print(f"{count:<10}{astar_time:<12.3f}{field_time:<14.3f}{astar_time / field_time:<10.1f}")
+
+    # Maalin siirto muutaman solun päähän: inkrementaalinen päivitys vs. uusi laskenta
+    moved_goal = min((tuple(int(v) for v in cell) for cell in free if tuple(cell) != goal),
+                     key=lambda cell: abs(cell[0] - goal[0]) + abs(cell[1] - goal[1]))
+    start_time = time.perf_counter()
+    incremental = field.moved(moved_goal)
+    incremental_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    full = FlowField(np_map, moved_goal)
+    full_time = time.perf_counter() - start_time
+    print(f"Maalin siirto {goal} -> {moved_goal}: inkrementaalinen {incremental_time * 1000:.1f} ms "
+          f"({incremental.iterations} kierrosta), uusi laskenta {full_time * 1000:.1f} ms "
+          f"({full.iterations} kierrosta)")
+    return rows
+
+
+if __name__ == "__main__":
+    np_map = ml.map_to_numpy(ml.load_map('maps/rmtst03.map.txt'))
+    run_flow_field_benchmark(np_map)
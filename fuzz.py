@@ -0,0 +1,354 @@
+"""
+Satunnaistettu differentiaalitestaus kaikille hakualgoritmeille.
+
+Yksikkötestit käyttävät pieniä käsin tehtyjä ruudukoita. Tämä moduuli
+luo siemenestä satunnaisia karttoja (map_generators) ja kyselyitä, ajaa
+jokaisen algoritmin jokaiselle kyselylle ja tarkistaa, että
+
+- reitti löytyy täsmälleen silloin, kun maaliin on reitti
+- reitti alkaa lähdöstä, päättyy maaliin ja on laillinen (path_validation)
+- reitin octile-pituus on optimaalinen
+
+Optimaalinen pituus otetaan virtauskentästä (flow_field), joka laskee
+etäisyydet Bellman-Ford-aaltorintamalla eikä jaa koodia hakualgoritmien
+kanssa. Kaikki algoritmit olettavat saman liikkumismallin kuin
+astar.get_neighbors, joten tulosten pitää täsmätä.
+
+Epäonnistunut tapaus pienennetään: ruudukosta poistetaan rivejä ja
+sarakkeita ja esteitä niin kauan kuin virhe toistuu. Tuloksena on pieni
+ruudukko, jonka voi kopioida suoraan yksikkötestiksi. Samalla mitataan
+jokaisen algoritmin kyselyajat, joten oikeellisuus ja nopeus seurataan
+samalla ajolla.
+
+Käyttö: python fuzz.py --maps 200 --queries 20 --seed 1
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from astar import AStar
+from benchmark import summarize, time_query
+from dead_ends import DeadEndIndex
+from flow_field import FlowField
+from goal_bounding import GoalBounds
+from jps import JPS
+from map_generators import GENERATORS, random_queries
+from path_result import path_cost
+from path_validation import describe_flags, pack_paths, validate_paths
+from prefilter import QueryPrefilter
+from rsr import RSR
+
+# Sallittu ero optimaaliseen pituuteen
+TOLERANCE = 1e-6
+
+# Testattavat algoritmit; jokainen rakennetaan ruudukosta, esikäsittely mukaan lukien.
+# Theta* ei ole mukana, koska sen reitit eivät kulje ruudukon askelin.
+ENGINES = {
+    "A*": AStar,
+    "JPS": JPS,
+    "RSR": RSR,
+    "A*+GB": lambda grid: AStar(grid, goal_bounds=GoalBounds.build(grid, max_workers=1)),
+    "JPS+GB": lambda grid: JPS(grid, goal_bounds=GoalBounds.build(grid, max_workers=1)),
+    "A*+umpikujat": lambda grid: AStar(grid, dead_ends=DeadEndIndex.build(grid)),
+    "JPS+umpikujat": lambda grid: JPS(grid, dead_ends=DeadEndIndex.build(grid)),
+    "Esisuodatin": lambda grid: QueryPrefilter(grid, AStar(grid)),
+}
+
+
+def reference_cost(grid, start, goal):
+    """
+    Laskee lyhimmän reitin pituuden virtauskentällä.
+
+    Args:
+        grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+        start (tuple): Lähtösolu (x, y)
+        goal (tuple): Maalisolu (x, y)
+
+    Returns:
+        float: Lyhimmän reitin pituus, tai inf jos reittiä ei ole
+    """
+    return float(FlowField(grid, goal).distance[start])
+
+
+def check_path(grid, start, goal, path, expected):
+    """
+    Tarkistaa yhden algoritmin vastauksen.
+
+    Args:
+        grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+        start (tuple): Lähtösolu (x, y)
+        goal (tuple): Maalisolu (x, y)
+        path (list): Algoritmin palauttama reitti tai None
+        expected (float): Optimaalinen pituus, ks. reference_cost
+
+    Returns:
+        str or None: Virheen kuvaus, tai None jos vastaus on oikein
+    """
+    if path is None:
+        return f"reittiä ei löytynyt, optimaalinen pituus {expected:.4f}" if np.isfinite(expected) else None
+    if not np.isfinite(expected):
+        return "reitti löytyi, vaikka maaliin ei pääse"
+    if tuple(path[0]) != tuple(start) or tuple(path[-1]) != tuple(goal):
+        return f"reitti kulkee {tuple(path[0])} -> {tuple(path[-1])}"
+    points, offsets = pack_paths([path])
+    flags = int(validate_paths(points, offsets, grid)["flags"][0])
+    if flags:
+        return f"laiton reitti: {describe_flags(flags)}"
+    cost = path_cost(path)
+    if abs(cost - expected) > TOLERANCE:
+        return f"pituus {cost:.4f}, optimaalinen {expected:.4f}"
+    return None
+
+
+def find_failure(engine_factory, grid, start, goal):
+    """
+    Rakentaa algoritmin ruudukolle ja tarkistaa yhden kyselyn.
+
+    Args:
+        engine_factory (callable): Funktio, joka rakentaa algoritmin ruudukosta
+        grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+        start (tuple): Lähtösolu (x, y)
+        goal (tuple): Maalisolu (x, y)
+
+    Returns:
+        str or None: Virheen kuvaus, tai None jos vastaus on oikein
+    """
+    try:
+        path = engine_factory(grid).find_path(start, goal)[0]
+    except Exception as error:  # pylint: disable=broad-except
+        return f"poikkeus {type(error).__name__}: {error}"
+    return check_path(grid, start, goal, path, reference_cost(grid, start, goal))
+
+
+def shrink(engine_factory, grid, start, goal):
+    """
+    Pienentää epäonnistuneen tapauksen.
+
+    Ruudukosta poistetaan rivejä ja sarakkeita (paitsi lähdön ja maalin
+    rivit ja sarakkeet) ja sen jälkeen esteitä yksi kerrallaan, kunhan
+    find_failure palauttaa edelleen virheen. Kierroksia jatketaan, kunnes
+    mikään poisto ei enää onnistu.
+
+    Args:
+        engine_factory (callable): Funktio, joka rakentaa algoritmin ruudukosta
+        grid (numpy.ndarray): Epäonnistuneen tapauksen ruudukko
+        start (tuple): Lähtösolu (x, y)
+        goal (tuple): Maalisolu (x, y)
+
+    Returns:
+        tuple: (ruudukko, lähtö, maali, virheen kuvaus) pienennettynä
+    """
+    grid = np.array(grid)
+    failure = find_failure(engine_factory, grid, start, goal)
+    if failure is None:
+        raise ValueError("Tapaus ei epäonnistu")
+
+    changed = True
+    while changed:
+        changed = False
+        for axis in (0, 1):
+            index = grid.shape[axis] - 1
+            while index >= 0:
+                if index in (start[axis], goal[axis]) or grid.shape[axis] == 1:
+                    index -= 1
+                    continue
+                candidate = np.delete(grid, index, axis=axis)
+                new_start = tuple(v - (i == axis and v > index) for i, v in enumerate(start))
+                new_goal = tuple(v - (i == axis and v > index) for i, v in enumerate(goal))
+                result = find_failure(engine_factory, candidate, new_start, new_goal)
+                if result is not None:
+                    grid, start, goal, failure = candidate, new_start, new_goal, result
+                    changed = True
+                index -= 1
+
+        for x, y in np.argwhere(grid == 1):
+            grid[x, y] = 0
+            result = find_failure(engine_factory, grid, start, goal)
+            if result is None:
+                grid[x, y] = 1
+            else:
+                failure = result
+                changed = True
+    return grid, start, goal, failure
+
+
+def format_case(grid, start, goal):
+    """
+    Muuttaa tapauksen tekstiksi, jossa S = lähtö, G = maali, # = este ja . = vapaa.
+
+    Args:
+        grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+        start (tuple): Lähtösolu (x, y)
+        goal (tuple): Maalisolu (x, y)
+
+    Returns:
+        str: Ruudukko riveittäin
+    """
+    chars = np.where(np.asarray(grid) == 1, "#", ".").astype(object)
+    chars[start] = "S"
+    chars[goal] = "G" if tuple(goal) != tuple(start) else "S"
+    return "\n".join("".join(row) for row in chars)
+
+
+def parse_case(text):
+    """
+    Lukee format_case-funktion tuottaman tekstin.
+
+    Args:
+        text (str): Ruudukko riveittäin
+
+    Returns:
+        tuple: (ruudukko, lähtö, maali)
+    """
+    rows = [row.strip() for row in text.strip().splitlines()]
+    grid = np.array([[char == "#" for char in row] for row in rows], dtype=int)
+    cells = {char: (x, y) for x, row in enumerate(rows) for y, char in enumerate(row) if char in "SG"}
+    return grid, cells["S"], cells.get("G", cells["S"])
+
+
+def random_map(rng, min_size, max_size):
+    """
+    Arpoo kartan generaattorin, koon, tiheyden ja siemenen.
+
+    Args:
+        rng (numpy.random.Generator): Satunnaislukugeneraattori
+        min_size (int): Pienin sivun pituus
+        max_size (int): Suurin sivun pituus
+
+    Returns:
+        tuple: (generaattorin nimi, ruudukko)
+    """
+    name = str(rng.choice(list(GENERATORS)))
+    size = (int(rng.integers(min_size, max_size + 1)), int(rng.integers(min_size, max_size + 1)))
+    density = float(rng.uniform(0.0, 0.45 if name == "random" else 1.0))
+    seed = int(rng.integers(2 ** 31))
+    if name == "rooms":
+        grid = GENERATORS[name](size, density, seed, room_size=int(rng.integers(3, 9)))
+    else:
+        grid = GENERATORS[name](size, density, seed)
+    return name, np.asarray(grid, dtype=int)
+
+
+def run_fuzz(maps=50, queries=10, seed=0, engines=None, min_size=4, max_size=24,
+             max_failures=5, minimize=True):
+    """
+    Ajaa differentiaalitestin.
+
+    Jokaisella kartalla jokainen algoritmi rakennetaan kerran ja ajaa samat
+    kyselyt. Kyselyiden ajat mitataan yhdellä ajolla, eikä virtauskentän
+    laskenta kuulu niihin.
+
+    Args:
+        maps (int, optional): Karttojen määrä
+        queries (int, optional): Kyselyiden määrä karttaa kohti
+        seed (int, optional): Siemen, josta kaikki kartat ja kyselyt johdetaan
+        engines (dict, optional): {nimi: algoritmin rakentaja}. Oletuksena ENGINES.
+        min_size (int, optional): Karttojen pienin sivun pituus
+        max_size (int, optional): Karttojen suurin sivun pituus
+        max_failures (int, optional): Lopetetaan, kun näin monta virhettä on löytynyt
+        minimize (bool, optional): Pienennetäänkö virheet, ks. shrink
+
+    Returns:
+        dict:
+            failures (list): Virheet sanakirjoina: engine, generator, map, grid, start, goal, error
+            timings (dict): {nimi: summarize-funktion tilastot kyselyajoista}
+            queries (int): Tarkistettujen kyselyiden määrä algoritmia kohti
+    """
+    engines = ENGINES if engines is None else engines
+    rng = np.random.default_rng(seed)
+    samples = {name: [] for name in engines}
+    failures = []
+    checked = 0
+
+    for map_index in range(maps):
+        generator, grid = random_map(rng, min_size, max_size)
+        pairs = random_queries(grid, queries, int(rng.integers(2 ** 31)))
+        expected = [reference_cost(grid, start, goal) for start, goal in pairs]
+        checked += len(pairs)
+        for name, factory in engines.items():
+            # Esikäsittelyn poikkeus kirjataan kartan jokaiselle kyselylle
+            try:
+                engine, build_error = factory(grid), None
+            except Exception as error:  # pylint: disable=broad-except
+                engine, build_error = None, f"poikkeus {type(error).__name__}: {error}"
+            for (start, goal), cost in zip(pairs, expected):
+                if build_error is not None:
+                    error_text = build_error
+                else:
+                    try:
+                        (path, _, _), elapsed = time_query(lambda: engine.find_path(start, goal), 0, 1)
+                    except Exception as error:  # pylint: disable=broad-except
+                        error_text = f"poikkeus {type(error).__name__}: {error}"
+                    else:
+                        samples[name].extend(elapsed)
+                        error_text = check_path(grid, start, goal, path, cost)
+                if error_text is None:
+                    continue
+                failure = {"engine": name, "generator": generator, "map": map_index,
+                           "grid": grid, "start": start, "goal": goal, "error": error_text}
+                if minimize:
+                    failure["grid"], failure["start"], failure["goal"], failure["error"] = shrink(
+                        factory, grid, start, goal)
+                failures.append(failure)
+                if len(failures) >= max_failures:
+                    return {"failures": failures, "timings": _timings(samples), "queries": checked}
+    return {"failures": failures, "timings": _timings(samples), "queries": checked}
+
+
+def _timings(samples):
+    """Laskee algoritmeittain kyselyaikojen tilastot."""
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def print_report(result):
+    """
+    Tulostaa virheet pienennettyine ruudukkoineen ja algoritmien kyselyajat.
+
+    Args:
+        result (dict): run_fuzz-funktion tulos
+    """
+    for failure in result["failures"]:
+        print(f"{failure['engine']}: {failure['error']} "
+              f"(kartta {failure['map']}, {failure['generator']}, "
+              f"{failure['start']} -> {failure['goal']})")
+        print(format_case(failure["grid"], failure["start"], failure["goal"]))
+        print()
+
+    print(f"{'Algoritmi':<15}{'Kyselyt':<9}{'Mediaani (µs)':<15}{'p95 (µs)':<10}")
+    for name, stats in result["timings"].items():
+        if stats["n"] == 0:
+            print(f"{name:<15}{0:<9}{'-':<15}{'-':<10}")
+            continue
+        print(f"{name:<15}{stats['n']:<9}{stats['median_ns'] / 1e3:<15.1f}{stats['p95_ns'] / 1e3:<10.1f}")
+    print(f"{result['queries']} kyselyä algoritmia kohti, {len(result['failures'])} virhettä")
+
+
+def main(argv=None):
+    """
+    Komentorivikäyttö.
+
+    Returns:
+        int: 0 jos virheitä ei löytynyt, muuten 1
+    """
+    parser = argparse.ArgumentParser(description="Hakualgoritmien differentiaalitestaus")
+    parser.add_argument("--maps", type=int, default=50, help="Karttojen määrä")
+    parser.add_argument("--queries", type=int, default=10, help="Kyselyt karttaa kohti")
+    parser.add_argument("--seed", type=int, default=0, help="Satunnaislukujen siemen")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), help="Testattavat algoritmit")
+    parser.add_argument("--min-size", type=int, default=4, help="Karttojen pienin sivun pituus")
+    parser.add_argument("--max-size", type=int, default=24, help="Karttojen suurin sivun pituus")
+    parser.add_argument("--max-failures", type=int, default=5, help="Lopeta näin monen virheen jälkeen")
+    parser.add_argument("--no-shrink", action="store_true", help="Älä pienennä virheellisiä tapauksia")
+    args = parser.parse_args(argv)
+
+    engines = ENGINES if args.engines is None else {name: ENGINES[name] for name in args.engines}
+    result = run_fuzz(args.maps, args.queries, args.seed, engines, args.min_size, args.max_size,
+                      args.max_failures, not args.no_shrink)
+    print_report(result)
+    return 1 if result["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""
+Goal bounding -esikäsittely A*- ja JPS-hakujen seuraajien karsintaan.
+
+Jokaiselle vapaalle solulle ja jokaiselle kahdeksasta lähtösuunnasta
+tallennetaan suorakulmio, joka rajaa kaikki ne solut, joihin jokin optimaalinen
+reitti lähtee kyseiseen suuntaan. Haku voi ohittaa seuraajan, jonka
+suorakulmio ei sisällä maalia, koska mikään optimaalinen reitti ei kulje sitä
+kautta. Taulukot lasketaan yhdellä Dijkstran haulla jokaisesta solusta, ja
+haut jaetaan prosessipoolin työntekijöille.
+
+Esikäsittely olettaa saman liikkumismallin kuin astar.get_neighbors:
+kahdeksan suuntaa, ortogonaalinen siirtymä maksaa 1 ja diagonaalinen √2.
+"""
+
+import heapq
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from grid_preprocessing import DIRECTIONS, free_cell_graph
+
+DIRECTION_INDEX = {direction: i for i, direction in enumerate(DIRECTIONS)}
+
+# Tyhjän suorakulmion arvot: minimi on suurempi kuin maksimi
+EMPTY_MIN = np.iinfo(np.int16).max
+EMPTY_MAX = -1
+
+# Liukulukujen yhtäsuuruuden toleranssi tasapelireittejä varten
+EPSILON = 1e-9
+
+# Työntekijäprosessin ruudukkograafi, asetetaan _init_worker-funktiossa
+_worker_graph = None
+
+
+def _first_move_masks(source, neighbors):
+    """
+    Dijkstran haku, joka laskee jokaiselle solulle optimaalisten lähtösuuntien bittimaskin.
+
+    Kun solu saavutetaan usealla yhtä lyhyellä reitillä, maskiin yhdistetään
+    kaikkien reittien lähtösuunnat.
+
+    Args:
+        source (int): Lähtösolun indeksi
+        neighbors (list): Naapurilistat, ks. grid_preprocessing.free_cell_graph
+
+    Returns:
+        list: Bittimaski jokaiselle solulle (0 jos solua ei saavuteta)
+    """
+    count = len(neighbors)
+    dist = [math.inf] * count
+    masks = [0] * count
+    closed = [False] * count
+    dist[source] = 0.0
+    closed[source] = True
+
+    open_set = []
+    for target, cost, d in neighbors[source]:
+        dist[target] = cost
+        masks[target] = 1 << d
+        heapq.heappush(open_set, (cost, target))
+
+    while open_set:
+        current_dist, current = heapq.heappop(open_set)
+        if closed[current]:
+            continue
+        closed[current] = True
+        current_mask = masks[current]
+
+        for target, cost, _ in neighbors[current]:
+            if closed[target]:
+                continue
+            tentative = current_dist + cost
+            if tentative < dist[target] - EPSILON:
+                dist[target] = tentative
+                masks[target] = current_mask
+                heapq.heappush(open_set, (tentative, target))
+            elif tentative <= dist[target] + EPSILON:
+                masks[target] |= current_mask
+
+    return masks
+
+
+def _bounds_for_source(source, cells, neighbors):
+    """
+    Laskee yhden lähtösolun suorakulmiot kaikille kahdeksalle suunnalle.
+
+    Returns:
+        numpy.ndarray: int16-taulukko muodossa (8, 4): (min_x, min_y, max_x, max_y)
+    """
+    masks = np.array(_first_move_masks(source, neighbors), dtype=np.uint8)
+    bounds = np.empty((len(DIRECTIONS), 4), dtype=np.int16)
+    bounds[:, :2] = EMPTY_MIN
+    bounds[:, 2:] = EMPTY_MAX
+    for d in range(len(DIRECTIONS)):
+        reached = cells[(masks & (1 << d)) != 0]
+        if len(reached):
+            bounds[d, :2] = reached.min(axis=0)
+            bounds[d, 2:] = reached.max(axis=0)
+    return bounds
+
+
+def _init_worker(grid):
+    """Prosessipoolin alustus: muodostaa graafin kerran jokaisessa työntekijässä."""
+    global _worker_graph
+    _worker_graph = free_cell_graph(grid)
+
+
+def _bounds_for_chunk(sources):
+    """Prosessipoolin tehtävä: laskee suorakulmiot joukolle lähtösoluja."""
+    cells, neighbors = _worker_graph
+    return np.stack([_bounds_for_source(source, cells, neighbors) for source in sources])
+
+
+def build_goal_bounds(grid, max_workers=None, chunk_size=64):
+    """
+    Laskee goal bounding -taulukon koko ruudukolle.
+
+    Args:
+        grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+        max_workers (int, optional): Prosessien määrä. 1 laskee ilman prosessipoolia.
+        chunk_size (int, optional): Yhdelle tehtävälle annettavien lähtösolujen määrä
+
+    Returns:
+        numpy.ndarray: int16-taulukko muodossa (rivit, sarakkeet, 8, 4).
+            Esteiden ja saavuttamattomien suuntien suorakulmiot ovat tyhjiä.
+    """
+    grid = np.asarray(grid)
+    rows, cols = grid.shape
+    bounds = np.empty((rows, cols, len(DIRECTIONS), 4), dtype=np.int16)
+    bounds[..., :2] = EMPTY_MIN
+    bounds[..., 2:] = EMPTY_MAX
+
+    cells, neighbors = free_cell_graph(grid)
+    sources = list(range(len(cells)))
+    chunks = [sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size)]
+
+    if max_workers == 1 or len(chunks) <= 1:
+        results = [np.stack([_bounds_for_source(s, cells, neighbors) for s in chunk])
+                   for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(grid,)) as executor:
+            results = list(executor.map(_bounds_for_chunk, chunks))
+
+    for chunk, chunk_bounds in zip(chunks, results):
+        chunk_cells = cells[chunk]
+        bounds[chunk_cells[:, 0], chunk_cells[:, 1]] = chunk_bounds
+    return bounds
+
+
+class GoalBounds:
+    """
+    Goal bounding -taulukko ja sen kyselyt.
+
+    Attributes:
+        bounds (numpy.ndarray): int16-taulukko muodossa (rivit, sarakkeet, 8, 4)
+    """
+
+    def __init__(self, bounds):
+        """
+        Args:
+            bounds (numpy.ndarray): build_goal_bounds-funktion tuottama taulukko
+        """
+        self.bounds = bounds
+
+    @classmethod
+    def build(cls, grid, max_workers=None):
+        """
+        Laskee taulukon annetulle ruudukolle.
+
+        Args:
+            grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+            max_workers (int, optional): Prosessien määrä
+
+        Returns:
+            GoalBounds: Valmis taulukko
+        """
+        return cls(build_goal_bounds(grid, max_workers=max_workers))
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Lataa taulukon .npy-tiedostosta.
+
+        Args:
+            filename (str): Tiedoston nimi
+
+        Returns:
+            GoalBounds: Ladattu taulukko
+        """
+        return cls(np.load(filename))
+
+    def save(self, filename):
+        """
+        Tallentaa taulukon .npy-tiedostoon.
+
+        Args:
+            filename (str): Tiedoston nimi
+        """
+        np.save(filename, self.bounds)
+
+    def allows(self, pos, direction, goal):
+        """
+        Tarkistaa voiko optimaalinen reitti maaliin lähteä annettuun suuntaan.
+
+        Args:
+            pos (tuple): Nykyinen positio (x, y)
+            direction (tuple): Lähtösuunta (dx, dy)
+            goal (tuple): Maalisolmu (x, y)
+
+        Returns:
+            bool: True jos maali on suunnan suorakulmion sisällä
+        """
+        min_x, min_y, max_x, max_y = self.bounds[pos[0], pos[1], DIRECTION_INDEX[direction]].tolist()
+        return min_x <= goal[0] <= max_x and min_y <= goal[1] <= max_y
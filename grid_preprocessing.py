@@ -0,0 +1,146 @@
+"""
+Ruudukon esikäsittely hakualgoritmeja varten.
+
+Esikäsitelty ruudukko reunustetaan yhden solun levyisellä esteellä, jolloin
+hyppyjen ei tarvitse tarkistaa ruudukon rajoja. Lisäksi ruudukosta pidetään
+transponoitu, muistissa yhtenäinen kopio: pystysuuntaiset hypyt kulkevat
+tällöin yhtenäistä riviä pitkin sen sijaan, että jokainen askel hyppäisi
+kokonaisen rivin yli muistissa.
+
+Jokaiselle ortogonaaliselle suunnalle lasketaan valmiiksi pysähtymistaulukko,
+joka on tosi esteissä ja soluissa, joissa on pakotettu naapuri. Suora hyppy
+selviää tällöin yhdellä numpy.argmax-kutsulla solu kerrallaan etenevän
+Python-silmukan sijaan.
+"""
+
+import math
+
+import numpy as np
+
+# Kahdeksan liikesuuntaa samassa järjestyksessä kuin astar.get_neighbors
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1),
+              (-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+
+class PreprocessedGrid:
+    """
+    Reunustettu esteruudukko ja sen transponoitu kopio.
+
+    Reunustetussa ruudukossa solu (x, y) on indeksissä (x + 1, y + 1).
+
+    Attributes:
+        rows (int): Alkuperäisen ruudukon rivien määrä
+        cols (int): Alkuperäisen ruudukon sarakkeiden määrä
+        blocked (numpy.ndarray): Reunustettu uint8-taulukko (1 = este), C-järjestyksessä
+        blocked_t (numpy.ndarray): blocked-taulukon transponoitu yhtenäinen kopio
+        stop (dict): Suunnittaiset pysähtymistaulukot {(dx, dy): bool-taulukko}.
+            Vaakasuunnat ovat blocked-taulukon, pystysuunnat blocked_t-taulukon muodossa.
+    """
+
+    def __init__(self, grid):
+        """
+        Esikäsittelee ruudukon.
+
+        Args:
+            grid (list or numpy.ndarray): 2D ruudukko jossa 0 = vapaa, muu = este
+        """
+        grid = np.asarray(grid)
+        self.rows, self.cols = grid.shape
+        self.blocked = np.ones((self.rows + 2, self.cols + 2), dtype=np.uint8)
+        self.blocked[1:-1, 1:-1] = grid != 0
+        self.blocked_t = np.ascontiguousarray(self.blocked.T)
+        self.stop = {
+            (0, 1): _stop_table(self.blocked, 1),
+            (0, -1): _stop_table(self.blocked, -1),
+            (1, 0): _stop_table(self.blocked_t, 1),
+            (-1, 0): _stop_table(self.blocked_t, -1),
+        }
+
+    def lines(self, pos, direction):
+        """
+        Palauttaa ortogonaalisen liikkeen esterivin ja pysähtymisrivin.
+
+        Vaakasuuntaisille liikkeille (dx = 0) rivit ovat reunustetun ruudukon
+        rivejä, pystysuuntaisille (dy = 0) transponoidun kopion rivejä.
+
+        Args:
+            pos (tuple): Positio (x, y) alkuperäisen ruudukon koordinaateissa
+            direction (tuple): Ortogonaalinen suunta (dx, dy)
+
+        Returns:
+            tuple: (esterivi, pysähtymisrivi, position indeksi riveillä)
+        """
+        x, y = pos
+        if direction[0] != 0:
+            return self.blocked_t[y + 1], self.stop[direction][y + 1], x + 1
+        return self.blocked[x + 1], self.stop[direction][x + 1], y + 1
+
+    def scan(self, pos, direction):
+        """
+        Etsii ortogonaalisen hypyn pysähtymiskohdan yhdellä numpy-kutsulla.
+
+        Args:
+            pos (tuple): Aloituspositio (x, y), jonka on oltava vapaa
+            direction (tuple): Ortogonaalinen suunta (dx, dy)
+
+        Returns:
+            int: k > 0 hyppypiste k askeleen päässä, -k este k askeleen päässä
+        """
+        line, stop_line, i = self.lines(pos, direction)
+        if direction[0] + direction[1] > 0:
+            steps = int(stop_line[i + 1:].argmax()) + 1
+            return -steps if line[i + steps] else steps
+        steps = int(stop_line[i - 1::-1].argmax()) + 1
+        return -steps if line[i - steps] else steps
+
+
+def _stop_table(blocked, step):
+    """
+    Laskee pysähtymistaulukon liikkeelle reunustetun taulukon rivejä pitkin.
+
+    Solussa on pakotettu naapuri, jos viereisen rivin solu on este mutta
+    sen seuraaja liikesuunnassa on vapaa.
+
+    Args:
+        blocked (numpy.ndarray): Reunustettu estetaulukko (1 = este)
+        step (int): Liikesuunta rivillä, 1 tai -1
+
+    Returns:
+        numpy.ndarray: bool-taulukko, tosi esteissä ja pakotetuissa soluissa
+    """
+    blocked = blocked.astype(bool)
+    here = blocked[:, 1:-1]
+    ahead = blocked[:, 2:] if step > 0 else blocked[:, :-2]
+    side_forced = here & ~ahead
+
+    stop = blocked.copy()
+    stop[1:-1, 1:-1] |= side_forced[:-2] | side_forced[2:]
+    return stop
+
+
+def free_cell_graph(grid):
+    """
+    Muodostaa ruudukon vapaista soluista naapurilistat.
+
+    Liikkumismalli on sama kuin astar.get_neighbors: kahdeksan suuntaa,
+    ortogonaalinen siirtymä maksaa 1 ja diagonaalinen √2.
+
+    Args:
+        grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+
+    Returns:
+        tuple: (vapaiden solujen koordinaatit (N, 2) -taulukkona,
+                naapurilistat muodossa [(naapurin indeksi, hinta, suunnan indeksi), ...])
+    """
+    cells = np.argwhere(np.asarray(grid) == 0)
+    index = {(int(x), int(y)): i for i, (x, y) in enumerate(cells)}
+
+    neighbors = []
+    for x, y in index:
+        edges = []
+        for d, (dx, dy) in enumerate(DIRECTIONS):
+            target = index.get((x + dx, y + dy))
+            if target is not None:
+                edges.append((target, math.sqrt(2) if dx and dy else 1.0, d))
+        neighbors.append(edges)
+    return cells, neighbors
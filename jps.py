@@ -1,5 +1,9 @@
 import heapq
 import math
+import numpy as np
+from grid_preprocessing import PreprocessedGrid
+from path_result import PathResult
+from search_counters import SearchCounters
 
 # JPS (Jump Point Search) algoritmi
 
@@ -186,7 +190,122 @@ def has_forced_neighbors(pos, direction, grid):
     """
     return len(get_forced_neighbors(pos, direction, grid)) > 0
 
-def jump(start_pos, direction, goal, grid):
+# Ortogonaalisten suuntien indeksit hyppyvälimuistin taulukossa
+ORTHOGONAL_DIRECTIONS = {(-1, 0): 0, (1, 0): 1, (0, -1): 2, (0, 1): 3}
+
+
+class JumpCache:
+    """
+    Tavoitteesta riippumaton välimuisti ortogonaalisille hypyille.
+    
+    Jokaiselle (solu, suunta) -parille tallennetaan, kuinka monen askeleen
+    päässä suoran hypyn pysähtymiskohta on. Positiivinen arvo k tarkoittaa
+    hyppypistettä k askeleen päässä, negatiivinen arvo -k estettä k askeleen
+    päässä ja 0 vielä laskematonta tulosta. Maalin tarkistus tehdään erikseen
+    vertaamalla maalin riviä tai saraketta hypyn suoraan, joten sama tulos
+    kelpaa kaikille hauille. Taulukko täyttyy laiskasti hakujen edetessä.
+    
+    Attributes:
+        grid (list): 2D ruudukko jossa 0 = vapaa, 1 = este
+        preprocessed (PreprocessedGrid): Reunustettu ruudukko ja sen transponoitu kopio
+        table (numpy.ndarray): int32-taulukko muodossa (4, rivit, sarakkeet)
+    """
+
+    def __init__(self, grid):
+        """
+        Alustaa tyhjän välimuistin annetulle ruudukolle.
+        
+        Args:
+            grid (list): 2D ruudukko jossa 0 = vapaa, 1 = este
+        """
+        self.grid = grid
+        self.preprocessed = PreprocessedGrid(grid)
+        self.table = np.zeros((4, len(grid), len(grid[0])), dtype=np.int32)
+
+    def clear(self):
+        """Tyhjentää lasketut hypyt. Esikäsitelty ruudukko säilyy ennallaan."""
+        self.table.fill(0)
+
+    def invalidate(self, grid=None):
+        """
+        Tyhjentää välimuistin. Kutsuttava aina kun ruudukko muuttuu.
+        
+        Args:
+            grid (list, optional): Uusi ruudukko. Oletuksena nykyinen ruudukko.
+        """
+        if grid is not None and (len(grid), len(grid[0])) != self.table.shape[1:]:
+            self.table = np.zeros((4, len(grid), len(grid[0])), dtype=np.int32)
+        else:
+            self.table.fill(0)
+        if grid is not None:
+            self.grid = grid
+        self.preprocessed = PreprocessedGrid(self.grid)
+
+    def scan(self, pos, direction):
+        """
+        Palauttaa ortogonaalisen hypyn pysähtymiskohdan etäisyyden koodattuna.
+        
+        Laskematon tulos selvitetään yhdellä vektorisoidulla haulla, ja tulos
+        tallennetaan samalla kaikille matkan varrella oleville vapaille soluille.
+        
+        Args:
+            pos (tuple): Aloituspositio (x, y)
+            direction (tuple): Ortogonaalinen suunta (dx, dy)
+        
+        Returns:
+            int: k > 0 hyppypiste k askeleen päässä, -k este k askeleen päässä
+        """
+        d = ORTHOGONAL_DIRECTIONS[direction]
+        dx, dy = direction
+        x, y = pos
+        cached = self.table[d, x, y]
+        if cached != 0:
+            return int(cached)
+
+        # Pysähtymiskohta haetaan esilasketusta taulukosta, pystysuunnassa transponoidulta kopiolta
+        result = self.preprocessed.scan(pos, direction)
+        steps = abs(result)
+
+        # Sama pysähtymiskohta pätee jokaiselle matkan varrella olevalle solulle
+        offsets = np.arange(steps)
+        values = result - offsets if result > 0 else result + offsets
+        if dx != 0:
+            self.table[d, x + offsets * dx, y] = values
+        else:
+            self.table[d, x, y + offsets * dy] = values
+        return result
+
+    def jump(self, pos, direction, goal):
+        """
+        Ortogonaalinen hyppy välimuistin avulla.
+        
+        Palauttaa saman tuloksen kuin jump-funktio ortogonaalisille suunnille.
+        
+        Args:
+            pos (tuple): Aloituspositio (x, y)
+            direction (tuple): Ortogonaalinen suunta (dx, dy)
+            goal (tuple): Maalisolmu (x, y)
+        
+        Returns:
+            tuple or None: Hyppypisteen koordinaatit tai None jos hyppypistettä ei löydy
+        """
+        steps = self.scan(pos, direction)
+        dx, dy = direction
+
+        # Maali löytyy, jos se on samalla suoralla ennen pysähtymiskohtaa
+        limit = steps if steps > 0 else -steps - 1
+        if dx != 0:
+            if goal[1] == pos[1] and 0 < (goal[0] - pos[0]) * dx <= limit:
+                return goal
+        elif goal[0] == pos[0] and 0 < (goal[1] - pos[1]) * dy <= limit:
+            return goal
+
+        if steps > 0:
+            return (pos[0] + steps * dx, pos[1] + steps * dy)
+        return None
+
+
+def jump(start_pos, direction, goal, grid, cache=None, counters=None):
     """
     Suorittaa hyppäämisen annettuun suuntaan kunnes löytyy hyppypiste, maali tai este.
     
@@ -200,16 +319,28 @@ def jump(start_pos, direction, goal, grid):
         direction (tuple): Hyppäämissuunta (dx, dy)
         goal (tuple): Maalisolmu (x, y)
         grid (list): 2D ruudukko
+        cache (JumpCache, optional): Välimuisti ortogonaalisille hypyille
+        counters (SearchCounters, optional): Laskurit hyppykutsuille ja läpikäydyille soluille
     
     Returns:
         tuple or None: Hyppypisteen koordinaatit tai None jos hyppypistettä ei löydy
     """
     current = start_pos
     dx, dy = direction
+    if counters is not None:
+        counters.jump_calls += 1
+    
+    if cache is not None and (dx == 0 or dy == 0):
+        if counters is not None:
+            # Välimuistista luettu hyppy kattaa solut pysähtymiskohtaan asti
+            counters.cells_scanned += abs(cache.scan(start_pos, direction))
+        return cache.jump(start_pos, direction, goal)
     
     while True:
         # Siirry seuraavaan positioon
         current = (current[0] + dx, current[1] + dy)
+        if counters is not None:
+            counters.cells_scanned += 1
         
         # Tarkista onko positio kelvollinen
         if not is_valid(current, grid):
@@ -220,20 +351,23 @@ def jump(start_pos, direction, goal, grid):
             return current
         
         # Tarkista onko pakotettuja naapureita
+        if counters is not None:
+            counters.forced_checks += 1
         if has_forced_neighbors(current, direction, grid):
             return current
         
         # Diagonaalinen liike: tarkista ortogonaalisia suuntia
         if dx != 0 and dy != 0:
             # Tarkista horisontaalinen suunta
-            if jump(current, (dx, 0), goal, grid) is not None:
+            if jump(current, (dx, 0), goal, grid, cache, counters) is not None:
                 return current
             
             # Tarkista vertikaalinen suunta
-            if jump(current, (0, dy), goal, grid) is not None:
+            if jump(current, (0, dy), goal, grid, cache, counters) is not None:
                 return current
             
-def identify_successors(pos, goal, grid, parent=None):
+def identify_successors(pos, goal, grid, parent=None, cache=None, goal_bounds=None, allowed=None,
+                        counters=None):
     """
     Tunnistaa ja palauttaa kaikki hyppypiste-seuraajat annetulle positiolle.
     
@@ -245,18 +379,28 @@ def identify_successors(pos, goal, grid, parent=None):
         goal (tuple): Maalisolmu (x, y)
         grid (list): 2D ruudukko
         parent (tuple, optional): Vanhemman positio polunhakua varten
+        cache (JumpCache, optional): Välimuisti ortogonaalisille hypyille
+        goal_bounds (GoalBounds, optional): Goal bounding -taulukko. Suuntiin, joiden
+            suorakulmio ei sisällä maalia, ei hypätä lainkaan.
+        allowed (function, optional): Hakukohtainen suodatin pos -> bool, ks.
+            DeadEndIndex.query_filter. Hyppypisteet, joille se palauttaa False, ohitetaan.
+        counters (SearchCounters, optional): Laskurit naapureille ja hypyille
     
     Returns:
         list: Lista hyppypiste-seuraajista
     """
     successors = []
     neighbors = get_neighbors(pos, grid, parent)
+    if counters is not None:
+        counters.neighbor_checks += len(neighbors)
     
     for neighbor in neighbors:
         direction = get_direction(pos, neighbor)
-        jump_point = jump(pos, direction, goal, grid)
+        if goal_bounds is not None and not goal_bounds.allows(pos, direction, goal):
+            continue
+        jump_point = jump(pos, direction, goal, grid, cache, counters)
         
-        if jump_point is not None:
+        if jump_point is not None and (allowed is None or allowed(jump_point)):
             successors.append(jump_point)
     
     return successors
@@ -269,21 +413,57 @@ class JPS:
     Se vähentää tutkittavien solmujen määrää tunnistamalla "hyppypisteet"
     ja hyppäämällä suoraan niihin välitutkimatta kaikkia solmuja.
     
+    Symmetrioiden karsinta edellyttää, että kaikkien vapaiden solujen
+    kustannus on sama. Maastokustannuksia sisältävillä kartoilla JPS:lle
+    annetaan map_loader.cost_grid_to_obstacles-funktion tuottama esteruudukko.
+    
     Attributes:
         grid (list): 2D ruudukko jossa 0 = vapaa, 1 = este
         heuristic (function): Heuristiikkafunktio etäisyyden arvioimiseen
+        jump_cache (JumpCache): Hakujen välillä säilyvä ortogonaalisten hyppyjen välimuisti
+        goal_bounds (GoalBounds or None): Goal bounding -taulukko seuraajien karsintaan
+        dead_ends (DeadEndIndex or None): Umpikuja-alueiden indeksi hyppypisteiden karsintaan
+        g_score_size (int): Viimeisimmän haun g-arvotaulun koko muistinkäytön mittaamista varten
+        open_set_peak (int): Viimeisimmän haun avoimen joukon (keon) suurin koko
+        counters (SearchCounters or None): Viimeisimmän haun laskurit, tai None jos
+            instrumentointi ei ole käytössä
     """
  
-    def __init__(self, grid, heuristic=octile_distance):
+    def __init__(self, grid, heuristic=octile_distance, goal_bounds=None, dead_ends=None,
+                 instrument=False):
         """
         Alustaa JPS-algoritmin.
         
         Args:
             grid (list): 2D lista joka esittää ruudukkoa (0 = vapaa, 1 = este)
             heuristic (function, optional): Heuristiikkafunktio. Oletuksena octile_distance.
+            goal_bounds (GoalBounds, optional): Goal bounding -taulukko, ks. goal_bounding.
+            dead_ends (DeadEndIndex, optional): Umpikuja-alueiden indeksi, ks. dead_ends.
+            instrument (bool, optional): Kerätäänkö hauista laskurit, ks. search_counters.
         """
         self.grid = grid
         self.heuristic = heuristic
+        self.goal_bounds = goal_bounds
+        self.dead_ends = dead_ends
+        self.jump_cache = JumpCache(grid)
+        self.g_score_size = 0
+        self.open_set_peak = 0
+        self.counters = SearchCounters() if instrument else None
+
+    def set_grid(self, grid):
+        """
+        Vaihtaa ruudukon ja tyhjentää hyppyvälimuistin.
+        
+        Jos ruudukkoa muokataan paikallaan, kutsu set_grid samalla ruudukolla.
+        Vanhalle ruudukolle lasketut goal bounding- ja umpikujaindeksit poistetaan käytöstä.
+        
+        Args:
+            grid (list): Uusi 2D ruudukko (0 = vapaa, 1 = este)
+        """
+        self.grid = grid
+        self.jump_cache.invalidate(grid)
+        self.goal_bounds = None
+        self.dead_ends = None
 
     def find_path(self, start, goal):
         """
@@ -298,8 +478,14 @@ class JPS:
                 - path (list or None): Lista solmuista jotka muodostavat reitin, 
                   tai None jos reittiä ei löydy
                 - closed_set (set): Joukko tutkituista solmuista
-                - jump_points_explored (int): Tutkittujen hyppypisteiden määrä
+                - jump_points_explored (int): Tutkittujen hyppypisteiden määrä,
+                  sama kuin counters.successors
         """
+        self.g_score_size = 0
+        self.open_set_peak = 0
+        counters = self.counters
+        if counters is not None:
+            counters.reset()
         if not is_valid(start, self.grid) or not is_valid(goal, self.grid):
             return None, set(), 0
         
@@ -314,6 +500,9 @@ class JPS:
         f_score = {start: self.heuristic(start, goal)}
         closed_set = set()
         jump_points_explored = 0
+        open_peak = 1
+        
+        allowed = self.dead_ends.query_filter(start, goal) if self.dead_ends is not None else None
         
         # Pitää kirjaa siitä, mitkä solmut ovat open_set:ssä
         in_open_set = {start}
@@ -323,6 +512,8 @@ class JPS:
             in_open_set.discard(current)
             
             if current in closed_set:
+                if counters is not None:
+                    counters.stale_pops += 1
                 continue
             
             closed_set.add(current)
@@ -334,11 +525,16 @@ class JPS:
                     path.append(current)
                     current = came_from[current]
                 path.append(start)
+                self.g_score_size = len(g_score)
+                self.open_set_peak = open_peak
+                if counters is not None:
+                    self._count(counters, closed_set, open_set, jump_points_explored, True)
                 return path[::-1], closed_set, jump_points_explored
             
             # Hae seuraajat
             parent = came_from.get(current)
-            successors = identify_successors(current, goal, self.grid, parent)
+            successors = identify_successors(current, goal, self.grid, parent, self.jump_cache,
+                                             self.goal_bounds, allowed, counters)
             jump_points_explored += len(successors)
             
             for successor in successors:
@@ -355,5 +551,42 @@ class JPS:
                     if successor not in in_open_set:
                         heapq.heappush(open_set, (f_score[successor], successor))
                         in_open_set.add(successor)
+            # Keko kasvaa vain lisäyksissä, joten huippu nähdään laajennuksen jälkeen
+            if len(open_set) > open_peak:
+                open_peak = len(open_set)
         
-        return None, closed_set, jump_points_explored # Palautetaan None, jos reittiä ei löydy, ja suljettu joukko sekä hyppypisteiden määrä
\ No newline at end of file
+        self.g_score_size = len(g_score)
+        self.open_set_peak = open_peak
+        if counters is not None:
+            self._count(counters, closed_set, open_set, jump_points_explored, False)
+        return None, closed_set, jump_points_explored # Palautetaan None, jos reittiä ei löydy, ja suljettu joukko sekä hyppypisteiden määrä
+
+    @staticmethod
+    def _count(counters, closed_set, open_set, jump_points_explored, found):
+        """
+        Johtaa keon laskurit haun lopputilasta.
+
+        Maali lisätään suljettuun joukkoon ennen kuin haku päättyy, mutta
+        sitä ei laajenneta. Vanhentuneet poistot lasketaan hakusilmukassa.
+        """
+        counters.successors = jump_points_explored
+        counters.expansions = len(closed_set) - found
+        counters.heap_pops = len(closed_set) + counters.stale_pops
+        counters.heap_pushes = counters.heap_pops + len(open_set)
+
+    def find_path_result(self, start, goal):
+        """
+        Etsii reitin kuten find_path, mutta palauttaa reitin PathResult-oliona.
+
+        Hyppypisteet tallennetaan int32-taulukkoon ja reitin pituus lasketaan
+        valmiiksi. Välisolut saa tarvittaessa PathResult.iter_cells-generaattorilla.
+
+        Args:
+            start (tuple): Aloitussolmu (x, y)
+            goal (tuple): Maalisolmu (x, y)
+
+        Returns:
+            tuple: (PathResult or None, closed_set, jump_points_explored)
+        """
+        path, closed_set, jump_points_explored = self.find_path(start, goal)
+        return PathResult.from_waypoints(path), closed_set, jump_points_explored
@@ -4,23 +4,39 @@ Reitinhakualgoritmien vertailu - JPS vs A*
 Tämä ohjelma vertailee Jump Point Search (JPS) ja A* algoritmien suorituskykyä
 käyttäen karttadataa ja skenaarioita. Ohjelma laskee polkujen pituudet, 
 suoritusajat ja vertaa niitä optimaalisiin polkuihin.
+
+Ilman argumentteja ohjelma ajaa graafisen vertailun. Alikomennot bench,
+query ja batch toimivat ilman näyttöä ja tulostavat tulokset JSON- tai
+CSV-muodossa. matplotlib tuodaan vasta visualisoinnin yhteydessä, joten
+alikomennot käynnistyvät nopeasti.
 """
 
+import argparse
+import contextlib
+import csv
+import json
+import sys
 import time
-import matplotlib.pyplot as plt
 import numpy as np
 import map_loader as ml
 from astar import AStar, octile_distance, get_neighbors as astar_get_neighbors 
-from visualization import visualize_selected_scenarios
 from jps import JPS, octile_distance
-import numpy as np
+from rsr import RSR
+from theta_star import LazyThetaStar, path_length as theta_path_length
+from path_result import path_cost
 import os
-from astar_and_jps_route_test import run_benchmark
+from prefilter import QueryPrefilter
+from benchmark import clear_query_caches, time_query, summarize
 
-def load_map_and_scenarios():
+def load_map_and_scenarios(map_path=None, scen_path=None, verbose=True):
     """
     Lataa karttadatan ja skenaariot tiedostoista.
     
+    Args:
+        map_path (str, optional): Karttatiedoston polku. Oletuksena maps/rmtst03.map.txt.
+        scen_path (str, optional): Skenaariotiedoston polku. Oletuksena maps/rmtst03.map.scen.txt.
+        verbose (bool, optional): Tulostetaanko tiedot ladatuista tiedostoista
+    
     Returns:
         tuple: (karttadata numpy-taulukkona, skenaariolista)
     """
@@ -28,21 +44,24 @@ def load_map_and_scenarios():
     base_dir = os.path.dirname(os.path.abspath(__file__))
 
     # Määritetään polku karttatiedostoihin suhteessa projektin juureen
-    map_path = os.path.join(base_dir, 'maps', 'rmtst03.map.txt')
-    scen_path = os.path.join(base_dir, 'maps', 'rmtst03.map.scen.txt')
+    if map_path is None:
+        map_path = os.path.join(base_dir, 'maps', 'rmtst03.map.txt')
+    if scen_path is None:
+        scen_path = os.path.join(base_dir, 'maps', 'rmtst03.map.scen.txt')
 
     # Ladataan kartta ja skenaariot
     map_data = ml.load_map(map_path)
     np_map = ml.map_to_numpy(map_data)
     scenarios = ml.load_scenarios(scen_path)
-    print(f"Ladattu kartta {map_path} ja skenaariot {scen_path}.")
-    print(f"Kartta koko: {np_map.shape[0]} riviä, {np_map.shape[1]} saraketta.")
-    print(f"Ladattu {len(scenarios)} skenaariota.")
+    if verbose:
+        print(f"Ladattu kartta {map_path} ja skenaariot {scen_path}.")
+        print(f"Kartta koko: {np_map.shape[0]} riviä, {np_map.shape[1]} saraketta.")
+        print(f"Ladattu {len(scenarios)} skenaariota.")
     
     return np_map, scenarios
 
 
-def test_jps_performance(scenarios, np_map, num_scenarios=10):
+def test_jps_performance(scenarios, np_map, num_scenarios=10, warmup=1, repeats=5):
     """
     Testaa JPS-algoritmin suorituskykyä annetuilla skenaarioilla.
     
@@ -50,6 +69,8 @@ def test_jps_performance(scenarios, np_map, num_scenarios=10):
         scenarios (list): Lista skenaarioita (alku, loppu, optimaalinen_pituus)
         np_map (numpy.ndarray): Karttadata numpy-taulukkona
         num_scenarios (int): Testattavien skenaarioiden määrä
+        warmup (int): Lämmittelyajojen määrä, ks. benchmark.time_query
+        repeats (int): Mitattujen ajojen määrä; suoritusaikana raportoidaan mediaani
     """
     print("Verrataan JPS:n suorituskykyä optimaalisesti laskettuun polkuun, 10 ensimmäistä polkua:\n")
     
@@ -59,15 +80,13 @@ def test_jps_performance(scenarios, np_map, num_scenarios=10):
     for i, (start, goal, optimal_length) in enumerate(scenarios[:num_scenarios]):
         jps = JPS(np_map, heuristic=octile_distance)
 
-        # Aloitetaan ajan mittaus
-        start_time = time.time()
-        path,closed_set,jump_points_added = jps.find_path(start, goal)
-
-        end_time = time.time()
-        elapsed_time = end_time - start_time
+        # Mitataan haku useaan kertaan ja käytetään mediaania, hyppyvälimuisti tyhjänä
+        (path, closed_set, jump_points_added), samples = time_query(
+            lambda: jps.find_path(start, goal), warmup, repeats, setup=jps.jump_cache.clear)
+        elapsed_time = summarize(samples)["median_ns"] / 1e9
 
         if path:
-            path_length = sum(np.hypot(path[i+1][0] - path[i][0], path[i+1][1] - path[i][1]) for i in range(len(path)-1))
+            path_length = path_cost(path)
             print(f"Skenaario {i+1}:")
             print(f"  Alkupiste: {start}, Loppupiste: {goal}")
             print(f"  Optimaalinen pituus: {optimal_length:.2f}")
@@ -80,7 +99,7 @@ def test_jps_performance(scenarios, np_map, num_scenarios=10):
             print(f"  Suoritusaika: {elapsed_time:.6f} sekuntia\n")
 
 
-def test_astar_performance(scenarios, np_map, num_scenarios=10):
+def test_astar_performance(scenarios, np_map, num_scenarios=10, warmup=1, repeats=5):
     """
     Testaa A*-algoritmin suorituskykyä annetuilla skenaarioilla.
     
@@ -88,19 +107,20 @@ def test_astar_performance(scenarios, np_map, num_scenarios=10):
         scenarios (list): Lista skenaarioita (alku, loppu, optimaalinen_pituus)
         np_map (numpy.ndarray): Karttadata numpy-taulukkona
         num_scenarios (int): Testattavien skenaarioiden määrä
+        warmup (int): Lämmittelyajojen määrä, ks. benchmark.time_query
+        repeats (int): Mitattujen ajojen määrä; suoritusaikana raportoidaan mediaani
     """
     print("Verrataan A*-algoritmin suorituskykyä optimaalisesti laskettuun polkuun, 10 ensimmäistä polkua:\n")
 
     for i, (start, goal, optimal_length) in enumerate(scenarios[:num_scenarios]):
         astar = AStar(np_map, heuristic=octile_distance)
 
-        start_time = time.time()
-        path, closed_set, nodes_added = astar.find_path(start, goal)
-        end_time = time.time()
-        elapsed_time = end_time - start_time
+        (path, closed_set, nodes_added), samples = time_query(
+            lambda: astar.find_path(start, goal), warmup, repeats)
+        elapsed_time = summarize(samples)["median_ns"] / 1e9
 
         if path:
-            path_length = sum(np.hypot(path[i+1][0] - path[i][0], path[i+1][1] - path[i][1]) for i in range(len(path)-1))
+            path_length = path_cost(path)
             print(f"Skenaario {i+1}:")
             print(f"  Alkupiste: {start}, Loppupiste: {goal}")
             print(f"  Optimaalinen pituus: {optimal_length:.2f}")
@@ -113,64 +133,316 @@ def test_astar_performance(scenarios, np_map, num_scenarios=10):
             print(f"  Suoritusaika: {elapsed_time:.6f} sekuntia\n")
 
 
-def run_comprehensive_comparison(scenarios, np_map):
+# Vertailussa ajettavat algoritmit ja niiden laskurisarakkeet yhteenvedossa
+COMPARISON_ENGINES = {"JPS": "JPS hyppypisteet", "A*": "A* open set", "RSR": "RSR solmut"}
+
+
+def _new_engine(name, np_map):
+    """Luo vertailun algoritmin nimen perusteella."""
+    if name == "JPS":
+        return JPS(np_map, heuristic=octile_distance)
+    if name == "A*":
+        return AStar(np_map, heuristic=octile_distance)
+    return RSR(np_map, heuristic=octile_distance)
+
+
+def _measure_scenario(name, engine, start, goal, optimal_length, warmup, repeats):
+    """
+    Mittaa yhden algoritmin yhdellä skenaariolla.
+
+    Pituus lasketaan octile-etäisyyksinä, jotka pätevät sekä solu solulta
+    eteneville reiteille että JPS:n ja RSR:n käännöspisteille. Kyselyt
+    mitataan kylminä: välimuistit tyhjennetään ennen jokaista ajoa, jotta
+    lämmittely ei täytä JPS:n hyppyvälimuistia, ks. clear_query_caches.
+
+    Returns:
+        tuple: (polun pituus, virhe, mediaaniaika sekunteina, laskuri, polku)
+    """
+    (path, _, count), samples = time_query(
+        lambda: engine.find_path(start, goal), warmup, repeats,
+        setup=lambda: clear_query_caches(engine))
+    elapsed_time = summarize(samples)["median_ns"] / 1e9
+    if not path:
+        return None, None, elapsed_time, 0, None
+
+    length = path_cost(path)
+    return length, abs(length - optimal_length), elapsed_time, count, path
+
+
+def _summary_row(index, scenario, measurements):
+    """
+    Muodostaa yhteenvetorivin skenaarion mittauksista.
+
+    Args:
+        index (int): Skenaarion indeksi
+        scenario (tuple): (alku, loppu, optimaalinen_pituus)
+        measurements (dict): {algoritmin nimi: _measure_scenario-funktion tulos}
+
+    Returns:
+        dict: Yhteenvetorivi print_summary- ja visualize_results-funktioille
+    """
+    start, goal, optimal_length = scenario
+    row = {
+        "Skenaario": index + 1,
+        "Alku": start,
+        "Loppu": goal,
+        "Optimaalinen": round(optimal_length, 2),
+    }
+    for name, count_key in COMPARISON_ENGINES.items():
+        if name not in measurements:
+            continue
+        length, error, elapsed_time, count, _ = measurements[name]
+        row.update({
+            f"{name} pituus": round(length, 2) if length else None,
+            f"{name} virhe": round(error, 2) if error else None,
+            f"{name} aika": round(elapsed_time, 7),
+            count_key: count
+        })
+    return row
+
+
+def validate_summary(summary, scenarios, measurements, np_map, tolerance=1e-4):
+    """
+    Tarkistaa vertailun reitit yhdellä vektoroidulla ajolla algoritmia kohti.
+
+    Jokaiselle riville lisätään sarakkeet '<algoritmi> kelvollinen' (reitti on
+    laillinen, ks. path_validation) ja '<algoritmi> optimaalinen' (laillinen ja
+    pituus vastaa optimaalista toleranssin sisällä). Löytymättömät reitit ovat
+    molemmissa False. Poikkeamien määrät tulostetaan. Optimaalista lyhyemmät
+    reitit johtuvat yleensä kulmien leikkaamisesta, jota MovingAI-skenaarioiden
+    optimaaliset pituudet eivät salli; pidemmät reitit ovat hakuvirheitä.
+
+    Args:
+        summary (list): Yhteenvetorivit, joita täydennetään paikallaan
+        scenarios (list): Lista skenaarioita (alku, loppu, optimaalinen_pituus)
+        measurements (list): Skenaarioittain {algoritmin nimi: _measure_scenario-funktion tulos}
+        np_map (numpy.ndarray): Karttadata numpy-taulukkona
+        tolerance (float, optional): Sallittu ero optimaaliseen pituuteen
+    """
+    from path_validation import pack_paths, validate_paths
+
+    optimal = np.array([optimal_length for _, _, optimal_length in scenarios])
+    for name in COMPARISON_ENGINES:
+        if not measurements or name not in measurements[0]:
+            continue
+        points, offsets = pack_paths([m[name][4] for m in measurements])
+        result = validate_paths(points, offsets, np_map, optimal, tolerance)
+        for row, legal, optimal_ok in zip(summary, result["legal"].tolist(), result["optimal_ok"].tolist()):
+            row[f"{name} kelvollinen"] = legal
+            row[f"{name} optimaalinen"] = optimal_ok
+        illegal = int((result["found"] & ~result["legal"]).sum())
+        mismatch = result["legal"] & ~result["optimal_ok"]
+        longer = int((mismatch & (result["length"] > optimal)).sum())
+        shorter = int(mismatch.sum()) - longer
+        missing = int((~result["found"]).sum())
+        print(f"{name}: {illegal} laitonta, {longer} optimaalista pidempää, "
+              f"{shorter} lyhyempää, {missing} löytymätöntä reittiä")
+
+
+def run_comprehensive_comparison(scenarios, np_map, include_rsr=False, use_prefilter=False,
+                                 warmup=1, repeats=3, validate=False):
     """
     Suorittaa kattavan vertailun JPS- ja A*-algoritmien välillä kaikilla skenaarioilla.
     
     Args:
         scenarios (list): Lista skenaarioita (alku, loppu, optimaalinen_pituus)
         np_map (numpy.ndarray): Karttadata numpy-taulukkona
+        include_rsr (bool, optional): Lisää vertailuun RSR-algoritmin. Esikäsittely
+            tehdään kerran ennen skenaarioita, eikä sitä lasketa hakuaikoihin.
+        use_prefilter (bool, optional): Asettaa JPS:n ja A*:n eteen QueryPrefilter-
+            esisuodattimen, joka ratkaisee triviaalit ja suorat kyselyt ilman hakua.
+            Välimuisti on poissa käytöstä, jotta toistoajot mittaavat kylmiä kyselyitä.
+            Jokaisen skenaarion ratkaissut suodatin lisätään riville sarakkeeseen
+            '<algoritmi> suodatin', ja suodattimien osumat skenaarioittain tulostetaan
+            vertailun lopuksi.
+        warmup (int, optional): Lämmittelyajojen määrä kyselyä kohti, ks. benchmark.time_query
+        repeats (int, optional): Mitattujen ajojen määrä kyselyä kohti. Aikoina
+            raportoidaan mediaani sekunteina.
+        validate (bool, optional): Tarkistaa reitit vertailun lopuksi, ks. validate_summary
         
     Returns:
         list: Lista yhteenvetosanakirjoja jokaisesta suoritetusta skenaariosta
     """
     summary = []
+    all_measurements = []
+    names = ["JPS", "A*"] + (["RSR"] if include_rsr else [])
+    # Hakujen välillä säilyvät algoritmit; muut luodaan jokaiselle skenaariolle
+    shared = {"RSR": _new_engine("RSR", np_map)} if include_rsr else {}
+    if use_prefilter:
+        # Ilman välimuistia jokainen toistoajo kulkee saman suodattimen läpi
+        shared["JPS"] = QueryPrefilter(np_map, JPS(np_map, heuristic=octile_distance), cache_size=0)
+        shared["A*"] = QueryPrefilter(np_map, AStar(np_map, heuristic=octile_distance), cache_size=0)
+        filter_hits = {name: dict.fromkeys(shared[name].stats, 0) for name in ("JPS", "A*")}
+
+    for i, (start, goal, optimal_length) in enumerate(scenarios):
+        measurements = {}
+        filters = {}
+        for name in names:
+            engine = shared[name] if name in shared else _new_engine(name, np_map)
+            before = dict(engine.stats) if isinstance(engine, QueryPrefilter) else None
+            measurements[name] = _measure_scenario(name, engine, start, goal, optimal_length,
+                                                   warmup, repeats)
+            if before is not None:
+                # Skenaario lasketaan kerran, vaikka se ajettiin warmup + repeats kertaa
+                used = max(before, key=lambda key: engine.stats[key] - before[key])
+                filter_hits[name][used] += 1
+                filters[name] = used
+        row = _summary_row(i, (start, goal, optimal_length), measurements)
+        for name, used in filters.items():
+            row[f"{name} suodatin"] = used
+        summary.append(row)
+        all_measurements.append(measurements)
+
+    if use_prefilter:
+        for name, counts in filter_hits.items():
+            hits = ", ".join(f"{key}: {count}" for key, count in counts.items())
+            print(f"{name} esisuodatin: {hits}")
+
+    if validate:
+        validate_summary(summary, scenarios, all_measurements, np_map)
+    
+    return summary
 
-    for i, (start, goal, optimal_length) in enumerate(scenarios[:]):
-        # JPS
-        jps = JPS(np_map, heuristic=octile_distance)
-        start_time = time.time()
-        jps_path, _, jump_points = jps.find_path(start, goal)
-        jps_time = time.time() - start_time    
-        if jps_path:
-            jps_length = sum(np.hypot(jps_path[i+1][0] - jps_path[i][0], jps_path[i+1][1] - jps_path[i][1]) for i in range(len(jps_path)-1))
-            jps_error = abs(jps_length - optimal_length)
-        else:
-            jps_length = None
-            jps_error = None
-            jump_points = 0
 
-        # A* (ruudukkopohjainen)
-        astar = AStar(np_map, heuristic=octile_distance)
-        start_time = time.time()
-        astar_path, _, nodes_added = astar.find_path(start, goal)
-        astar_time = time.time() - start_time
-        if astar_path:
-            astar_length = sum(np.hypot(astar_path[i+1][0] - astar_path[i][0], astar_path[i+1][1] - astar_path[i][1]) for i in range(len(astar_path)-1))
-            astar_error = abs(astar_length - optimal_length)
-        else:
-            astar_length = None
-            astar_error = None
-            nodes_added = 0
-
-        summary.append({
-            "Skenaario": i + 1,
-            "Alku": start,
-            "Loppu": goal,
-            "Optimaalinen": round(optimal_length, 2),
-            "JPS pituus": round(jps_length, 2) if jps_length else None,
-            "JPS virhe": round(jps_error, 2) if jps_error else None,
-            "JPS aika": round(jps_time, 4),
-            "JPS hyppypisteet": jump_points,
-            "A* pituus": round(astar_length, 2) if astar_length else None,
-            "A* virhe": round(astar_error, 2) if astar_error else None,
-            "A* aika": round(astar_time, 4),
-            "A* open set": nodes_added
-        })
-    
+# Prosessipoolin työntekijän tila, ks. _init_comparison_worker
+_worker_state = {}
+
+
+def _init_comparison_worker(np_map, names, cpu_queue):
+    """
+    Alustaa vertailun työntekijäprosessin.
+
+    RSR:n esikäsittely tehdään kerran työntekijää kohti. Jos cpu_queue on
+    annettu, työntekijä kiinnitetään jonosta saamaansa prosessoriin.
+    """
+    if cpu_queue is not None:
+        os.sched_setaffinity(0, {cpu_queue.get()})
+    _worker_state["np_map"] = np_map
+    _worker_state["shared"] = {"RSR": _new_engine("RSR", np_map)} if "RSR" in names else {}
+
+
+def _compare_chunk(names, chunk, warmup, repeats):
+    """
+    Mittaa työntekijäprosessissa algoritmit joukolla skenaarioita.
+
+    Args:
+        names (list): Mitattavat algoritmit
+        chunk (list): Lista pareja (indeksi, skenaario)
+        warmup (int): Lämmittelyajojen määrä
+        repeats (int): Mitattujen ajojen määrä
+
+    Returns:
+        list: Lista pareja (indeksi, {algoritmin nimi: mittaus})
+    """
+    np_map = _worker_state["np_map"]
+    shared = _worker_state["shared"]
+    results = []
+    for index, (start, goal, optimal_length) in chunk:
+        measurements = {}
+        for name in names:
+            engine = shared[name] if name in shared else _new_engine(name, np_map)
+            measurements[name] = _measure_scenario(name, engine, start, goal, optimal_length,
+                                                   warmup, repeats)
+        results.append((index, measurements))
+    return results
+
+
+def run_parallel_comparison(scenarios, np_map, max_workers=None, split_engines=False,
+                            pin_cpus=False, include_rsr=False, warmup=1, repeats=3, validate=False):
+    """
+    Suorittaa saman vertailun kuin run_comprehensive_comparison prosessipoolissa.
+
+    Skenaariot jaetaan paloina työntekijöille, ja tulokset kootaan samaan
+    yhteenvetomuotoon, jota print_summary ja visualize_results käyttävät.
+    Esisuodatinta ei tueta, koska sen välimuisti ja tilastot olisivat
+    työntekijäkohtaisia.
+
+    Args:
+        scenarios (list): Lista skenaarioita (alku, loppu, optimaalinen_pituus)
+        np_map (numpy.ndarray): Karttadata numpy-taulukkona
+        max_workers (int, optional): Työntekijöiden kokonaismäärä. Oletuksena prosessorien määrä.
+        split_engines (bool, optional): Jakaa työntekijät algoritmeittain omiin
+            pooleihinsa, jolloin kukin työntekijä ajaa vain yhtä algoritmia.
+            Tämä vähentää algoritmien välistä häiriötä välimuisteissa.
+        pin_cpus (bool, optional): Kiinnittää jokaisen työntekijän omaan prosessoriinsa.
+            Toimii vain alustoilla, joilla on os.sched_setaffinity.
+        include_rsr (bool, optional): Lisää vertailuun RSR-algoritmin
+        warmup (int, optional): Lämmittelyajojen määrä kyselyä kohti
+        repeats (int, optional): Mitattujen ajojen määrä kyselyä kohti
+        validate (bool, optional): Tarkistaa reitit vertailun lopuksi, ks. validate_summary
+
+    Returns:
+        list: Lista yhteenvetosanakirjoja skenaarioiden alkuperäisessä järjestyksessä
+    """
+    # Prosessipooli tuodaan vasta tarvittaessa, jotta komentorivin käynnistys pysyy nopeana
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from contextlib import ExitStack
+
+    names = ["JPS", "A*"] + (["RSR"] if include_rsr else [])
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    groups = [[name] for name in names] if split_engines else [names]
+    group_workers = max(1, max_workers // len(groups))
+
+    cpu_queue = None
+    if pin_cpus and hasattr(os, "sched_setaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+        cpu_queue = multiprocessing.Queue()
+        for k in range(group_workers * len(groups)):
+            cpu_queue.put(cpus[k % len(cpus)])
+
+    # Useampi pala kuin työntekijää tasaa kuormaa, sillä ryhmien kyselyt ovat eri pituisia
+    tasks = list(enumerate(scenarios))
+    chunk_size = max(1, len(tasks) // (group_workers * 4))
+    chunks = [tasks[k:k + chunk_size] for k in range(0, len(tasks), chunk_size)]
+
+    measurements = [{} for _ in scenarios]
+    with ExitStack() as stack:
+        futures = []
+        for group in groups:
+            executor = stack.enter_context(ProcessPoolExecutor(
+                max_workers=group_workers, initializer=_init_comparison_worker,
+                initargs=(np_map, group, cpu_queue)))
+            futures += [executor.submit(_compare_chunk, group, chunk, warmup, repeats)
+                        for chunk in chunks]
+        for future in futures:
+            for index, result in future.result():
+                measurements[index].update(result)
+
+    summary = [_summary_row(i, scenario, measurements[i]) for i, scenario in enumerate(scenarios)]
+    if validate:
+        validate_summary(summary, scenarios, measurements, np_map)
     return summary
 
 
+def run_corpus_comparison(directory, max_workers=None, map_ids=None):
+    """
+    Suorittaa kattavan vertailun jokaiselle hakemiston kartalle.
+    
+    Kartat ja skenaariot jäsennetään rinnakkain MapCorpus-luokan avulla,
+    ja jokaiselle kartalle ajetaan run_comprehensive_comparison.
+    
+    Args:
+        directory (str): Hakemisto, joka sisältää kartta- ja skenaariotiedostot
+        max_workers (int, optional): Jäsennykseen käytettävien prosessien määrä
+        map_ids (list, optional): Vertailtavat kartat. Oletuksena kaikki.
+        
+    Returns:
+        dict: Sanakirja muodossa {map_id: yhteenvetolista}
+    """
+    from corpus import MapCorpus
+
+    corpus = MapCorpus(directory, max_workers=max_workers)
+    print(f"Löydettiin {len(corpus)} karttaa hakemistosta {directory}.")
+
+    results = {}
+    for map_id, np_map, scenarios in corpus.iter_maps(map_ids):
+        print(f"Vertaillaan karttaa {map_id}: {len(scenarios)} skenaariota.")
+        results[map_id] = run_comprehensive_comparison(scenarios, np_map)
+    return results
+
+
 def print_summary(summary):
     """
     Tulostaa yhteenvedon algoritmien suorituskyvystä taulukkomuodossa.
@@ -179,14 +451,22 @@ def print_summary(summary):
         summary (list): Lista yhteenvetosanakirjoja suoritetuista skenaarioista
     """
     # Yhteenvedon tulostus
-    print(f"{'Skenaario':<9}{'Alku':<15}{'Loppu':<15}{'Optimaalinen':<13}"
-          f"{'JPS pituus':<12}{'JPS virhe':<12}{'JPS aika':<10}{'JPS hypyt':<12}"
-          f"{'A* pituus':<12}{'A* virhe':<12}{'A* aika':<10}{'A* open set':<14}")
+    print("Ajat ovat kylmien kyselyiden mediaaneja sekunteina (välimuistit tyhjennetään ennen jokaista ajoa)")
+    include_rsr = bool(summary) and "RSR aika" in summary[0]
+    header = (f"{'Skenaario':<9}{'Alku':<15}{'Loppu':<15}{'Optimaalinen':<13}"
+              f"{'JPS pituus':<12}{'JPS virhe':<12}{'JPS aika':<10}{'JPS hypyt':<12}"
+              f"{'A* pituus':<12}{'A* virhe':<12}{'A* aika':<10}{'A* open set':<14}")
+    if include_rsr:
+        header += f"{'RSR pituus':<12}{'RSR virhe':<12}{'RSR aika':<10}{'RSR solmut':<12}"
+    print(header)
 
     for row in summary:
-        print(f"{row['Skenaario']:<9}{str(row['Alku']):<15}{str(row['Loppu']):<15}{row['Optimaalinen']:<13}"
-              f"{str(row['JPS pituus']):<12}{str(row['JPS virhe']):<12}{row['JPS aika']:<10}{row['JPS hyppypisteet']:<12}"
-              f"{str(row['A* pituus']):<12}{str(row['A* virhe']):<12}{row['A* aika']:<10}{row['A* open set']:<14}")
+        line = (f"{row['Skenaario']:<9}{str(row['Alku']):<15}{str(row['Loppu']):<15}{row['Optimaalinen']:<13}"
+                f"{str(row['JPS pituus']):<12}{str(row['JPS virhe']):<12}{row['JPS aika']:<10}{row['JPS hyppypisteet']:<12}"
+                f"{str(row['A* pituus']):<12}{str(row['A* virhe']):<12}{row['A* aika']:<10}{row['A* open set']:<14}")
+        if include_rsr:
+            line += f"{str(row['RSR pituus']):<12}{str(row['RSR virhe']):<12}{row['RSR aika']:<10}{row['RSR solmut']:<12}"
+        print(line)
 
 
 def calculate_average_times(summary):
@@ -214,6 +494,8 @@ def visualize_results(summary):
     Args:
         summary (list): Lista yhteenvetosanakirjoja suoritetuista skenaarioista.
     """
+    import matplotlib.pyplot as plt
+
     scenarios = [row['Skenaario'] for row in summary]
     jps_times = [row['JPS aika'] for row in summary]
     astar_times = [row['A* aika'] for row in summary]
@@ -241,11 +523,16 @@ def visualize_results(summary):
     plt.show()
 
 
-def main():
+def run_visual_comparison():
     """
-    Pääfunktio, joka suorittaa koko reitinhakualgoritmien vertailun.
+    Suorittaa koko reitinhakualgoritmien vertailun visualisointeineen.
 
+    Avaa kuvaikkunoita ja kysyy lopuksi visualisoitavat skenaariot
+    komentoriviltä, joten vaatii näytön ja interaktiivisen käyttäjän.
     """
+    from astar_and_jps_route_test import run_benchmark
+    from visualization import visualize_selected_scenarios
+
     #ajataan testti miten löytävätkö A* ja JPS algoritmit saman mittaiset reitit
     run_benchmark(
         show_visualizations=True,
@@ -278,5 +565,179 @@ def main():
     visualize_selected_scenarios(summary, np_map)
 
 
+# Yksittäisten kyselyiden algoritmit komentorivillä
+QUERY_ENGINES = {"A*": AStar, "JPS": JPS, "RSR": RSR, "Theta*": LazyThetaStar}
+
+
+def write_rows(rows, fmt="json", output=None):
+    """
+    Kirjoittaa tulosrivit JSON- tai CSV-muodossa.
+
+    Args:
+        rows (list): Lista sanakirjoja
+        fmt (str, optional): 'json' tai 'csv'
+        output (str, optional): Tiedoston nimi. Oletuksena vakiotuloste.
+    """
+    f = open(output, "w", encoding="utf-8", newline="") if output else sys.stdout
+    try:
+        if fmt == "json":
+            json.dump(rows, f, indent=2)
+            f.write("\n")
+        else:
+            fieldnames = list(dict.fromkeys(key for row in rows for key in row))
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({key: " ".join(map(str, value)) if isinstance(value, (tuple, list)) else value
+                                 for key, value in row.items()})
+    finally:
+        if output:
+            f.close()
+
+
+def load_queries(filename):
+    """
+    Lukee kyselyt CSV-tiedostosta, jonka jokaisella rivillä on lähtö_x,lähtö_y,maali_x,maali_y.
+
+    Tyhjät rivit ja #-merkillä alkavat rivit ohitetaan.
+
+    Args:
+        filename (str): Tiedoston nimi
+
+    Returns:
+        list: Lista pareja (lähtö, maali)
+    """
+    queries = []
+    with open(filename, encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if not row or row[0].lstrip().startswith("#"):
+                continue
+            sx, sy, gx, gy = (int(value) for value in row[:4])
+            queries.append(((sx, sy), (gx, gy)))
+    return queries
+
+
+def solve_query(engine_name, engine, start, goal, include_path=False):
+    """
+    Ratkaisee yhden kyselyn ja palauttaa tuloksen tulosriviksi.
+
+    Args:
+        engine_name (str): Algoritmin nimi, ks. QUERY_ENGINES
+        engine: Algoritmi, jolla on find_path(start, goal) -metodi
+        start (tuple): Aloitussolmu
+        goal (tuple): Maalisolmu
+        include_path (bool, optional): Lisätäänkö riville reitin pisteet
+
+    Returns:
+        dict: engine, start, goal, found, length, expanded, count, time_s ja tarvittaessa path
+    """
+    started = time.perf_counter()
+    path, closed_set, count = engine.find_path(start, goal)
+    elapsed_time = time.perf_counter() - started
+    if path and engine_name == "Theta*":
+        length = theta_path_length(path)
+    else:
+        length = path_cost(path) if path else None
+    row = {
+        "engine": engine_name,
+        "start": list(start),
+        "goal": list(goal),
+        "found": path is not None,
+        "length": round(length, 4) if length is not None else None,
+        "expanded": len(closed_set),
+        "count": count,
+        "time_s": round(elapsed_time, 7),
+    }
+    if include_path:
+        row["path"] = [list(point) for point in path] if path else None
+    return row
+
+
+def build_parser():
+    """Muodostaa komentorivin jäsentimen alikomentoineen."""
+    parser = argparse.ArgumentParser(description="Reitinhakualgoritmien vertailu")
+    commands = parser.add_subparsers(dest="command")
+
+    def add_common(command):
+        command.add_argument("--map", dest="map_path", help="Karttatiedosto (oletuksena maps/rmtst03.map.txt)")
+        command.add_argument("--scen", dest="scen_path",
+                             help="Skenaariotiedosto (oletuksena maps/rmtst03.map.scen.txt)")
+        command.add_argument("--format", choices=("json", "csv"), default="json", help="Tulosteen muoto")
+        command.add_argument("--output", help="Tulostiedosto (oletuksena vakiotuloste)")
+
+    bench = commands.add_parser("bench", help="Vertaa JPS:ää ja A*:ia skenaarioilla")
+    add_common(bench)
+    bench.add_argument("--limit", type=int, help="Ajettavien skenaarioiden enimmäismäärä")
+    bench.add_argument("--rsr", action="store_true", help="Lisää vertailuun RSR")
+    bench.add_argument("--prefilter", action="store_true", help="Käytä esisuodatinta")
+    bench.add_argument("--workers", type=int,
+                       help="Aja rinnakkain annetulla määrällä prosesseja (ei yhdessä --prefilter kanssa)")
+    bench.add_argument("--warmup", type=int, default=1, help="Lämmittelyajot kyselyä kohti")
+    bench.add_argument("--repeats", type=int, default=3, help="Mitatut ajot kyselyä kohti")
+    bench.add_argument("--validate", action="store_true",
+                       help="Tarkista reittien kelpoisuus ja optimaalisuus")
+
+    query = commands.add_parser("query", help="Ratkaise yksi kysely")
+    add_common(query)
+    query.add_argument("coords", type=int, nargs=4, metavar=("SX", "SY", "GX", "GY"),
+                       help="Lähdön ja maalin koordinaatit")
+    query.add_argument("--engine", choices=list(QUERY_ENGINES), default="JPS", help="Algoritmi")
+
+    batch = commands.add_parser("batch", help="Ratkaise joukko kyselyitä")
+    add_common(batch)
+    batch.add_argument("--queries", help="CSV-tiedosto riveillä sx,sy,gx,gy (oletuksena skenaariotiedosto)")
+    batch.add_argument("--engine", choices=list(QUERY_ENGINES), default="JPS", help="Algoritmi")
+    batch.add_argument("--paths", action="store_true", help="Tulosta myös reittien pisteet")
+
+    commands.add_parser("visualize", help="Graafinen vertailu (oletus ilman alikomentoa)")
+    return parser
+
+
+def main(argv=None):
+    """
+    Pääfunktio. Ilman alikomentoa suorittaa graafisen vertailun.
+
+    Args:
+        argv (list, optional): Komentorivin argumentit. Oletuksena sys.argv.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "bench" and args.workers and args.prefilter:
+        # Esisuodattimen tilastot olisivat työntekijäkohtaisia, ks. run_parallel_comparison
+        parser.error("--prefilter ei ole tuettu --workers kanssa")
+    if args.command in (None, "visualize"):
+        run_visual_comparison()
+        return
+
+    np_map, scenarios = load_map_and_scenarios(args.map_path, args.scen_path, verbose=False)
+
+    if args.command == "bench":
+        scenarios = scenarios[:args.limit] if args.limit is not None else scenarios
+        # Esisuodattimen ja tarkistuksen yhteenvedot stderr-virtaan, jotta tulos pysyy koneluettavana
+        with contextlib.redirect_stdout(sys.stderr):
+            if args.workers:
+                rows = run_parallel_comparison(scenarios, np_map, max_workers=args.workers,
+                                               include_rsr=args.rsr, warmup=args.warmup,
+                                               repeats=args.repeats, validate=args.validate)
+            else:
+                rows = run_comprehensive_comparison(scenarios, np_map, include_rsr=args.rsr,
+                                                    use_prefilter=args.prefilter,
+                                                    warmup=args.warmup, repeats=args.repeats,
+                                                    validate=args.validate)
+    elif args.command == "query":
+        sx, sy, gx, gy = args.coords
+        engine = QUERY_ENGINES[args.engine](np_map)
+        rows = [solve_query(args.engine, engine, (sx, sy), (gx, gy), include_path=True)]
+    else:
+        if args.queries:
+            queries = load_queries(args.queries)
+        else:
+            queries = [(start, goal) for start, goal, _ in scenarios]
+        engine = QUERY_ENGINES[args.engine](np_map)
+        rows = [solve_query(args.engine, engine, start, goal, args.paths) for start, goal in queries]
+
+    write_rows(rows, args.format, args.output)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,409 @@
+"""
+Synteettiset testikartat ja skaalautuvuusmittaus.
+
+create_test_grid tuottaa vain yhden neliön muotoisen esteen, joten sillä
+ei näe, miten algoritmien kustannukset kasvavat kartan koon ja esteiden
+määrän mukana. Tämän moduulin generaattorit tuottavat neljää karttatyyppiä:
+
+- random: satunnaisesti sijoitetut yksittäiset esteet
+- maze: labyrintti, jossa osa seinistä on poistettu silmukoiksi
+- rooms: huoneita, joiden välisissä seinissä on ovet
+- open_field: avoin kenttä, jolla on erillisiä suorakulmaisia esteitä
+
+Kaikki generaattorit ovat muotoa generaattori(size, density, seed) ja
+palauttavat ruudukon, jossa 0 = vapaa ja 1 = este. Sama siemen tuottaa aina
+saman kartan. Kartat muodostetaan kokonaan numpy-operaatioilla, joten
+myös 4096×4096-kartta syntyy alle sekunnissa. Tiheys on välillä 0-1, ja
+suurempi arvo tarkoittaa kaikilla generaattoreilla enemmän esteitä.
+
+Skaalausmittaus ajetaan komentoriviltä, esim.
+
+    python map_generators.py --sizes 256 1024 4096 --engines JPS --no-plot
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from astar import AStar
+from benchmark import clear_query_caches, summarize, time_query
+from jps import JPS
+from rsr import RSR
+from theta_star import LazyThetaStar
+
+
+def _shape(size):
+    """Palauttaa koon (rivit, sarakkeet); kokonaisluku tarkoittaa neliötä."""
+    if isinstance(size, int):
+        return size, size
+    return tuple(size)
+
+
+def random_obstacles(size, density=0.2, seed=0):
+    """
+    Luo kartan, jossa jokainen solu on este todennäköisyydellä density.
+
+    Yhtenäisyyttä ei taata, joten osa kyselyistä voi olla ratkeamattomia.
+
+    Args:
+        size (int or tuple): Kartan koko
+        density (float, optional): Esteiden osuus
+        seed (int, optional): Satunnaislukugeneraattorin siemen
+
+    Returns:
+        numpy.ndarray: Ruudukko (0 = vapaa, 1 = este)
+    """
+    rng = np.random.default_rng(seed)
+    return (rng.random(_shape(size)) < density).astype(int)
+
+
+def maze(size, density=1.0, seed=0):
+    """
+    Luo labyrintin binääripuualgoritmilla.
+
+    Solut ovat parittomissa koordinaateissa. Jokainen solu avaa seinän
+    joko ylös tai oikealle, mikä tuottaa täydellisen labyrintin. Tämän
+    jälkeen jäljelle jääneistä sisäseinistä säilytetään osuus density, ja
+    loput poistetaan, jolloin labyrinttiin syntyy silmukoita.
+
+    Args:
+        size (int or tuple): Kartan koko
+        density (float, optional): Säilytettävien sisäseinien osuus. 1.0 = täydellinen labyrintti.
+        seed (int, optional): Satunnaislukugeneraattorin siemen
+
+    Returns:
+        numpy.ndarray: Ruudukko (0 = vapaa, 1 = este)
+    """
+    rng = np.random.default_rng(seed)
+    rows, cols = _shape(size)
+    grid = np.ones((rows, cols), dtype=int)
+    cell_rows, cell_cols = (rows - 1) // 2, (cols - 1) // 2
+    if cell_rows == 0 or cell_cols == 0:
+        return grid
+    grid[1:2 * cell_rows:2, 1:2 * cell_cols:2] = 0
+
+    # Ylärivi avaa aina oikealle ja oikea sarake aina ylös
+    north = rng.random((cell_rows, cell_cols)) < 0.5
+    north[0, :] = False
+    north[:, -1] = True
+    north[0, -1] = False
+    east = ~north
+    east[:, -1] = False
+
+    i, j = np.nonzero(north)
+    grid[2 * i, 2 * j + 1] = 0
+    i, j = np.nonzero(east)
+    grid[2 * i + 1, 2 * j + 2] = 0
+
+    # Sisäseinät kahden solun välissä: (pariton, parillinen) ja (parillinen, pariton)
+    walls = np.zeros((rows, cols), dtype=bool)
+    walls[1:2 * cell_rows:2, 2:2 * cell_cols - 1:2] = True
+    walls[2:2 * cell_rows - 1:2, 1:2 * cell_cols:2] = True
+    remove = walls & (grid == 1) & (rng.random((rows, cols)) >= density)
+    grid[remove] = 0
+    return grid
+
+
+def _wall_openings(length, count, room_size, door_width, density, rng):
+    """
+    Laskee seinäriveille kohdat, jotka avataan.
+
+    Seinärivi jakautuu room_size-pituisiin osiin. Jokaiseen osaan tulee ovi,
+    ja osa poistetaan kokonaan todennäköisyydellä 1 - density.
+
+    Returns:
+        numpy.ndarray: Totuusarvotaulukko (count, length), True = avataan
+    """
+    position = np.arange(length)
+    segment = position // room_size
+    offset_in_segment = position % room_size
+    segments = segment[-1] + 1
+
+    # Oven paikka osan sisällä; viimeinen osa voi olla lyhyempi
+    segment_length = np.minimum(room_size, length - np.arange(segments) * room_size)
+    room = np.maximum(segment_length - door_width, 1)
+    offset = 1 + (rng.random((count, segments)) * room).astype(int)
+    relative = offset_in_segment[None, :] - offset[:, segment]
+    doors = (relative >= 0) & (relative < door_width)
+
+    removed = rng.random((count, segments)) >= density
+    return doors | (removed[:, segment] & (offset_in_segment[None, :] != 0))
+
+
+def rooms(size, density=0.8, seed=0, room_size=16, door_width=2):
+    """
+    Luo huonekartan, jossa huoneet on erotettu seinillä ja yhdistetty ovilla.
+
+    Jokaisessa kahden huoneen välisessä seinäosassa on ovi, joten kartta on
+    aina yhtenäinen. Seinäosista säilytetään osuus density, ja loput
+    poistetaan, jolloin huoneet yhdistyvät suuremmiksi saleiksi.
+
+    Args:
+        size (int or tuple): Kartan koko
+        density (float, optional): Säilytettävien seinäosien osuus
+        seed (int, optional): Satunnaislukugeneraattorin siemen
+        room_size (int, optional): Huoneiden väli soluina seinä mukaan lukien
+        door_width (int, optional): Ovien leveys soluina
+
+    Returns:
+        numpy.ndarray: Ruudukko (0 = vapaa, 1 = este)
+    """
+    rng = np.random.default_rng(seed)
+    rows, cols = _shape(size)
+    grid = np.zeros((rows, cols), dtype=int)
+    wall_rows = np.arange(room_size, rows, room_size)
+    wall_cols = np.arange(room_size, cols, room_size)
+    grid[wall_rows, :] = 1
+    grid[:, wall_cols] = 1
+
+    if len(wall_rows):
+        lines = grid[wall_rows]
+        lines[_wall_openings(cols, len(wall_rows), room_size, door_width, density, rng)] = 0
+        grid[wall_rows] = lines
+    if len(wall_cols):
+        lines = grid[:, wall_cols].T
+        lines[_wall_openings(rows, len(wall_cols), room_size, door_width, density, rng)] = 0
+        grid[:, wall_cols] = lines.T
+
+    # Seinien risteyskohdat jäävät esteiksi
+    grid[np.ix_(wall_rows, wall_cols)] = 1
+    return grid
+
+
+def open_field(size, density=0.1, seed=0, spacing=8):
+    """
+    Luo avoimen kentän, jolla on erillisiä suorakulmaisia esteitä.
+
+    Kartta jaetaan spacing×spacing-ruutuihin, ja kuhunkin ruutuun tulee
+    este todennäköisyydellä density. Esteen koko vaihtelee satunnaisesti,
+    mutta ruudun reunat jäävät vapaiksi, joten esteet eivät kosketa
+    toisiaan ja kartta on aina yhtenäinen.
+
+    Args:
+        size (int or tuple): Kartan koko
+        density (float, optional): Esteen sisältävien ruutujen osuus
+        seed (int, optional): Satunnaislukugeneraattorin siemen
+        spacing (int, optional): Ruutujen koko soluina, vähintään 3
+
+    Returns:
+        numpy.ndarray: Ruudukko (0 = vapaa, 1 = este)
+    """
+    rng = np.random.default_rng(seed)
+    rows, cols = _shape(size)
+    tiles = (-(-rows // spacing), -(-cols // spacing))
+    occupied = rng.random(tiles) < density
+    heights = rng.integers(1, spacing - 1, size=tiles)
+    widths = rng.integers(1, spacing - 1, size=tiles)
+
+    r = np.arange(rows)
+    c = np.arange(cols)
+    tile_r, local_r = r // spacing, r % spacing
+    tile_c, local_c = c // spacing, c % spacing
+    inside = ((local_r[:, None] >= 1) & (local_r[:, None] <= heights[tile_r][:, tile_c])
+              & (local_c[None, :] >= 1) & (local_c[None, :] <= widths[tile_r][:, tile_c]))
+    return (inside & occupied[tile_r][:, tile_c]).astype(int)
+
+
+GENERATORS = {
+    "random": random_obstacles,
+    "maze": maze,
+    "rooms": rooms,
+    "open_field": open_field,
+}
+
+# Skaalausmittauksen algoritmit. RSR:n esikäsittely mitataan erikseen.
+ENGINES = {
+    "A*": AStar,
+    "JPS": JPS,
+    "RSR": RSR,
+    "Theta*": LazyThetaStar,
+}
+
+
+# Oletusmittauksen kartan sivut 64:stä 4096:een
+DEFAULT_SIZES = (64, 128, 256, 512, 1024, 2048, 4096)
+
+# Suurin kartan sivu, jolla algoritmi ajetaan oletuksena. RSR:n esikäsittely
+# nelinkertaistuu sivun kaksinkertaistuessa (1024²-kartalla noin 14 s), ja A*
+# ja Theta* laajentavat suurilla kartoilla miljoonia solmuja. JPS ajetaan
+# kaikilla koilla.
+SIZE_LIMITS = {"A*": 1024, "RSR": 1024, "Theta*": 1024}
+
+
+def random_queries(grid, count, seed=0):
+    """
+    Valitsee satunnaisia kyselyitä vapaiden solujen väliltä.
+
+    Args:
+        grid (numpy.ndarray): Ruudukko (0 = vapaa, 1 = este)
+        count (int): Kyselyiden määrä
+        seed (int, optional): Satunnaislukugeneraattorin siemen
+
+    Returns:
+        list: Lista pareja (lähtö, maali)
+    """
+    rng = np.random.default_rng(seed)
+    free = np.argwhere(grid == 0)
+    if len(free) < 2:
+        return []
+    picks = rng.integers(len(free), size=(count, 2))
+    return [(tuple(int(v) for v in free[a]), tuple(int(v) for v in free[b])) for a, b in picks]
+
+
+def run_scaling_benchmark(generators=None, sizes=DEFAULT_SIZES, densities=(0.1, 0.2, 0.3),
+                          engines=None, queries=5, seed=0, warmup=0, repeats=3, size_limits=None):
+    """
+    Mittaa algoritmien ajan ja laajennetut solmut kartan koon ja tiheyden funktiona.
+
+    Jokaiselle generaattorin, koon ja tiheyden yhdistelmälle luodaan kartta
+    ja queries satunnaista kyselyä, jotka ovat samat kaikille algoritmeille.
+    Puhdas Python-toteutus laajentaa suurilla kartoilla miljoonia solmuja,
+    joten hitaat algoritmit ohitetaan size_limits-rajaa suuremmilla kartoilla.
+    Ohitetut yhdistelmät tulostetaan taulukon jälkeen.
+
+    Args:
+        generators (list, optional): Generaattorien nimet, ks. GENERATORS. Oletuksena kaikki.
+        sizes (tuple, optional): Kartan sivun pituudet. Oletuksena DEFAULT_SIZES.
+        densities (tuple, optional): Tiheydet
+        engines (list, optional): Algoritmien nimet, ks. ENGINES. Oletuksena kaikki.
+        queries (int, optional): Kyselyiden määrä karttaa kohti
+        seed (int, optional): Siemen kartoille ja kyselyille
+        warmup (int, optional): Lämmittelyajojen määrä kyselyä kohti
+        repeats (int, optional): Mitattujen ajojen määrä kyselyä kohti
+        size_limits (dict, optional): {algoritmi: suurin kartan sivu}. Oletuksena
+            SIZE_LIMITS; tyhjä sanakirja ajaa kaikki algoritmit kaikilla koilla.
+
+    Returns:
+        list: Rivit sanakirjoina: generator, size, density, engine, preprocess_s,
+              median_ns (kyselyiden mediaanien mediaani), expanded (keskiarvo) ja found
+    """
+    generators = list(GENERATORS) if generators is None else generators
+    engines = list(ENGINES) if engines is None else engines
+    size_limits = SIZE_LIMITS if size_limits is None else size_limits
+
+    rows = []
+    skipped = {}
+    print(f"{'Kartta':<12}{'Koko':<7}{'Tiheys':<8}{'Algoritmi':<10}{'Mediaani (ms)':<15}"
+          f"{'Laajennetut':<13}{'Löydetyt':<9}")
+    for generator in generators:
+        for size in sizes:
+            for density in densities:
+                grid = GENERATORS[generator](size, density, seed)
+                pairs = random_queries(grid, queries, seed)
+                for name in engines:
+                    if name in size_limits and max(_shape(size)) > size_limits[name]:
+                        skipped.setdefault(name, []).append(size)
+                        continue
+                    started = time.perf_counter()
+                    engine = ENGINES[name](grid)
+                    preprocess = time.perf_counter() - started
+
+                    medians, expanded, found = [], [], 0
+                    for start, goal in pairs:
+                        (path, closed_set, _), samples = time_query(
+                            lambda: engine.find_path(start, goal), warmup, repeats,
+                            setup=lambda: clear_query_caches(engine))
+                        medians.append(summarize(samples)["median_ns"])
+                        expanded.append(len(closed_set))
+                        found += path is not None
+
+                    row = {
+                        "generator": generator,
+                        "size": size,
+                        "density": density,
+                        "engine": name,
+                        "preprocess_s": preprocess,
+                        "median_ns": summarize(medians)["median_ns"],
+                        "expanded": float(np.mean(expanded)) if expanded else None,
+                        "found": found,
+                    }
+                    rows.append(row)
+                    median_ms = "-" if row["median_ns"] is None else f"{row['median_ns'] / 1e6:.3f}"
+                    mean_expanded = "-" if row["expanded"] is None else f"{row['expanded']:.0f}"
+                    print(f"{generator:<12}{size:<7}{density:<8}{name:<10}{median_ms:<15}"
+                          f"{mean_expanded:<13}{found}/{len(pairs)}")
+    for name, skipped_sizes in skipped.items():
+        sizes_text = ", ".join(str(size) for size in dict.fromkeys(skipped_sizes))
+        print(f"{name} ohitettu koilla {sizes_text} (raja {size_limits[name]})")
+    return rows
+
+
+def plot_scaling(rows, filename=None):
+    """
+    Piirtää ajan ja laajennetut solmut kartan koon funktiona.
+
+    Jokaiselle generaattorille piirretään sarake, jonka yläkuvassa on aika
+    ja alakuvassa laajennetut solmut logaritmisilla akseleilla. Jokainen
+    algoritmin ja tiheyden yhdistelmä on oma viivansa.
+
+    Args:
+        rows (list): run_scaling_benchmark-funktion tulos
+        filename (str, optional): Tiedosto, johon kuva tallennetaan. Oletuksena kuva näytetään.
+    """
+    import matplotlib.pyplot as plt
+
+    generators = list(dict.fromkeys(row["generator"] for row in rows))
+    fig, axes = plt.subplots(2, len(generators), figsize=(5 * len(generators), 8), squeeze=False)
+    for column, generator in enumerate(generators):
+        series = {}
+        for row in rows:
+            if row["generator"] == generator and row["median_ns"] is not None:
+                series.setdefault((row["engine"], row["density"]), []).append(row)
+        for (engine, density), points in series.items():
+            points.sort(key=lambda row: row["size"])
+            sizes = [row["size"] for row in points]
+            label = f"{engine} {density}"
+            axes[0][column].plot(sizes, [row["median_ns"] / 1e6 for row in points], marker="o", label=label)
+            axes[1][column].plot(sizes, [row["expanded"] for row in points], marker="o", label=label)
+
+        axes[0][column].set_title(generator)
+        axes[0][column].set_ylabel("Mediaaniaika (ms)")
+        axes[1][column].set_ylabel("Laajennetut solmut")
+        axes[1][column].set_xlabel("Kartan sivu (solua)")
+        for ax in (axes[0][column], axes[1][column]):
+            ax.set_xscale("log", base=2)
+            ax.set_yscale("log")
+        axes[0][column].legend(fontsize="small")
+
+    plt.tight_layout()
+    if filename:
+        fig.savefig(filename)
+        plt.close(fig)
+    else:
+        plt.show()
+
+
+def main(argv=None):
+    """
+    Komentorivikäyttö: ajaa skaalausmittauksen ja piirtää tulokset.
+
+    Returns:
+        list: run_scaling_benchmark-funktion tulos
+    """
+    parser = argparse.ArgumentParser(description="Algoritmien skaalautuvuus synteettisillä kartoilla")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES),
+                        help="Kartan sivun pituudet (oletuksena 64-4096)")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), help="Mitattavat algoritmit")
+    parser.add_argument("--generators", nargs="+", choices=list(GENERATORS), help="Karttatyypit")
+    parser.add_argument("--densities", nargs="+", type=float, default=[0.1, 0.2, 0.3], help="Tiheydet")
+    parser.add_argument("--queries", type=int, default=5, help="Kyselyt karttaa kohti")
+    parser.add_argument("--seed", type=int, default=0, help="Siemen kartoille ja kyselyille")
+    parser.add_argument("--warmup", type=int, default=0, help="Lämmittelyajot kyselyä kohti")
+    parser.add_argument("--repeats", type=int, default=3, help="Mitatut ajot kyselyä kohti")
+    parser.add_argument("--no-size-limits", action="store_true",
+                        help="Aja myös hitaat algoritmit kaikilla koilla, ks. SIZE_LIMITS")
+    parser.add_argument("--plot", metavar="TIEDOSTO", help="Tallenna kuva tiedostoon näyttämisen sijaan")
+    parser.add_argument("--no-plot", action="store_true", help="Älä piirrä tuloksia")
+    args = parser.parse_args(argv)
+
+    rows = run_scaling_benchmark(args.generators, args.sizes, args.densities, args.engines,
+                                 args.queries, args.seed, args.warmup, args.repeats,
+                                 {} if args.no_size_limits else None)
+    if not args.no_plot:
+        plot_scaling(rows, args.plot)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
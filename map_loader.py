@@ -1,5 +1,15 @@
 import numpy as np
 
+# MovingAI-maastotyyppien oletuskustannukset. Puuttuvat merkit (esim. '@' ja 'O')
+# ovat esteitä, joiden kustannus on ääretön.
+DEFAULT_TERRAIN_COSTS = {
+    '.': 1.0,  # tavallinen maasto
+    'G': 1.0,  # tavallinen maasto
+    'S': 2.0,  # suo
+    'W': 3.0,  # vesi
+    'T': 4.0,  # puut
+}
+
 
 def load_map(filename):
     """
@@ -48,6 +58,25 @@ def load_scenarios(filename):
     return scenarios
 
 
+def load_scenario_buckets(filename):
+    """
+    Lataa skenaarioiden ryhmänumerot (bucket) tiedostosta.
+    
+    MovingAI-skenaariotiedoston ensimmäinen sarake ryhmittelee skenaariot
+    optimaalisen reitin pituuden mukaan. Palautettu lista on samassa
+    järjestyksessä kuin load_scenarios-funktion palauttama lista.
+    
+    Args:
+        filename (str): Ladattavan skenaariotiedoston nimi
+    
+    Returns:
+        list: Lista skenaarioiden ryhmänumeroista
+    """
+    with open(filename, 'r') as file:
+        lines = file.readlines()[1:]  # otsikko jätetään pois
+        return [int(line.split()[0]) for line in lines]
+
+
 def map_to_numpy(map_data):
     """
     Muuntaa karttadatan numpy-taulukoksi polunhakualgoritmeja varten.
@@ -62,4 +91,46 @@ def map_to_numpy(map_data):
     Returns:
         numpy.ndarray: 2D numpy-taulukko jossa 0 = vapaa, 1 = este
     """
-    return np.array([[0 if cell == '.' else 1 for cell in row] for row in map_data])
\ No newline at end of file
+    return np.array([[0 if cell == '.' else 1 for cell in row] for row in map_data])
+
+
+def map_to_cost_grid(map_data, terrain_costs=None):
+    """
+    Muuntaa karttadatan kustannusruudukoksi maastotyyppien mukaan.
+    
+    Jokainen merkki muutetaan solun läpikulkukustannukseksi hakutaulukon
+    avulla yhdellä vektorisoidulla operaatiolla. Merkit, joita ei löydy
+    kustannustaulukosta, ovat esteitä (kustannus numpy.inf).
+    
+    Args:
+        map_data (list): 2D lista joka sisältää kartan merkkeinä
+        terrain_costs (dict, optional): Merkkien kustannukset muodossa {merkki: kustannus}.
+            Oletuksena DEFAULT_TERRAIN_COSTS.
+    
+    Returns:
+        numpy.ndarray: 2D float32-taulukko solujen läpikulkukustannuksista
+    """
+    if terrain_costs is None:
+        terrain_costs = DEFAULT_TERRAIN_COSTS
+
+    # Hakutaulukko merkkikoodista kustannukseen, tuntemattomat merkit ovat esteitä
+    lookup = np.full(256, np.inf, dtype=np.float32)
+    for char, cost in terrain_costs.items():
+        lookup[ord(char)] = cost
+
+    codes = np.array(map_data, dtype='U1').view(np.uint32)
+    codes = np.where(codes < 256, codes, 0)
+    return lookup[codes]
+
+
+def cost_grid_to_obstacles(cost_grid):
+    """
+    Muuntaa kustannusruudukon esteruudukoksi.
+    
+    Args:
+        cost_grid (numpy.ndarray): Kustannusruudukko, jossa esteiden kustannus on ääretön
+    
+    Returns:
+        numpy.ndarray: 2D numpy-taulukko jossa 0 = vapaa, 1 = este
+    """
+    return (~np.isfinite(cost_grid)).astype(int)
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Tiivis reittitulos hyppypisteistä.
+
+JPS ja RSR palauttavat reitin käännöspisteinä. PathResult tallentaa pisteet
+yhteen int32-taulukkoon muodossa (N, 2), laskee reitin octile-pituuden
+kerran vektoroidusti ja tuottaa välisolut vasta pyydettäessä. Suurissa
+ajoerissä ei näin tarvitse muodostaa miljoonia tupleja, joita kukaan ei lue.
+"""
+
+import math
+
+import numpy as np
+
+SQRT2_MINUS_1 = math.sqrt(2) - 1
+
+
+def path_cost(waypoints):
+    """
+    Laskee käännöspisteiden välisten osuuksien octile-pituuksien summan.
+
+    Args:
+        waypoints (numpy.ndarray or list): Pisteet muodossa (N, 2)
+
+    Returns:
+        float: Reitin kokonaispituus (0.0 jos pisteitä on alle kaksi)
+    """
+    points = np.asarray(waypoints, dtype=np.int64).reshape(-1, 2)
+    if len(points) < 2:
+        return 0.0
+    delta = np.abs(np.diff(points, axis=0))
+    longer = delta.max(axis=1)
+    shorter = delta.min(axis=1)
+    return float(longer.sum() + SQRT2_MINUS_1 * shorter.sum())
+
+
+class PathResult:
+    """
+    Käännöspisteinä tallennettu reitti.
+
+    Peräkkäisten pisteiden välisten osuuksien on oltava suoria tai
+    diagonaalisia, kuten JPS:n hyppypisteillä.
+
+    Attributes:
+        cost (float): Reitin octile-pituus
+    """
+
+    __slots__ = ("_waypoints", "cost")
+
+    def __init__(self, waypoints):
+        """
+        Args:
+            waypoints (numpy.ndarray): int32-taulukko muodossa (N, 2)
+        """
+        waypoints = np.ascontiguousarray(waypoints, dtype=np.int32).reshape(-1, 2)
+        waypoints.flags.writeable = False
+        self._waypoints = waypoints
+        self.cost = path_cost(waypoints)
+
+    @classmethod
+    def from_waypoints(cls, path):
+        """
+        Muodostaa tuloksen hakualgoritmin palauttamasta pistelistasta.
+
+        Args:
+            path (list or None): Lista pisteistä (x, y)
+
+        Returns:
+            PathResult or None: Tulos, tai None jos reittiä ei ole
+        """
+        if path is None:
+            return None
+        return cls(np.array(path, dtype=np.int32).reshape(-1, 2))
+
+    @property
+    def waypoints(self):
+        """numpy.ndarray: Käännöspisteet kopioimattomana, vain luettavana näkymänä."""
+        return self._waypoints.view()
+
+    @property
+    def start(self):
+        """tuple: Reitin ensimmäinen piste."""
+        return tuple(self._waypoints[0].tolist())
+
+    @property
+    def goal(self):
+        """tuple: Reitin viimeinen piste."""
+        return tuple(self._waypoints[-1].tolist())
+
+    @property
+    def cell_count(self):
+        """int: Reitin solujen määrä välisolut mukaan lukien."""
+        if len(self._waypoints) < 2:
+            return len(self._waypoints)
+        steps = np.abs(np.diff(self._waypoints, axis=0)).max(axis=1)
+        return int(steps.sum()) + 1
+
+    def __len__(self):
+        """Palauttaa käännöspisteiden määrän."""
+        return len(self._waypoints)
+
+    def __iter__(self):
+        """Käy läpi käännöspisteet tupleina."""
+        return iter(self.to_list())
+
+    def to_list(self):
+        """
+        Palauttaa käännöspisteet samassa muodossa kuin find_path.
+
+        Returns:
+            list: Lista pisteistä (x, y)
+        """
+        return [tuple(point) for point in self._waypoints.tolist()]
+
+    def iter_cells(self):
+        """
+        Tuottaa reitin kaikki solut yksi kerrallaan.
+
+        Yields:
+            tuple: Seuraava solu (x, y), ensimmäisestä käännöspisteestä viimeiseen
+        """
+        points = self._waypoints.tolist()
+        if not points:
+            return
+        x, y = points[0]
+        yield (x, y)
+        for tx, ty in points[1:]:
+            dx = (tx > x) - (tx < x)
+            dy = (ty > y) - (ty < y)
+            while (x, y) != (tx, ty):
+                x += dx
+                y += dy
+                yield (x, y)
+
+    def cells(self):
+        """
+        Palauttaa reitin kaikki solut yhtenä taulukkona.
+
+        Returns:
+            numpy.ndarray: int32-taulukko muodossa (cell_count, 2)
+        """
+        points = self._waypoints
+        if len(points) < 2:
+            return points.copy()
+        delta = np.diff(points, axis=0)
+        steps = np.abs(delta).max(axis=1)
+        direction = np.sign(delta)
+        # Jokaisen solun etäisyys oman osuutensa alusta
+        segment = np.repeat(np.arange(len(steps)), steps)
+        offset = np.arange(len(segment)) - np.repeat(np.cumsum(steps) - steps, steps) + 1
+        cells = np.empty((len(segment) + 1, 2), dtype=np.int32)
+        cells[0] = points[0]
+        cells[1:] = points[segment] + direction[segment] * offset[:, None]
+        return cells
+
+    def __repr__(self):
+        return f"PathResult(waypoints={len(self)}, cost={self.cost:.3f})"
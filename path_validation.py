@@ -0,0 +1,157 @@
+"""
+Reittien vektoroitu kelpoisuus- ja optimaalisuustarkistus.
+
+Erän reitit annetaan yhtenä pistetaulukkona ja alkukohtien taulukkona
+(offsets), joten miljoonienkin reittien tarkistus on muutama numpy-
+operaatio ilman Python-silmukkaa reittien yli. Reitti voi koostua
+vierekkäisistä soluista (A*) tai käännöspisteistä (JPS, RSR); jokaisen
+osuuden on oltava suora tai diagonaalinen, ja osuudet puretaan soluiksi
+tarkistusta varten.
+
+Tarkistukset:
+
+- jokainen osuus on suora tai diagonaalinen eikä nollan mittainen
+- kaikki reitin solut ovat ruudukon sisällä ja vapaita
+- diagonaaliaskeleet eivät leikkaa kulmia valitun säännön mukaan
+- reitin octile-pituus vastaa optimaalista pituutta toleranssin sisällä
+
+Kulmasääntö on oletuksena sama kuin hakualgoritmeissa: diagonaaliaskel
+on sallittu, kun kohdesolu on vapaa. Sääntö 'no_squeeze' kieltää
+kulkemisen kahden esteen välistä ja 'strict' (MovingAI) diagonaaliaskeleen,
+jonka kumpi tahansa ortogonaalinen naapuri on este.
+"""
+
+import math
+
+import numpy as np
+
+SQRT2_MINUS_1 = math.sqrt(2) - 1
+
+# Virhekoodit; reitin flags-arvo on sen virheiden bittitai
+BAD_STEP = 1
+OUT_OF_BOUNDS = 2
+BLOCKED = 4
+CORNER_CUT = 8
+
+CORNER_RULES = ("allow", "no_squeeze", "strict")
+
+
+def pack_paths(paths):
+    """
+    Yhdistää reitit pistetaulukoksi ja alkukohdiksi.
+
+    Args:
+        paths (list): Reitit listoina pisteistä (x, y). None tarkoittaa löytymätöntä reittiä.
+
+    Returns:
+        tuple: (pisteet int32-taulukkona (N, 2), offsets int64-taulukkona (P + 1,)).
+               Reitin i pisteet ovat points[offsets[i]:offsets[i + 1]].
+    """
+    lengths = np.array([len(path) if path else 0 for path in paths], dtype=np.int64)
+    offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    chunks = [np.asarray(path, dtype=np.int32).reshape(-1, 2) for path in paths if path]
+    points = np.concatenate(chunks) if chunks else np.zeros((0, 2), dtype=np.int32)
+    return points, offsets
+
+
+def validate_paths(points, offsets, grid, optimal=None, tolerance=1e-4, corner_rule="allow"):
+    """
+    Tarkistaa erän reitit ja laskee niiden octile-pituudet.
+
+    Args:
+        points (numpy.ndarray): Kaikkien reittien pisteet peräkkäin muodossa (N, 2)
+        offsets (numpy.ndarray): Reittien alkukohdat pisteissä, pituus P + 1
+        grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+        optimal (numpy.ndarray, optional): Optimaaliset pituudet (P,)
+        tolerance (float, optional): Sallittu absoluuttinen ero optimaaliseen pituuteen
+        corner_rule (str, optional): 'allow', 'no_squeeze' tai 'strict'
+
+    Returns:
+        dict: Taulukot pituudeltaan P:
+            found (bool): Reitissä on vähintään yksi piste
+            flags (int): Virhekoodien bittitai (BAD_STEP, OUT_OF_BOUNDS, BLOCKED, CORNER_CUT)
+            legal (bool): found ja flags == 0
+            length (float): Octile-pituus
+            optimal_ok (bool): legal ja pituus vastaa optimaalista (vain jos optimal annettu)
+
+    Raises:
+        ValueError: Jos corner_rule on tuntematon
+    """
+    if corner_rule not in CORNER_RULES:
+        raise ValueError(f"Tuntematon kulmasääntö: {corner_rule}")
+    points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    blocked = np.asarray(grid) != 0
+    rows, cols = blocked.shape
+    path_count = len(offsets) - 1
+    counts = np.diff(offsets)
+    owner = np.repeat(np.arange(path_count), counts)
+    flags = np.zeros(path_count, dtype=np.int64)
+
+    def flag(paths, code):
+        hits = np.bincount(paths, minlength=path_count) > 0
+        flags[hits] |= code
+
+    # Osuudet ovat peräkkäisiä pistepareja saman reitin sisällä
+    pair = np.flatnonzero(owner[:-1] == owner[1:]) if len(points) > 1 else np.zeros(0, dtype=np.int64)
+    segment_owner = owner[pair]
+    delta = points[pair + 1] - points[pair]
+    adx, ady = np.abs(delta[:, 0]), np.abs(delta[:, 1])
+    good = ((adx == 0) | (ady == 0) | (adx == ady)) & ((adx != 0) | (ady != 0))
+    flag(segment_owner[~good], BAD_STEP)
+
+    longer = np.maximum(adx, ady)
+    shorter = np.minimum(adx, ady)
+    length = np.bincount(segment_owner, weights=longer + SQRT2_MINUS_1 * shorter, minlength=path_count)
+
+    # Puretaan kelvolliset osuudet soluiksi; askel k vie solusta k - 1 soluun k
+    steps = np.where(good, longer, 0)
+    segment = np.repeat(np.arange(len(pair)), steps)
+    k = np.arange(len(segment)) - np.repeat(np.cumsum(steps) - steps, steps) + 1
+    sign = np.sign(delta)
+    cell_owner = np.concatenate([owner[offsets[:-1][counts > 0]], segment_owner[segment]])
+    cells = np.concatenate([points[offsets[:-1][counts > 0]],
+                            points[pair[segment]] + sign[segment] * k[:, None]])
+
+    inside = (cells[:, 0] >= 0) & (cells[:, 0] < rows) & (cells[:, 1] >= 0) & (cells[:, 1] < cols)
+    flag(cell_owner[~inside], OUT_OF_BOUNDS)
+    clipped = np.clip(cells, 0, [rows - 1, cols - 1])
+    flag(cell_owner[inside & blocked[clipped[:, 0], clipped[:, 1]]], BLOCKED)
+
+    if corner_rule != "allow":
+        diagonal = (sign[segment, 0] != 0) & (sign[segment, 1] != 0)
+        previous = points[pair[segment]] + sign[segment] * (k - 1)[:, None]
+        side_x = np.clip(previous + sign[segment] * [1, 0], 0, [rows - 1, cols - 1])
+        side_y = np.clip(previous + sign[segment] * [0, 1], 0, [rows - 1, cols - 1])
+        blocked_x = blocked[side_x[:, 0], side_x[:, 1]]
+        blocked_y = blocked[side_y[:, 0], side_y[:, 1]]
+        cut = (blocked_x & blocked_y) if corner_rule == "no_squeeze" else (blocked_x | blocked_y)
+        flag(segment_owner[segment[diagonal & cut]], CORNER_CUT)
+
+    found = counts > 0
+    result = {
+        "found": found,
+        "flags": flags,
+        "legal": found & (flags == 0),
+        "length": length,
+    }
+    if optimal is not None:
+        optimal = np.asarray(optimal, dtype=np.float64)
+        result["optimal_ok"] = result["legal"] & (np.abs(length - optimal) <= tolerance)
+    return result
+
+
+def describe_flags(flags):
+    """
+    Muuttaa virhekoodit luettavaksi tekstiksi.
+
+    Args:
+        flags (int): validate_paths-funktion flags-arvo
+
+    Returns:
+        str: Virheiden nimet pilkuilla erotettuna, tai 'ok'
+    """
+    names = [name for code, name in ((BAD_STEP, "virheellinen askel"), (OUT_OF_BOUNDS, "ruudukon ulkopuolella"),
+                                     (BLOCKED, "este"), (CORNER_CUT, "kulman leikkaus")) if flags & code]
+    return ", ".join(names) if names else "ok"
@@ -0,0 +1,172 @@
+"""
+Kyselyjen esisuodatus ennen varsinaista reitinhakua.
+
+Suuri osa skenaariotiedostojen alimpien ryhmien kyselyistä on yhden tai kahden
+askeleen mittaisia, ja silti jokainen find_path-kutsu rakentaa sanakirjansa
+ja kekonsa. QueryPrefilter vastaa seuraaviin kyselyihin ilman hakua:
+
+- lähtö ja maali ovat sama solu
+- lähtö ja maali ovat vierekkäiset solut
+- lähdöstä maaliin kulkee esteetön octile-monotoninen käytävä: ensin
+  diagonaalisesti ja sitten suoraan tai päinvastoin. Tällaisen reitin pituus
+  on octile-etäisyys, joten se on aina optimaalinen. Käytävä tarkistetaan
+  yhdellä numpy-indeksoinnilla.
+- kysely on jo ratkaistu aiemmin (LRU-välimuisti)
+
+Muut kyselyt välitetään hakualgoritmille.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from astar import AStar
+
+FILTERS = ("trivial", "adjacent", "line_of_sight", "cache", "engine")
+
+
+def monotone_corridor(start, goal, diagonal_first=True):
+    """
+    Palauttaa octile-monotonisen käytävän solut ilman lähtösolua.
+
+    Args:
+        start (tuple): Lähtösolu (x, y)
+        goal (tuple): Maalisolu (x, y)
+        diagonal_first (bool, optional): Kuljetaanko ensin diagonaalisesti
+
+    Returns:
+        tuple: (solujen koordinaatit (N, 2) -taulukkona, taitekohta (x, y))
+    """
+    dx, dy = goal[0] - start[0], goal[1] - start[1]
+    sx, sy = (dx > 0) - (dx < 0), (dy > 0) - (dy < 0)
+    diagonal = min(abs(dx), abs(dy))
+    straight = max(abs(dx), abs(dy)) - diagonal
+    # Suoran osuuden suunta: pidemmän akselin suuntaan
+    tx, ty = (sx, 0) if abs(dx) > abs(dy) else (0, sy)
+
+    steps_diagonal = np.arange(1, diagonal + 1)
+    steps_straight = np.arange(1, straight + 1)
+    if diagonal_first:
+        bend = (start[0] + sx * diagonal, start[1] + sy * diagonal)
+        xs = np.concatenate((start[0] + sx * steps_diagonal, bend[0] + tx * steps_straight))
+        ys = np.concatenate((start[1] + sy * steps_diagonal, bend[1] + ty * steps_straight))
+    else:
+        bend = (start[0] + tx * straight, start[1] + ty * straight)
+        xs = np.concatenate((start[0] + tx * steps_straight, bend[0] + sx * steps_diagonal))
+        ys = np.concatenate((start[1] + ty * steps_straight, bend[1] + sy * steps_diagonal))
+    return np.stack((xs, ys), axis=1), bend
+
+
+class QueryPrefilter:
+    """
+    Hakualgoritmin eteen asetettava esisuodatin.
+
+    Palauttaa saman muotoisen tuloksen kuin käärimänsä algoritmi. Ilman hakua
+    ratkaistuille kyselyille closed_set on tyhjä ja lisättyjen solmujen määrä 0.
+
+    Attributes:
+        grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+        engine: Hakualgoritmi, jolla on find_path(start, goal) -metodi
+        full_path (bool): Palautetaanko suorasta käytävästä kaikki solut (A*)
+            vai pelkät käännöspisteet (JPS, RSR)
+        cache_size (int): Välimuistiin tallennettavien reittien enimmäismäärä
+        stats (dict): Kunkin suodattimen ratkaisemien kyselyjen määrät
+    """
+
+    def __init__(self, grid, engine, full_path=None, cache_size=1024):
+        """
+        Args:
+            grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+            engine: Hakualgoritmi, esim. AStar tai JPS
+            full_path (bool, optional): Oletuksena True A*:lle ja False muille
+            cache_size (int, optional): Välimuistin koko. 0 poistaa välimuistin käytöstä.
+        """
+        self.grid = np.asarray(grid)
+        self.engine = engine
+        self.full_path = isinstance(engine, AStar) if full_path is None else full_path
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.stats = dict.fromkeys(FILTERS, 0)
+
+    def reset_stats(self):
+        """Nollaa suodattimien laskurit."""
+        self.stats = dict.fromkeys(FILTERS, 0)
+
+    def invalidate(self, grid=None):
+        """
+        Tyhjentää välimuistin, esim. kun ruudukko muuttuu.
+
+        Args:
+            grid (numpy.ndarray, optional): Uusi ruudukko
+        """
+        if grid is not None:
+            self.grid = np.asarray(grid)
+        self._cache.clear()
+
+    def _is_free(self, pos):
+        """Tarkistaa onko positio ruudukon sisällä ja vapaa."""
+        rows, cols = self.grid.shape
+        return 0 <= pos[0] < rows and 0 <= pos[1] < cols and self.grid[pos] == 0
+
+    def line_of_sight_path(self, start, goal):
+        """
+        Etsii esteettömän octile-monotonisen käytävän lähdöstä maaliin.
+
+        Args:
+            start (tuple): Lähtösolu (x, y)
+            goal (tuple): Maalisolu (x, y)
+
+        Returns:
+            list or None: Reitti, tai None jos kumpikaan käytävä ei ole vapaa
+        """
+        rows, cols = self.grid.shape
+        for diagonal_first in (True, False):
+            cells, bend = monotone_corridor(start, goal, diagonal_first)
+            # Käytävä pysyy lähdön ja maalin rajaamassa suorakulmiossa, joten rajoja ei tarkisteta
+            if self.grid[cells[:, 0], cells[:, 1]].any():
+                continue
+            if self.full_path:
+                return [start] + [tuple(cell) for cell in cells.tolist()]
+            if bend in (start, goal):
+                return [start, goal]
+            return [start, bend, goal]
+        return None
+
+    def find_path(self, start, goal):
+        """
+        Etsii reitin esisuodattimien tai hakualgoritmin avulla.
+
+        Args:
+            start (tuple): Aloitussolmu (x, y)
+            goal (tuple): Maalisolmu (x, y)
+
+        Returns:
+            tuple: (path, closed_set, solmujen määrä) kuten engine.find_path
+        """
+        start, goal = tuple(start), tuple(goal)
+        if self._is_free(start) and self._is_free(goal):
+            if start == goal:
+                self.stats["trivial"] += 1
+                return [start], set(), 0
+            if max(abs(start[0] - goal[0]), abs(start[1] - goal[1])) == 1:
+                self.stats["adjacent"] += 1
+                return [start, goal], set(), 0
+            path = self.line_of_sight_path(start, goal)
+            if path is not None:
+                self.stats["line_of_sight"] += 1
+                return path, set(), 0
+
+        key = (start, goal)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.stats["cache"] += 1
+            path = self._cache[key]
+            return (list(path) if path is not None else None), set(), 0
+
+        self.stats["engine"] += 1
+        path, closed_set, count = self.engine.find_path(start, goal)
+        if self.cache_size > 0:
+            self._cache[key] = path
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return path, closed_set, count
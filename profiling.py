@@ -0,0 +1,241 @@
+"""
+Skenaarioryhmien profilointi algoritmeittain.
+
+Valittujen skenaarioryhmien kyselyt ajetaan profiloijan alla erikseen
+jokaiselle algoritmille. Tuloksena syntyy jokaista (algoritmi, ryhmä)
+-paria kohti:
+
+- .pstats-tiedosto (cProfile-tila), jota voi tutkia pstats-moduulilla
+  tai esim. snakeviz-työkalulla
+- .collapsed-tiedosto, jossa jokainen rivi on puolipisteillä erotettu
+  kutsupino ja sen paino. Muoto kelpaa sellaisenaan flamegraph.pl- ja
+  speedscope-työkaluille.
+
+cProfile mittaa jokaisen kutsun, mutta tallentaa vain kutsuja-kutsuttu-
+parit, joten sen kutsupinot johdetaan jakamalla funktion oma aika
+kutsujille niiden kumulatiivisen ajan suhteessa. Näytteenottotilassa
+erillinen säie lukee pääsäikeen pinon sys._current_frames-funktiolla
+tasaisin välein. Pinot ovat silloin todellisia, ja haun hidastuminen on
+pienempi, mutta lyhyet funktiot voivat jäädä näytteistä pois.
+
+Jokaisen pinon juurena on algoritmin nimi, joten saman ryhmän pinot eri
+algoritmeilta voi yhdistää yhdeksi liekkikuvaksi.
+"""
+
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+from collections import Counter
+
+
+def _run_queries(engine, queries):
+    """Ajaa kyselyt. Profiloinnin pinot katkaistaan tämän funktion kohdalta."""
+    for start, goal in queries:
+        engine.find_path(start, goal)
+
+
+def _label(filename, lineno, name):
+    """Muodostaa kehykselle nimen muodossa 'funktio (tiedosto:rivi)'."""
+    if filename == "~":
+        # Sisäänrakennetut funktiot, esim. <built-in method _heapq.heappush>
+        return name
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def _slug(name):
+    """Muuttaa algoritmin nimen tiedostonimeen sopivaksi, esim. 'A*' -> 'astar'."""
+    return re.sub(r"\W+", "", name.replace("*", "star")).lower()
+
+
+class SamplingProfiler:
+    """
+    Näytteenottoon perustuva profiloija.
+
+    Taustasäie lukee profiloitavan säikeen pinon interval sekunnin välein.
+    Pinoon otetaan mukaan vain root-funktion alapuoliset kehykset, ja
+    näytteet, joissa root-funktiota ei ole, ohitetaan. Tulkin säikeenvaihtoväli
+    asetetaan profiloinnin ajaksi näytteenottoväliin, jotta taustasäie pääsee
+    ajoon riittävän usein.
+
+    Attributes:
+        interval (float): Näytteenottoväli sekunteina
+        root (code): Funktion koodiolio, jonka alapuoliset kehykset tallennetaan
+        samples (Counter): Näytteiden määrät pinoittain {(kehys, ...): määrä}
+    """
+
+    def __init__(self, interval=0.001, root=_run_queries):
+        """
+        Args:
+            interval (float, optional): Näytteenottoväli sekunteina
+            root (function, optional): Funktio, jonka kutsuista pinot alkavat
+        """
+        self.interval = interval
+        self.root = root.__code__
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._switch_interval = None
+
+    def start(self):
+        """Aloittaa näytteenoton kutsuvasta säikeestä."""
+        target = threading.get_ident()
+        self._stop.clear()
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._thread = threading.Thread(target=self._sample, args=(target,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Lopettaa näytteenoton ja palauttaa säikeenvaihtovälin."""
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def _sample(self, target):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None and frame.f_code is not self.root:
+                code = frame.f_code
+                stack.append(_label(code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if frame is not None and stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+    def collapsed(self):
+        """
+        Returns:
+            dict: {(kehys, ...): näytteiden määrä}
+        """
+        return dict(self.samples)
+
+
+def pstats_to_collapsed(stats, root=_run_queries, min_weight=1):
+    """
+    Johtaa cProfile-tuloksesta kutsupinot liekkikuvaa varten.
+
+    Funktion oma aika jaetaan sen kutsujille kutsujan kautta kertyneen
+    kumulatiivisen ajan suhteessa, ja jakoa jatketaan ylöspäin root-
+    funktioon asti. Rekursiiviset kutsut (esim. jps.jump) yhdistetään
+    ylimpään kutsukertaan. Tulos on arvio, sillä cProfile ei tallenna
+    kokonaisia pinoja.
+
+    Args:
+        stats (pstats.Stats): Profiloinnin tulos
+        root (function, optional): Funktio, josta pinot alkavat. Juurta ei oteta pinoon mukaan.
+        min_weight (int, optional): Pienin tallennettava paino mikrosekunteina
+
+    Returns:
+        dict: {(kehys, ...): oma aika mikrosekunteina}
+    """
+    entries = stats.stats
+    root_key = (root.__code__.co_filename, root.__code__.co_firstlineno, root.__code__.co_name)
+    collapsed = Counter()
+
+    def walk(func, path, weight):
+        if func == root_key:
+            if path:
+                collapsed[tuple(_label(*f) for f in reversed(path))] += weight
+            return
+        callers = {caller: values for caller, values in entries[func][4].items()
+                   if caller not in path and caller != func}
+        total = sum(values[3] for values in callers.values())
+        if total <= 0:
+            return
+        for caller, values in callers.items():
+            share = weight * values[3] / total
+            if share >= min_weight:
+                walk(caller, path + [func], share)
+
+    for func, (_, _, own_time, _, _) in entries.items():
+        if own_time > 0:
+            walk(func, [], own_time * 1e6)
+    return {stack: int(round(weight)) for stack, weight in collapsed.items() if weight >= min_weight}
+
+
+def write_collapsed(collapsed, filename, prefix=None):
+    """
+    Kirjoittaa kutsupinot flamegraph.pl-yhteensopivaan tekstitiedostoon.
+
+    Args:
+        collapsed (dict): {(kehys, ...): paino}
+        filename (str): Tiedoston nimi
+        prefix (str, optional): Jokaisen pinon juureksi lisättävä kehys, esim. algoritmin nimi
+    """
+    with open(filename, "w", encoding="utf-8") as f:
+        for stack, weight in sorted(collapsed.items(), key=lambda item: -item[1]):
+            frames = ([prefix] if prefix else []) + list(stack)
+            f.write(";".join(frame.replace(";", ",") for frame in frames) + f" {weight}\n")
+
+
+def profile_buckets(engines, scenarios, buckets, selected=None, output_dir="profiles",
+                    mode="cprofile", interval=0.001):
+    """
+    Profiloi valittujen ryhmien kyselyt jokaiselle algoritmille erikseen.
+
+    Jokaiselle algoritmille ja ryhmälle kirjoitetaan tiedostot
+    <algoritmi>_bucket<ryhmä>.collapsed ja cProfile-tilassa lisäksi
+    <algoritmi>_bucket<ryhmä>.pstats hakemistoon output_dir.
+
+    Args:
+        engines (dict): {nimi: algoritmi, jolla on find_path(start, goal) -metodi}
+        scenarios (list): Lista skenaarioita (alku, loppu, optimaalinen_pituus)
+        buckets (list): Skenaarioiden ryhmät, ks. map_loader.load_scenario_buckets
+        selected (list, optional): Profiloitavat ryhmät. Oletuksena kaikki.
+        output_dir (str, optional): Hakemisto tulostiedostoille
+        mode (str, optional): 'cprofile' tai 'sampling'
+        interval (float, optional): Näytteenottoväli sekunteina sampling-tilassa
+
+    Returns:
+        list: Rivit muodossa (algoritmi, ryhmä, kyselyt, kirjoitetut tiedostot)
+
+    Raises:
+        ValueError: Jos mode on tuntematon
+    """
+    if mode not in ("cprofile", "sampling"):
+        raise ValueError(f"Tuntematon profilointitila: {mode}")
+    if selected is None:
+        selected = sorted(set(buckets))
+    os.makedirs(output_dir, exist_ok=True)
+
+    rows = []
+    for bucket in selected:
+        queries = [(start, goal) for (start, goal, _), b in zip(scenarios, buckets) if b == bucket]
+        if not queries:
+            continue
+        for name, engine in engines.items():
+            base = os.path.join(output_dir, f"{_slug(name)}_bucket{bucket}")
+            files = []
+            if mode == "cprofile":
+                profiler = cProfile.Profile()
+                profiler.runcall(_run_queries, engine, queries)
+                stats = pstats.Stats(profiler)
+                stats.dump_stats(base + ".pstats")
+                files.append(base + ".pstats")
+                collapsed = pstats_to_collapsed(stats)
+            else:
+                profiler = SamplingProfiler(interval)
+                profiler.start()
+                try:
+                    _run_queries(engine, queries)
+                finally:
+                    profiler.stop()
+                collapsed = profiler.collapsed()
+            write_collapsed(collapsed, base + ".collapsed", prefix=name)
+            files.append(base + ".collapsed")
+            rows.append((name, bucket, len(queries), files))
+    return rows
+
+
+def print_hotspots(filename, limit=10):
+    """
+    Tulostaa .pstats-tiedoston eniten omaa aikaa käyttäneet funktiot.
+
+    Args:
+        filename (str): .pstats-tiedoston nimi
+        limit (int, optional): Tulostettavien funktioiden määrä
+    """
+    pstats.Stats(filename).sort_stats("tottime").print_stats(limit)
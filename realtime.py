@@ -0,0 +1,362 @@
+"""
+Keskeytettävä A*-haku ja hakujen ajoitus reaaliaikaiseen tick-silmukkaan.
+
+AStar.find_path suorittaa haun loppuun yhdellä kutsulla. IncrementalSearch
+säilyttää avoimen joukon, g-arvot ja edeltäjät kutsujen välillä, joten haku
+voi edetä enintään N laajennusta tai T mikrosekuntia kerrallaan. Haku kertoo
+edistymisensä ja tähänastisen parhaan osittaisen reitin.
+
+SearchScheduler jakaa yhden tickin aikabudjetin vuorotellen kaikkien
+käynnissä olevien hakujen kesken ja mittaa tickien kestojen vaihtelun.
+"""
+
+import gc
+import heapq
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+import map_loader as ml
+from astar import AStar, get_neighbors
+
+RUNNING = "running"
+FOUND = "found"
+FAILED = "failed"
+
+
+class IncrementalSearch:
+    """
+    Osissa suoritettava A*-haku.
+
+    Käyttää AStar-olion ruudukkoa, heuristiikkaa, kustannusruudukkoa ja
+    karsintaindeksejä, joten valmis reitti on sama kuin AStar.find_path-metodilla.
+
+    Attributes:
+        start (tuple): Aloitussolmu (x, y)
+        goal (tuple): Maalisolmu (x, y)
+        status (str): RUNNING, FOUND tai FAILED
+        path (list or None): Valmis reitti, kun status on FOUND
+        closed_set (set): Laajennetut solmut
+        nodes_added (int): Avoimeen joukkoon lisättyjen solmujen määrä
+        expansions (int): Laajennettujen solmujen määrä
+        elapsed_us (float): Hakuun käytetty aika mikrosekunteina
+    """
+
+    def __init__(self, engine, start, goal):
+        """
+        Args:
+            engine (AStar): Hakuasetukset sisältävä A*-olio
+            start (tuple): Aloitussolmu (x, y)
+            goal (tuple): Maalisolmu (x, y)
+        """
+        self.engine = engine
+        self.start = start
+        self.goal = goal
+        self.status = RUNNING
+        self.path = None
+
+        self._heuristic = engine._heuristic
+        self._allowed = (engine.dead_ends.query_filter(start, goal)
+                         if engine.dead_ends is not None else None)
+        h_start = self._heuristic(start, goal)
+        self.g_scores = {start: 0}
+        self.came_from = {}
+        self.closed_set = set()
+        self.open_set = [(h_start, start)]
+        self.nodes_added = 1
+        self.expansions = 0
+        self.elapsed_us = 0.0
+
+        # Paras osittainen reitti päättyy solmuun, jonka heuristiikka on pienin
+        self._initial_h = h_start
+        self._best = (h_start, start)
+
+    @property
+    def done(self):
+        """bool: Onko haku päättynyt."""
+        return self.status != RUNNING
+
+    def step(self, max_expansions=None, max_time_us=None):
+        """
+        Jatkaa hakua annetun budjetin verran.
+
+        Budjetit tarkistetaan jokaisen laajennuksen jälkeen, joten aikabudjetti
+        voi ylittyä enintään yhden laajennuksen verran. Jos kumpaakaan budjettia
+        ei anneta, haku suoritetaan loppuun.
+
+        Args:
+            max_expansions (int, optional): Laajennettavien solmujen enimmäismäärä
+            max_time_us (float, optional): Aikabudjetti mikrosekunteina
+
+        Returns:
+            str: Haun tila kutsun jälkeen (RUNNING, FOUND tai FAILED)
+        """
+        if self.done:
+            return self.status
+
+        goal = self.goal
+        grid = self.engine.grid
+        cost_grid = self.engine.cost_grid
+        goal_bounds = self.engine.goal_bounds
+        allowed = self._allowed
+        heuristic = self._heuristic
+        g_scores = self.g_scores
+        came_from = self.came_from
+        closed_set = self.closed_set
+        open_set = self.open_set
+
+        started = time.perf_counter_ns()
+        deadline = started + max_time_us * 1000 if max_time_us is not None else None
+        budget = max_expansions if max_expansions is not None else math.inf
+        expanded = 0
+
+        while expanded < budget:
+            if not open_set:
+                self.status = FAILED
+                break
+            current = heapq.heappop(open_set)[1]
+            if current in closed_set:
+                continue
+            if current == goal:
+                self.path = self._trace(current)
+                self.status = FOUND
+                break
+
+            closed_set.add(current)
+            expanded += 1
+            h_current = heuristic(current, goal)
+            if h_current < self._best[0]:
+                self._best = (h_current, current)
+
+            for neighbor in get_neighbors(current, grid):
+                if neighbor in closed_set:
+                    continue
+                if goal_bounds is not None and not goal_bounds.allows(
+                        current, (neighbor[0] - current[0], neighbor[1] - current[1]), goal):
+                    continue
+                if allowed is not None and not allowed(neighbor):
+                    continue
+                step = math.sqrt(2) if abs(neighbor[0] - current[0]) + abs(neighbor[1] - current[1]) == 2 else 1
+                if cost_grid is not None:
+                    step *= cost_grid.item(neighbor[0], neighbor[1])
+                tentative_g = g_scores[current] + step
+                if neighbor not in g_scores or tentative_g < g_scores[neighbor]:
+                    came_from[neighbor] = current
+                    g_scores[neighbor] = tentative_g
+                    heapq.heappush(open_set, (tentative_g + heuristic(neighbor, goal), neighbor))
+                    self.nodes_added += 1
+
+            if deadline is not None and time.perf_counter_ns() >= deadline:
+                break
+
+        self.expansions += expanded
+        self.elapsed_us += (time.perf_counter_ns() - started) / 1000
+        return self.status
+
+    def _trace(self, node):
+        """Muodostaa reitin aloitussolmusta annettuun solmuun."""
+        path = [node]
+        while node in self.came_from:
+            node = self.came_from[node]
+            path.append(node)
+        return path[::-1]
+
+    def best_partial_path(self):
+        """
+        Palauttaa reitin laajennettuun solmuun, joka on heuristiikan mukaan lähimpänä maalia.
+
+        Returns:
+            list: Valmis reitti, jos haku on löytänyt maalin, muuten osittainen reitti
+        """
+        if self.status == FOUND:
+            return self.path
+        return self._trace(self._best[1])
+
+    def progress(self):
+        """
+        Palauttaa haun edistymisen.
+
+        Returns:
+            dict: expansions, open_size, best_h ja fraction, joka kertoo kuinka
+                  suuren osan alkuperäisestä heuristisesta etäisyydestä paras
+                  laajennettu solmu on kulkenut (1.0 kun maali on löytynyt)
+        """
+        best_h = 0.0 if self.status == FOUND else self._best[0]
+        fraction = 1.0 if self._initial_h == 0 else 1.0 - best_h / self._initial_h
+        return {
+            "status": self.status,
+            "expansions": self.expansions,
+            "open_size": len(self.open_set),
+            "best_h": best_h,
+            "fraction": fraction,
+            "elapsed_us": self.elapsed_us,
+        }
+
+    def result(self):
+        """
+        Palauttaa tuloksen samassa muodossa kuin AStar.find_path.
+
+        Returns:
+            tuple: (path or None, closed_set, nodes_added)
+        """
+        return self.path, self.closed_set, self.nodes_added
+
+
+class SearchScheduler:
+    """
+    Jakaa tick-kohtaisen aikabudjetin käynnissä olevien hakujen kesken.
+
+    Jokaisessa tickissä haut saavat vuorotellen viipaleen jäljellä olevasta
+    budjetista. Viipale on jäljellä oleva aika jaettuna vuoroa odottavien
+    hakujen määrällä, kuitenkin vähintään min_slice_us. Kesken jäänyt haku
+    siirtyy jonon loppuun, joten seuraava tick alkaa eri hausta.
+
+    Attributes:
+        tick_budget_us (float): Yhden tickin aikabudjetti mikrosekunteina
+        min_slice_us (float): Pienin yhdelle haulle annettava viipale
+        pause_gc (bool): Estetäänkö automaattinen roskienkeruu tickin aikana.
+            Suurten hakujen sanakirjat laukaisevat muuten keruun kesken tickin,
+            mikä näkyy kymmenien millisekuntien piikkeinä tickien kestoissa.
+        tick_times_us (list): Jokaisen tickin mitattu kesto mikrosekunteina
+    """
+
+    def __init__(self, tick_budget_us=2000.0, min_slice_us=50.0, pause_gc=False):
+        """
+        Args:
+            tick_budget_us (float, optional): Tickin aikabudjetti mikrosekunteina
+            min_slice_us (float, optional): Pienin viipale mikrosekunteina
+            pause_gc (bool, optional): Siirtää roskienkeruun tickien väliin
+        """
+        self.tick_budget_us = tick_budget_us
+        self.min_slice_us = min_slice_us
+        self.pause_gc = pause_gc
+        self.tick_times_us = []
+        self._queue = deque()
+
+    @property
+    def active(self):
+        """int: Käynnissä olevien hakujen määrä."""
+        return len(self._queue)
+
+    def submit(self, search):
+        """
+        Lisää haun ajoitettavaksi.
+
+        Args:
+            search (IncrementalSearch): Lisättävä haku
+
+        Returns:
+            IncrementalSearch: Sama haku, jotta kutsuja voi seurata sen tilaa
+        """
+        if not search.done:
+            self._queue.append(search)
+        return search
+
+    def tick(self):
+        """
+        Suorittaa yhden tickin.
+
+        Returns:
+            list: Tämän tickin aikana päättyneet haut
+        """
+        gc_was_enabled = gc.isenabled()
+        if self.pause_gc:
+            gc.disable()
+        started = time.perf_counter_ns()
+        deadline = started + self.tick_budget_us * 1000
+        finished = []
+
+        # Jokainen jonossa ollut haku saa enintään yhden vuoron tickissä
+        for turns_left in range(len(self._queue), 0, -1):
+            remaining_us = (deadline - time.perf_counter_ns()) / 1000
+            if remaining_us <= 0:
+                break
+            search = self._queue.popleft()
+            search.step(max_time_us=max(remaining_us / turns_left, self.min_slice_us))
+            if search.done:
+                finished.append(search)
+            else:
+                self._queue.append(search)
+
+        self.tick_times_us.append((time.perf_counter_ns() - started) / 1000)
+        if self.pause_gc and gc_was_enabled:
+            gc.enable()
+            # Nuorimman sukupolven keruu on nopea ja pitää kasvun kurissa
+            gc.collect(0)
+        return finished
+
+    def run(self, max_ticks=None):
+        """
+        Suorittaa tickejä kunnes kaikki haut ovat päättyneet.
+
+        Args:
+            max_ticks (int, optional): Tickien enimmäismäärä
+
+        Returns:
+            list: Päättyneet haut päättymisjärjestyksessä
+        """
+        finished = []
+        ticks = 0
+        while self._queue and (max_ticks is None or ticks < max_ticks):
+            finished.extend(self.tick())
+            ticks += 1
+        return finished
+
+    def jitter(self):
+        """
+        Laskee tickien kestojen tilastot.
+
+        Returns:
+            dict: ticks, mean_us, std_us, p95_us, max_us ja max_overrun_us
+                  (suurin budjetin ylitys, 0 jos budjetti ei ylittynyt)
+        """
+        if not self.tick_times_us:
+            return {"ticks": 0, "mean_us": 0.0, "std_us": 0.0, "p95_us": 0.0,
+                    "max_us": 0.0, "max_overrun_us": 0.0}
+        times = np.array(self.tick_times_us)
+        return {
+            "ticks": len(times),
+            "mean_us": float(times.mean()),
+            "std_us": float(times.std()),
+            "p95_us": float(np.percentile(times, 95)),
+            "max_us": float(times.max()),
+            "max_overrun_us": float(max(times.max() - self.tick_budget_us, 0.0)),
+        }
+
+
+def run_tick_benchmark(np_map, scenarios, tick_budget_us=2000.0, pause_gc=False):
+    """
+    Ajaa kaikki skenaariot samanaikaisina hakuina tick-silmukassa.
+
+    Args:
+        np_map (numpy.ndarray): Karttadata numpy-taulukkona
+        scenarios (list): Lista skenaarioita (alku, loppu, optimaalinen_pituus)
+        tick_budget_us (float, optional): Tickin aikabudjetti mikrosekunteina
+        pause_gc (bool, optional): Siirtää roskienkeruun tickien väliin
+
+    Returns:
+        dict: SearchScheduler.jitter-metodin tilastot
+    """
+    engine = AStar(np_map)
+    scheduler = SearchScheduler(tick_budget_us=tick_budget_us, pause_gc=pause_gc)
+    for start, goal, _ in scenarios:
+        scheduler.submit(IncrementalSearch(engine, start, goal))
+    finished = scheduler.run()
+
+    stats = scheduler.jitter()
+    found = sum(search.status == FOUND for search in finished)
+    print(f"{len(finished)} hakua, {found} reittiä, {stats['ticks']} tickiä "
+          f"({tick_budget_us:.0f} us budjetti, roskienkeruu {'tickien välissä' if pause_gc else 'automaattinen'})")
+    print(f"Tickin kesto: keskiarvo {stats['mean_us']:.1f} us, keskihajonta {stats['std_us']:.1f} us, "
+          f"p95 {stats['p95_us']:.1f} us, maksimi {stats['max_us']:.1f} us, "
+          f"suurin ylitys {stats['max_overrun_us']:.1f} us")
+    return stats
+
+
+if __name__ == "__main__":
+    np_map = ml.map_to_numpy(ml.load_map('maps/rmtst03.map.txt'))
+    scenarios = ml.load_scenarios('maps/rmtst03.map.scen.txt')
+    run_tick_benchmark(np_map, scenarios)
+    run_tick_benchmark(np_map, scenarios, pause_gc=True)
@@ -0,0 +1,321 @@
+"""
+Suorituskyvyn regressiotarkistus tallennettua perustasoa vastaan.
+
+Komento ajaa kiinteän skenaariojoukon: get_test_routes-funktion kahdeksan
+suuntaa testikartalla sekä otoksen rmtst03-skenaariotiedoston ryhmistä.
+Jokaiselle algoritmille mitataan:
+
+- ajoaika: koko joukon ajon mediaani toistoista (benchmark.time_query)
+- laajennetut solmut ja avoimeen joukkoon lisätyt solmut kyselyittäin.
+  Nämä ovat deterministisiä, joten mikä tahansa kasvu on regressio.
+- muistin huippukäyttö tracemalloc-moduulilla mitattuna
+
+Ajoajan raja on kohinaa huomioiva: sallittu hidastuminen on suurempi kuin
+time_tolerance, jos perustason oma kvartiiliväli on suuri. Koneiden
+nopeuserot poistetaan kalibroinnilla: perustason mukana tallennetaan
+kiinteän Python-kuorman ajoaika ja koneen tunniste, ja ajat skaalataan
+kalibrointiaikojen suhteella. Jos koneen tunniste poikkeaa perustason
+tunnisteesta, ajoajat ja muisti ovat vain ohjeellisia, ja tarkistuksen
+ratkaisevat solumäärät. Tunnisteeseen kuuluu Python-versio, ja tracemallocin
+mittaama huippu riippuu Pythonin omista tietorakenteista, joten muistiraja
+pätee vain samalla tunnisteella. Komento palauttaa nollasta poikkeavan
+paluuarvon, jos jokin ratkaiseva mittari ylittää rajansa.
+
+Käyttö:
+    python regression.py                # vertaa perustasoon
+    python regression.py --update       # tallentaa uuden perustason
+"""
+
+import argparse
+import heapq
+import json
+import os
+import platform
+import sys
+
+import numpy as np
+
+import map_loader as ml
+from astar import AStar
+from astar_and_jps_route_test import create_test_grid, get_test_routes
+from benchmark import time_query, trace_memory
+from jps import JPS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BASE_DIR, 'regression_baseline.json')
+MAP_PATH = os.path.join(BASE_DIR, 'maps', 'rmtst03.map.txt')
+SCEN_PATH = os.path.join(BASE_DIR, 'maps', 'rmtst03.map.scen.txt')
+
+ENGINES = {"A*": AStar, "JPS": JPS}
+
+# Muistin huippukäytön sallittu kasvu: suhteellinen osuus ja vähimmäismäärä tavuina
+MEMORY_TOLERANCE = 0.10
+MEMORY_SLACK_BYTES = 4096
+
+# Perustason tiedoston avain koneen tiedoille; muut avaimet ovat mittauksia
+META_KEY = "_meta"
+
+
+def regression_suites(bucket_step=5, per_bucket=2):
+    """
+    Muodostaa kiinteät skenaariojoukot.
+
+    Args:
+        bucket_step (int, optional): Joka bucket_step:s ryhmä otetaan mukaan
+        per_bucket (int, optional): Kyselyjen määrä valittua ryhmää kohti
+
+    Returns:
+        dict: {joukon nimi: (ruudukko, [(tunniste, lähtö, maali), ...])}
+    """
+    routes = [(name, route["start"], route["goal"]) for name, route in get_test_routes().items()]
+
+    np_map = ml.map_to_numpy(ml.load_map(MAP_PATH))
+    scenarios = ml.load_scenarios(SCEN_PATH)
+    buckets = ml.load_scenario_buckets(SCEN_PATH)
+    sampled = []
+    taken = {}
+    for index, ((start, goal, _), bucket) in enumerate(zip(scenarios, buckets)):
+        if bucket % bucket_step == 0 and taken.get(bucket, 0) < per_bucket:
+            taken[bucket] = taken.get(bucket, 0) + 1
+            sampled.append((f"{bucket}/{index}", start, goal))
+
+    return {
+        "test_routes": (create_test_grid(), routes),
+        "rmtst03": (np_map, sampled),
+    }
+
+
+def measure(suites, warmup=1, repeats=7):
+    """
+    Mittaa kaikki algoritmit kaikissa skenaariojoukoissa.
+
+    Args:
+        suites (dict): regression_suites-funktion tulos
+        warmup (int, optional): Lämmittelyajojen määrä kyselyä kohti
+        repeats (int, optional): Mitattujen ajojen määrä kyselyä kohti
+
+    Returns:
+        dict: {"joukko/algoritmi": {"time_median_ns", "time_iqr_ns", "peak_memory",
+               "queries": {tunniste: {"expanded", "nodes_added"}}}}
+    """
+    results = {}
+    for suite_name, (grid, queries) in suites.items():
+        for engine_name, engine_class in ENGINES.items():
+            engine = engine_class(grid)
+            samples = []
+            counts = {}
+            memory = 0
+            for key, start, goal in queries:
+                (_, closed_set, added), query_samples = time_query(
+                    lambda: engine.find_path(start, goal), warmup, repeats)
+                samples.append(query_samples)
+                counts[key] = {"expanded": len(closed_set), "nodes_added": added}
+                memory = max(memory, trace_memory(lambda: engine.find_path(start, goal))[1])
+
+            # Koko joukon kesto jokaisella toistokierroksella
+            totals = np.sum(np.array(samples, dtype=np.float64), axis=0)
+            q1, median, q3 = np.percentile(totals, [25, 50, 75])
+            results[f"{suite_name}/{engine_name}"] = {
+                "time_median_ns": float(median),
+                "time_iqr_ns": float(q3 - q1),
+                "peak_memory": int(memory),
+                "queries": counts,
+            }
+    return results
+
+
+def _calibration_workload(size=96):
+    """
+    Kiinteä Python-kuorma: Dijkstran haku tyhjällä ruudukolla sanakirjoilla ja kekolla.
+
+    Kuorma ei käytä projektin hakualgoritmeja, joten niiden muutokset eivät
+    vaikuta kalibrointiin.
+    """
+    steps = [(dx, dy, 1.4142135623730951 if dx and dy else 1.0)
+             for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+    distance = {(0, 0): 0.0}
+    heap = [(0.0, (0, 0))]
+    while heap:
+        d, (x, y) = heapq.heappop(heap)
+        if d > distance[(x, y)]:
+            continue
+        for dx, dy, cost in steps:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < size and 0 <= ny < size and d + cost < distance.get((nx, ny), float("inf")):
+                distance[(nx, ny)] = d + cost
+                heapq.heappush(heap, (d + cost, (nx, ny)))
+    return distance
+
+
+def machine_fingerprint():
+    """
+    Palauttaa koneen tunnisteen: käyttöjärjestelmä, arkkitehtuuri, prosessori,
+    prosessorien määrä ja Python-toteutus.
+
+    Returns:
+        str: Tunniste
+    """
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            cpu = next((line.split(":", 1)[1].strip() for line in f if line.startswith("model name")), cpu)
+    except OSError:
+        pass
+    return (f"{platform.system()} {platform.machine()} {cpu or '?'} cpu={os.cpu_count()} "
+            f"{platform.python_implementation()} {platform.python_version()}")
+
+
+def calibrate(warmup=1, repeats=7):
+    """
+    Mittaa koneen nopeuden kiinteällä kuormalla.
+
+    Kalibrointiajaksi otetaan nopein ajo, koska muiden prosessien aiheuttamat
+    häiriöt vain hidastavat ajoja.
+
+    Args:
+        warmup (int, optional): Lämmittelyajojen määrä
+        repeats (int, optional): Mitattujen ajojen määrä
+
+    Returns:
+        dict: {"calibration_ns": nopein aika, "machine": machine_fingerprint()}
+    """
+    _, samples = time_query(_calibration_workload, warmup, repeats)
+    return {"calibration_ns": float(np.min(samples)), "machine": machine_fingerprint()}
+
+
+def compare(current, baseline, time_tolerance=0.25, noise_factor=3.0):
+    """
+    Vertaa mittauksia perustasoon.
+
+    Ajoajan raja on baseline * skaala * (1 + max(time_tolerance, noise_factor * IQR / mediaani)),
+    jossa IQR ja mediaani ovat perustason omat ja skaala on nykyisen ja perustason
+    kalibrointiaikojen suhde (1, jos kalibrointi puuttuu). Solumäärien raja on
+    perustason arvo, ja muistin raja on baseline * (1 + MEMORY_TOLERANCE) +
+    MEMORY_SLACK_BYTES. Jos koneiden tunnisteet eroavat, ajoajan ja muistin
+    ylitys ei ole regressio, koska Python-version vaihtuessa muuttuu myös
+    olioiden koko.
+
+    Args:
+        current (dict): measure-funktion tulos, valinnaisesti META_KEY-avaimella
+        baseline (dict): Perustason measure-tulos, valinnaisesti META_KEY-avaimella
+        time_tolerance (float, optional): Ajoajan pienin sallittu suhteellinen kasvu
+        noise_factor (float, optional): Perustason suhteellisen IQR:n kerroin
+
+    Returns:
+        list: Rivit muodossa (mittari, perustaso, nykyinen, raja, regressio)
+    """
+    base_meta = baseline.get(META_KEY, {})
+    now_meta = current.get(META_KEY, {})
+    scale = 1.0
+    if base_meta.get("calibration_ns") and now_meta.get("calibration_ns"):
+        scale = now_meta["calibration_ns"] / base_meta["calibration_ns"]
+    same_machine = base_meta.get("machine") == now_meta.get("machine")
+
+    rows = []
+    for key, base in baseline.items():
+        if key == META_KEY:
+            continue
+        now = current.get(key)
+        if now is None:
+            rows.append((f"{key} puuttuu", None, None, None, True))
+            continue
+
+        noise = base["time_iqr_ns"] / base["time_median_ns"] if base["time_median_ns"] else 0.0
+        limit = base["time_median_ns"] * scale * (1 + max(time_tolerance, noise_factor * noise))
+        rows.append((f"{key} aika (ns)", base["time_median_ns"], now["time_median_ns"], limit,
+                     same_machine and now["time_median_ns"] > limit))
+
+        limit = base["peak_memory"] * (1 + MEMORY_TOLERANCE) + MEMORY_SLACK_BYTES
+        rows.append((f"{key} muisti (B)", base["peak_memory"], now["peak_memory"], limit,
+                     same_machine and now["peak_memory"] > limit))
+
+        for query, counts in base["queries"].items():
+            now_counts = now["queries"].get(query)
+            for metric in ("expanded", "nodes_added"):
+                value = now_counts[metric] if now_counts else None
+                rows.append((f"{key} {query} {metric}", counts[metric], value, counts[metric],
+                             value is None or value > counts[metric]))
+    return rows
+
+
+def print_report(rows, verbose=False):
+    """
+    Tulostaa vertailun. Solumäärät tulostetaan vain, jos ne muuttuivat tai verbose on tosi.
+    Rajan ylittävä aika tai muisti, joka ei ole regressio (eri kone), merkitään ohjeelliseksi.
+
+    Args:
+        rows (list): compare-funktion rivit
+        verbose (bool, optional): Tulostetaanko kaikki rivit
+    """
+    print(f"{'Mittari':<52}{'Perustaso':>14}{'Nykyinen':>14}{'Raja':>14}  Tila")
+    for name, base, now, limit, regressed in rows:
+        summary_row = "aika" in name or "muisti" in name
+        changed = base != now and not summary_row
+        if not (verbose or regressed or changed or summary_row):
+            continue
+        if regressed:
+            status = "REGRESSIO"
+        elif "aika" in name and now is not None and now > limit:
+            status = "hidas (ohjeellinen)"
+        elif "muisti" in name and now is not None and now > limit:
+            status = "suuri (ohjeellinen)"
+        else:
+            status = "muuttunut" if changed else "ok"
+        fmt = lambda v: "-" if v is None else f"{v:.0f}"
+        print(f"{name:<52}{fmt(base):>14}{fmt(now):>14}{fmt(limit):>14}  {status}")
+
+
+def main(argv=None):
+    """
+    Komentorivikäyttö.
+
+    Returns:
+        int: 0 jos regressioita ei löytynyt, 1 jos löytyi, 2 jos perustaso puuttuu
+    """
+    parser = argparse.ArgumentParser(description="Suorituskyvyn regressiotarkistus")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Perustason JSON-tiedosto")
+    parser.add_argument("--update", action="store_true", help="Tallenna mittaukset uudeksi perustasoksi")
+    parser.add_argument("--warmup", type=int, default=1, help="Lämmittelyajot kyselyä kohti")
+    parser.add_argument("--repeats", type=int, default=7, help="Mitatut ajot kyselyä kohti")
+    parser.add_argument("--time-tolerance", type=float, default=0.25,
+                        help="Ajoajan pienin sallittu suhteellinen kasvu")
+    parser.add_argument("--noise-factor", type=float, default=3.0,
+                        help="Perustason suhteellisen kvartiilivälin kerroin ajoajan rajassa")
+    parser.add_argument("--verbose", action="store_true", help="Tulosta kaikki kyselykohtaiset rivit")
+    args = parser.parse_args(argv)
+
+    if not args.update and not os.path.exists(args.baseline):
+        print(f"Perustasoa {args.baseline} ei löydy. Luo se komennolla --update.")
+        return 2
+
+    # Kalibroidaan ennen mittauksia ja niiden jälkeen, jotta hetkellinen häiriö ei ratkaise skaalaa
+    before = calibrate(args.warmup, args.repeats)
+    current = measure(regression_suites(), args.warmup, args.repeats)
+    after = calibrate(args.warmup, args.repeats)
+    current[META_KEY] = min(before, after, key=lambda meta: meta["calibration_ns"])
+
+    if args.update:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+        print(f"Perustaso tallennettu tiedostoon {args.baseline}.")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    rows = compare(current, baseline, args.time_tolerance, args.noise_factor)
+    base_meta = baseline.get(META_KEY, {})
+    if base_meta.get("calibration_ns"):
+        print(f"Kalibrointi: perustaso {base_meta['calibration_ns'] / 1e6:.2f} ms, "
+              f"nykyinen {current[META_KEY]['calibration_ns'] / 1e6:.2f} ms")
+    if base_meta.get("machine") != current[META_KEY]["machine"]:
+        print(f"Eri kone kuin perustasossa ({base_meta.get('machine', 'tuntematon')}); "
+              f"ajoajat ja muisti ovat ohjeellisia.")
+    print_report(rows, args.verbose)
+    regressions = sum(row[4] for row in rows)
+    print(f"{regressions} regressiota." if regressions else "Ei regressioita.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""
+Rectangular Symmetry Reduction (RSR) -reitinhaku.
+
+RSR jakaa ruudukon vapaan tilan esikäsittelyssä esteettömiin suorakulmioihin.
+Haku tehdään vain suorakulmioiden reunasoluissa: suorakulmion sisäosan yli
+kulkevat makrokaaret korvaavat kaikki sisäosan symmetriset reitit. Koska
+suorakulmio on esteetön, kahden sen solun välinen lyhin reitti on aina
+octile-etäisyyden mittainen.
+
+Graafin kaaret:
+- naapurikaaret eri suorakulmioiden vierekkäisten reunasolujen välillä
+- reunakaaret saman suorakulmion vierekkäisten reunasolujen välillä
+- makrokaaret vastakkaisten sivujen kaikkien solujen välillä
+- diagonaaliset makrokaaret reunasolusta sisäosan yli seuraavaan reunasoluun
+
+Lähtö- ja maalisolmu lisätään graafiin hakuhetkellä, jos ne ovat
+suorakulmion sisäosassa.
+"""
+
+import heapq
+import math
+
+import numpy as np
+
+from grid_preprocessing import DIRECTIONS
+
+
+def octile_distance(a, b):
+    """
+    Laskee Octile etäisyyden kahden pisteen välillä.
+
+    Args:
+        a (tuple): Ensimmäinen piste (x, y)
+        b (tuple): Toinen piste (x, y)
+
+    Returns:
+        float: Octile etäisyys pisteiden välillä
+    """
+    dx = abs(a[0] - b[0])
+    dy = abs(a[1] - b[1])
+    return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
+
+
+def decompose_rectangles(grid):
+    """
+    Jakaa ruudukon vapaat solut esteettömiin suorakulmioihin.
+
+    Ahne jako: rivi kerrallaan etenevä haku aloittaa uuden suorakulmion
+    ensimmäisestä vapaasta merkitsemättömästä solusta, kasvattaa sitä ensin
+    rivin suuntaan niin pitkälle kuin mahdollista ja sitten alaspäin niin
+    kauan kuin koko rivin osuus on vapaa.
+
+    Args:
+        grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+
+    Returns:
+        tuple: (rect_ids, rectangles), jossa rect_ids on int32-taulukko
+               (-1 = este) ja rectangles lista suorakulmioita muodossa
+               (x0, y0, x1, y1) (rajat mukaan lukien)
+    """
+    grid = np.asarray(grid)
+    rows, cols = grid.shape
+    rect_ids = np.full((rows, cols), -1, dtype=np.int32)
+    available = grid == 0
+    rectangles = []
+
+    for x in range(rows):
+        for y in np.flatnonzero(available[x]):
+            if not available[x, y]:
+                continue
+            # Kasvatetaan riviä pitkin ensimmäiseen varattuun soluun asti
+            row = available[x, y:]
+            width = int(row.argmin()) if not row.all() else len(row)
+            # Kasvatetaan alaspäin niin kauan kuin koko leveys on vapaa
+            height = 1
+            while x + height < rows and available[x + height, y:y + width].all():
+                height += 1
+
+            rect_id = len(rectangles)
+            rectangles.append((x, int(y), x + height - 1, int(y) + width - 1))
+            rect_ids[x:x + height, y:y + width] = rect_id
+            available[x:x + height, y:y + width] = False
+
+    return rect_ids, rectangles
+
+
+def perimeter_cells(rect):
+    """
+    Palauttaa suorakulmion reunasolut.
+
+    Args:
+        rect (tuple): Suorakulmio (x0, y0, x1, y1)
+
+    Returns:
+        list: Reunasolut (x, y) ilman kaksoiskappaleita
+    """
+    x0, y0, x1, y1 = rect
+    cells = [(x0, y) for y in range(y0, y1 + 1)]
+    if x1 > x0:
+        cells += [(x1, y) for y in range(y0, y1 + 1)]
+    cells += [(x, y0) for x in range(x0 + 1, x1)]
+    if y1 > y0:
+        cells += [(x, y1) for x in range(x0 + 1, x1)]
+    return cells
+
+
+def is_perimeter(pos, rect):
+    """Tarkistaa onko solu suorakulmion reunalla."""
+    x0, y0, x1, y1 = rect
+    return pos[0] in (x0, x1) or pos[1] in (y0, y1)
+
+
+class RSR:
+    """
+    Rectangular Symmetry Reduction -algoritmin toteutus.
+
+    Palauttaa saman muotoisen tuloksen kuin AStar ja JPS. Reitti koostuu
+    käännöspisteistä, joiden väliset osuudet ovat suoria tai diagonaalisia.
+
+    Attributes:
+        grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+        heuristic (function): Heuristiikkafunktio etäisyyden arvioimiseen
+        rect_ids (numpy.ndarray): Jokaisen solun suorakulmion indeksi (-1 = este)
+        rectangles (list): Suorakulmiot muodossa (x0, y0, x1, y1)
+        edges (dict): Reunasolujen kaaret muodossa {solu: [(naapuri, hinta), ...]}
+    """
+
+    def __init__(self, grid, heuristic=octile_distance):
+        """
+        Alustaa RSR-algoritmin ja suorittaa esikäsittelyn.
+
+        Args:
+            grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+            heuristic (function, optional): Heuristiikkafunktio. Oletuksena octile_distance.
+        """
+        self.grid = np.asarray(grid)
+        self.heuristic = heuristic
+        self.rect_ids, self.rectangles = decompose_rectangles(self.grid)
+        self.edges = self._build_edges()
+
+    def _build_edges(self):
+        """
+        Muodostaa reunasolujen välisen graafin.
+
+        Returns:
+            dict: {solu: [(naapuri, hinta), ...]}
+        """
+        rows, cols = self.grid.shape
+        rect_ids = self.rect_ids
+        edges = {}
+
+        for rect_id, rect in enumerate(self.rectangles):
+            x0, y0, x1, y1 = rect
+            for cell in perimeter_cells(rect):
+                cell_edges = edges.setdefault(cell, [])
+
+                # Naapuri- ja reunakaaret: vierekkäiset reunasolut
+                for dx, dy in DIRECTIONS:
+                    x, y = cell[0] + dx, cell[1] + dy
+                    if not (0 <= x < rows and 0 <= y < cols) or rect_ids[x, y] < 0:
+                        continue
+                    neighbor_rect = rect_ids[x, y]
+                    if neighbor_rect != rect_id or is_perimeter((x, y), rect):
+                        cell_edges.append(((x, y), math.sqrt(2) if dx and dy else 1.0))
+
+                # Diagonaaliset makrokaaret sisäosan yli
+                for dx, dy in ((-1, -1), (-1, 1), (1, -1), (1, 1)):
+                    x, y = cell[0] + dx, cell[1] + dy
+                    steps = 1
+                    while x0 < x < x1 and y0 < y < y1:
+                        x, y = x + dx, y + dy
+                        steps += 1
+                    if steps > 1 and x0 <= x <= x1 and y0 <= y <= y1:
+                        cell_edges.append(((x, y), steps * math.sqrt(2)))
+
+            # Makrokaaret vastakkaisten sivujen välillä
+            if x1 - x0 >= 2:
+                for ya in range(y0, y1 + 1):
+                    for yb in range(y0, y1 + 1):
+                        cost = octile_distance((x0, ya), (x1, yb))
+                        edges[(x0, ya)].append(((x1, yb), cost))
+                        edges[(x1, yb)].append(((x0, ya), cost))
+            if y1 - y0 >= 2:
+                for xa in range(x0, x1 + 1):
+                    for xb in range(x0, x1 + 1):
+                        cost = octile_distance((xa, y0), (xb, y1))
+                        edges[(xa, y0)].append(((xb, y1), cost))
+                        edges[(xb, y1)].append(((xa, y0), cost))
+
+        return edges
+
+    def _query_links(self, pos):
+        """
+        Palauttaa hakuhetkellä lisättävät kaaret sisäosan solusta reunasoluihin.
+
+        Args:
+            pos (tuple): Lähtö- tai maalisolmu (x, y)
+
+        Returns:
+            list: [(reunasolu, hinta), ...] tai tyhjä lista, jos solu on jo graafissa
+        """
+        if pos in self.edges:
+            return []
+        rect = self.rectangles[self.rect_ids[pos]]
+        return [(cell, octile_distance(pos, cell)) for cell in perimeter_cells(rect)]
+
+    def graph_size(self):
+        """
+        Palauttaa esikäsitellyn graafin koon.
+
+        Returns:
+            tuple: (solmujen määrä, kaarten määrä)
+        """
+        return len(self.edges), sum(len(cell_edges) for cell_edges in self.edges.values())
+
+    def find_path(self, start, goal):
+        """
+        Etsii lyhimmän reitin aloitussolmusta maalisolmuun RSR-graafissa.
+
+        Args:
+            start (tuple): Aloitussolmu (x, y)
+            goal (tuple): Maalisolmu (x, y)
+
+        Returns:
+            tuple: Sisältää kolme elementtiä:
+                - path (list or None): Lista käännöspisteistä jotka muodostavat reitin,
+                  tai None jos reittiä ei löydy
+                - closed_set (set): Joukko tutkituista solmuista
+                - nodes_added (int): Avoimeen joukkoon lisättyjen solmujen määrä
+        """
+        rows, cols = self.grid.shape
+        for pos in (start, goal):
+            if not (0 <= pos[0] < rows and 0 <= pos[1] < cols) or self.rect_ids[pos] < 0:
+                return None, set(), 0
+        if start == goal:
+            return [start], set(), 0
+
+        # Lähtö ja maali samassa suorakulmiossa: suora octile-reitti
+        if self.rect_ids[start] == self.rect_ids[goal]:
+            return self._expand([start, goal]), set(), 0
+
+        start_links = self._query_links(start)
+        goal_links = {cell: cost for cell, cost in self._query_links(goal)}
+
+        g_scores = {start: 0}
+        came_from = {}
+        closed_set = set()
+        open_set = [(self.heuristic(start, goal), start)]
+        nodes_added = 1
+
+        while open_set:
+            current = heapq.heappop(open_set)[1]
+            if current in closed_set:
+                continue
+            if current == goal:
+                path = [current]
+                while current in came_from:
+                    current = came_from[current]
+                    path.append(current)
+                return self._expand(path[::-1]), closed_set, nodes_added
+
+            closed_set.add(current)
+
+            if current == start and start_links:
+                successors = start_links
+            else:
+                successors = self.edges.get(current, [])
+            if current in goal_links:
+                successors = successors + [(goal, goal_links[current])]
+
+            for neighbor, cost in successors:
+                if neighbor in closed_set:
+                    continue
+                tentative_g = g_scores[current] + cost
+                if neighbor not in g_scores or tentative_g < g_scores[neighbor]:
+                    came_from[neighbor] = current
+                    g_scores[neighbor] = tentative_g
+                    heapq.heappush(open_set, (tentative_g + self.heuristic(neighbor, goal), neighbor))
+                    nodes_added += 1
+
+        return None, closed_set, nodes_added
+
+    @staticmethod
+    def _expand(waypoints):
+        """
+        Lisää makrokaarten taitekohdat, jotta peräkkäiset pisteet ovat samalla suoralla.
+
+        Makrokaaren reitti kulkee ensin diagonaalisesti ja sitten suoraan,
+        mikä pysyy esteettömän suorakulmion sisällä.
+
+        Args:
+            waypoints (list): Graafin solmut reitin järjestyksessä
+
+        Returns:
+            list: Käännöspisteet
+        """
+        path = [waypoints[0]]
+        for a, b in zip(waypoints, waypoints[1:]):
+            dx, dy = b[0] - a[0], b[1] - a[1]
+            diagonal = min(abs(dx), abs(dy))
+            if diagonal and abs(dx) != abs(dy):
+                sx = 1 if dx > 0 else -1
+                sy = 1 if dy > 0 else -1
+                path.append((a[0] + sx * diagonal, a[1] + sy * diagonal))
+            path.append(b)
+        return path
@@ -0,0 +1,87 @@
+"""
+Hakualgoritmien sisäiset laskurit.
+
+Laskurit kertovat, mihin haku käyttää aikansa: laajennukset, kekoon
+lisäykset ja poistot, vanhentuneet poistot, naapuritarkistukset sekä
+JPS:n hyppykutsut ja niissä läpikäydyt solut. AStar ja JPS täyttävät
+laskurit vain, kun niiden counters-attribuutti on SearchCounters-olio.
+Oletuksena attribuutti on None, jolloin hakusilmukassa ei tehdä yhtään
+ylimääräistä laskuria. Keon lisäykset ja poistot johdetaan haun lopuksi
+keon ja suljetun joukon koosta, joten niistä ei aiheudu kustannusta
+edes laskurien ollessa käytössä.
+"""
+
+FIELDS = (
+    "expansions",
+    "heap_pushes",
+    "heap_pops",
+    "stale_pops",
+    "neighbor_checks",
+    "successors",
+    "jump_calls",
+    "cells_scanned",
+    "forced_checks",
+)
+
+
+class SearchCounters:
+    """
+    Yhden tai useamman haun laskurit.
+
+    Attributes:
+        expansions (int): Laajennetut solmut
+        heap_pushes (int): Avoimeen joukkoon (kekoon) lisätyt alkiot
+        heap_pops (int): Keosta poistetut alkiot
+        stale_pops (int): Poistetut alkiot, joiden solmu oli jo laajennettu
+        neighbor_checks (int): Laajennuksissa tarkistetut naapurit
+        successors (int): JPS:n löytämät hyppypisteseuraajat
+        jump_calls (int): jump-funktion kutsut, rekursiiviset mukaan lukien
+        cells_scanned (int): Hypyissä läpikäydyt solut
+        forced_checks (int): Pakotettujen naapurien tarkistukset diagonaalihypyissä
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Nollaa kaikki laskurit."""
+        for field in FIELDS:
+            setattr(self, field, 0)
+
+    def __iadd__(self, other):
+        for field in FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        return self
+
+    def as_dict(self):
+        """
+        Palauttaa laskurit sanakirjana.
+
+        Returns:
+            dict: Laskurit sekä johdettu cells_per_jump (None, jos hyppyjä ei ollut)
+        """
+        values = {field: getattr(self, field) for field in FIELDS}
+        values["cells_per_jump"] = self.cells_scanned / self.jump_calls if self.jump_calls else None
+        return values
+
+    def __repr__(self):
+        return "SearchCounters(" + ", ".join(f"{field}={getattr(self, field)}" for field in FIELDS) + ")"
+
+
+def sum_counters(dicts):
+    """
+    Laskee as_dict-muotoisten laskurien summat.
+
+    Args:
+        dicts (list): Lista SearchCounters.as_dict-sanakirjoja
+
+    Returns:
+        dict: Summat samassa muodossa, cells_per_jump laskettuna summista
+    """
+    total = SearchCounters()
+    for values in dicts:
+        for field in FIELDS:
+            setattr(total, field, getattr(total, field) + values[field])
+    return total.as_dict()
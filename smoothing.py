@@ -0,0 +1,196 @@
+"""
+Reittien vektoroitu suoristus (string pulling).
+
+A*:n ja JPS:n reiteistä poistetaan turhat käännöspisteet samalla ahneella
+säännöllä kuin theta_star.smooth_path: jokaisesta ankkuripisteestä edetään
+reittiä pitkin niin kauan kuin seuraavaan pisteeseen on näköyhteys.
+Näköyhteydet testataan kuitenkin numpy-taulukoina: yhdellä kutsulla
+rasteroidaan kaikkien erän reittien ehdokasjanat kerralla.
+
+Rasterointi tuottaa samat solut kuin theta_star.line_of_sight. Jana
+solukeskipisteestä (0, 0) pisteeseen (dx, dy) ylittää x-suuntaisen
+solurajan k hetkellä (2k + 1) / 2dx ja y-suuntaisen rajan j hetkellä
+(2j + 1) / 2dy. Kertomalla hetket luvulla 2·dx·dy saadaan kokonaislukuarvot
+(2k + 1)·dy ja (2j + 1)·dx, ja jokaisen ylityksen jälkeinen solu saadaan
+laskemalla, montako toisen akselin rajaa on ylitetty viimeistään samalla
+arvolla.
+"""
+
+import time
+
+import numpy as np
+
+import map_loader as ml
+from astar import AStar
+from jps import JPS
+from theta_star import smooth_path
+
+
+def _crossing_cells(starts, along, across, step_along, step_across, axis):
+    """
+    Laskee solut, joihin janat siirtyvät ylittäessään yhden akselin solurajat.
+
+    Rajan k ylitys tapahtuu arvolla (2k + 1)·across, ja sen jälkeen toisen
+    akselin rajoja on ylitetty ((2k + 1)·across // along + 1) // 2 kappaletta.
+
+    Returns:
+        tuple: (janan indeksi jokaiselle solulle, solujen litteät indeksit ilman sarakemäärää)
+    """
+    segment = np.repeat(np.arange(len(along), dtype=np.int32), along)
+    k = np.arange(len(segment), dtype=np.int32) - np.repeat(np.cumsum(along) - along, along)
+    seg_along = along[segment]
+    crossed_across = ((2 * k + 1) * across[segment] // seg_along + 1) // 2
+    moved_along = starts[segment, axis] + step_along[segment] * (k + 1)
+    moved_across = starts[segment, 1 - axis] + step_across[segment] * crossed_across
+    if axis == 0:
+        return segment, moved_along, moved_across
+    return segment, moved_across, moved_along
+
+
+def batch_line_of_sight(starts, ends, blocked):
+    """
+    Testaa näköyhteyden usealle janalle kerralla.
+
+    Args:
+        starts (numpy.ndarray): Janojen alkusolut muodossa (N, 2)
+        ends (numpy.ndarray): Janojen loppusolut muodossa (N, 2)
+        blocked (numpy.ndarray): bool-estetaulukko (tosi = este)
+
+    Returns:
+        numpy.ndarray: bool-taulukko (N,), tosi jos janan kaikki solut ovat vapaita
+    """
+    starts = np.asarray(starts, dtype=np.int32).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=np.int32).reshape(-1, 2)
+    delta = ends - starts
+    sign = np.sign(delta)
+    dx, dy = np.abs(delta[:, 0]), np.abs(delta[:, 1])
+    visible = np.ones(len(starts), dtype=bool)
+
+    flat = blocked.ravel()
+    cols = blocked.shape[1]
+    # x- ja y-suuntaisten rajojen ylitykset käsitellään erikseen; samanaikaiset
+    # ylitykset tuottavat saman diagonaalisen solun kummassakin joukossa
+    for along, across, step_along, step_across, axis in ((dx, dy, sign[:, 0], sign[:, 1], 0),
+                                                          (dy, dx, sign[:, 1], sign[:, 0], 1)):
+        if not along.any():
+            continue
+        segment, xs, ys = _crossing_cells(starts, along, across, step_along, step_across, axis)
+        visible[segment[flat[xs * cols + ys]]] = False
+    return visible
+
+
+def string_pull(paths, grid, window=4):
+    """
+    Suoristaa erän reittejä ahneella string pulling -menetelmällä.
+
+    Reitit yhdistetään yhdeksi pistetaulukoksi, ja jokaisen reitin tila
+    (ankkuri, testattu matka, ikkuna) pidetään taulukoissa. Jokaisella
+    kierroksella jokaisesta keskeneräisestä reitistä testataan ikkunan
+    verran seuraavia ehdokasjanoja nykyisestä ankkurista, ja kaikkien
+    reittien janat testataan yhdellä batch_line_of_sight-kutsulla. Jos kaikki
+    ehdokkaat näkyvät, ikkuna kaksinkertaistuu ja testaus jatkuu samasta
+    ankkurista; muuten ensimmäistä estynyttä pistettä edeltävä piste on
+    seuraava käännöspiste. Tulos on sama kuin theta_star.smooth_path.
+
+    Args:
+        paths (list): Reitit listoina pisteistä (x, y). None-reitit säilyvät ennallaan.
+        grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+        window (int, optional): Ensimmäisen ikkunan koko
+
+    Returns:
+        list: Suoristetut reitit samassa järjestyksessä
+    """
+    blocked = np.asarray(grid) != 0
+    result = list(paths)
+    smoothable = [i for i, path in enumerate(paths) if path and len(path) >= 3]
+    if not smoothable:
+        return result
+
+    lengths = np.array([len(paths[i]) for i in smoothable])
+    first = np.cumsum(lengths) - lengths
+    points = np.concatenate([np.asarray(paths[i], dtype=np.int64).reshape(-1, 2) for i in smoothable])
+
+    # Keskeneräisten reittien tila; indeksit viittaavat yhdistettyyn pistetaulukkoon
+    owner = np.arange(len(smoothable))
+    anchor = first.copy()
+    last = first + lengths - 1
+    probed = np.zeros(len(smoothable), dtype=np.int64)
+    width = np.full(len(smoothable), window, dtype=np.int64)
+    waypoints = [first, last]
+
+    while len(owner):
+        counts = np.minimum(width, last - anchor - probed)
+        segment = np.repeat(np.arange(len(owner)), counts)
+        local = np.arange(len(segment)) - np.repeat(np.cumsum(counts) - counts, counts)
+        base = anchor + probed
+        visible = batch_line_of_sight(points[anchor[segment]], points[base[segment] + local + 1], blocked)
+
+        # Ensimmäisen estyneen ehdokkaan indeksi ikkunassa (counts jos kaikki näkyvät)
+        blocked_local = np.where(visible, counts[segment], local)
+        first_blocked = np.minimum.reduceat(blocked_local, np.cumsum(counts) - counts)
+        all_visible = first_blocked == counts
+
+        finished = all_visible & (base + counts >= last)
+        extend = all_visible & ~finished
+        turn = ~all_visible
+
+        # Estynyttä edeltävä piste on uusi ankkuri (vähintään yhden askeleen päässä)
+        new_anchor = np.maximum(base + first_blocked, anchor + 1)
+        waypoints.append(new_anchor[turn & (new_anchor < last)])
+        probed = np.where(extend, probed + counts, 0)
+        width = np.where(extend, width * 2, window)
+        anchor = np.where(turn, new_anchor, anchor)
+
+        keep = ~finished & (anchor < last)
+        owner, anchor, last, probed, width = (owner[keep], anchor[keep], last[keep],
+                                              probed[keep], width[keep])
+
+    kept = np.unique(np.concatenate(waypoints))
+    path_of = np.searchsorted(first, kept, side="right") - 1
+    local_index = (kept - first[path_of]).tolist()
+    for i in smoothable:
+        result[i] = []
+    for p, k in zip(path_of.tolist(), local_index):
+        path = paths[smoothable[p]]
+        result[smoothable[p]].append(path[k])
+    return result
+
+
+def run_smoothing_benchmark(np_map, scenarios):
+    """
+    Vertailee erän vektoroitua suoristusta reittikohtaiseen suoristukseen.
+
+    Args:
+        np_map (numpy.ndarray): Karttadata numpy-taulukkona
+        scenarios (list): Lista skenaarioita (alku, loppu, optimaalinen_pituus)
+
+    Returns:
+        dict: {algoritmi: (reittikohtainen aika, erän aika, pisteet ennen, pisteet jälkeen)}
+    """
+    blocked = (np_map != 0).tolist()
+    results = {}
+    print(f"{'Algoritmi':<10}{'Pisteet ennen':<15}{'Pisteet jälkeen':<17}"
+          f"{'Reitti kerrallaan (s)':<23}{'Erä (s)':<10}")
+    for name, engine in (("A*", AStar(np_map)), ("JPS", JPS(np_map))):
+        paths = [engine.find_path(start, goal)[0] for start, goal, _ in scenarios]
+
+        start_time = time.perf_counter()
+        single = [smooth_path(path, blocked) for path in paths]
+        single_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        batch = string_pull(paths, np_map)
+        batch_time = time.perf_counter() - start_time
+
+        assert batch == single
+        before = sum(len(path) for path in paths if path)
+        after = sum(len(path) for path in batch if path)
+        results[name] = (single_time, batch_time, before, after)
+        print(f"{name:<10}{before:<15}{after:<17}{single_time:<23.3f}{batch_time:<10.3f}")
+    return results
+
+
+if __name__ == "__main__":
+    np_map = ml.map_to_numpy(ml.load_map('maps/rmtst03.map.txt'))
+    scenarios = ml.load_scenarios('maps/rmtst03.map.scen.txt')
+    run_smoothing_benchmark(np_map, scenarios)
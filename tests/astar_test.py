@@ -2,6 +2,7 @@ import unittest
 import numpy as np
 import math
 from astar import AStar, get_neighbors, octile_distance
+from map_loader import map_to_cost_grid, cost_grid_to_obstacles
 
 class TestAStar(unittest.TestCase):
 
@@ -82,5 +83,32 @@ class TestAStar(unittest.TestCase):
             # Naapurit voivat olla korkeintaan 1 askeleen päässä (mukaan lukien diagonaalit)
             self.assertTrue(dx <= 1 and dy <= 1 and (dx + dy) > 0)
 
+    def test_cost_grid(self):
+        # Suo (S) on kalliimpaa kuin tavallinen maasto, joten reitti kiertää sen
+        map_data = [list(row) for row in [
+            "....",
+            ".SS.",
+            ".SS.",
+            "....",
+        ]]
+        cost_grid = map_to_cost_grid(map_data, {'.': 1.0, 'S': 5.0})
+        self.assertEqual(cost_grid.dtype, np.float32)
+        self.assertEqual(cost_grid[1, 1], 5.0)
+
+        astar = AStar(cost_grid_to_obstacles(cost_grid), cost_grid=cost_grid)
+        path, closed_set, nodes_added = astar.find_path((0, 0), (3, 3))
+        for point in path:
+            self.assertEqual(map_data[point[0]][point[1]], '.')
+
+    def test_cost_grid_obstacles(self):
+        # Tuntemattomat merkit ovat esteitä ja minimikustannus skaalaa heuristiikan
+        cost_grid = map_to_cost_grid([list("@.S"), list("..S")], {'.': 2.0, 'S': 3.0})
+        self.assertTrue(np.isinf(cost_grid[0, 0]))
+        self.assertEqual(cost_grid_to_obstacles(cost_grid).tolist(), [[1, 0, 0], [0, 0, 0]])
+        astar = AStar(cost_grid_to_obstacles(cost_grid), cost_grid=cost_grid)
+        self.assertEqual(astar.min_cost, 2.0)
+        path, _, _ = astar.find_path((1, 0), (1, 2))
+        self.assertEqual(path, [(1, 0), (1, 1), (1, 2)])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
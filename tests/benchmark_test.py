@@ -0,0 +1,168 @@
+import gc
+import heapq
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from astar import AStar
+from benchmark import (BenchmarkRunner, clear_query_caches, save_json, summarize, time_query,
+                       trace_memory)
+from jps import JPS
+from prefilter import QueryPrefilter
+
+class HeapTracker:
+    """heapq-korvike, joka kirjaa keon suurimman koon."""
+
+    def __init__(self):
+        self.peak = 0
+
+    def heappush(self, heap, item):
+        heapq.heappush(heap, item)
+        self.peak = max(self.peak, len(heap))
+
+    def heappop(self, heap):
+        return heapq.heappop(heap)
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_time_query(self):
+        calls = []
+        result, samples = time_query(lambda: calls.append(1) or len(calls), warmup=2, repeats=4)
+        self.assertEqual(len(calls), 6)
+        self.assertEqual(result, 6)
+        self.assertEqual(len(samples), 4)
+        self.assertTrue(all(isinstance(sample, int) and sample >= 0 for sample in samples))
+        self.assertTrue(gc.isenabled())
+
+    def test_time_query_setup(self):
+        events = []
+        time_query(lambda: events.append("kutsu"), warmup=1, repeats=2,
+                   setup=lambda: events.append("alustus"))
+        self.assertEqual(events, ["alustus", "kutsu"] * 3)
+
+    def test_time_query_restores_gc_on_error(self):
+        def fail():
+            raise ValueError
+        with self.assertRaises(ValueError):
+            time_query(fail, warmup=0, repeats=1)
+        self.assertTrue(gc.isenabled())
+
+    def test_summarize(self):
+        stats = summarize([10, 20, 30, 40, 50])
+        self.assertEqual(stats["n"], 5)
+        self.assertEqual(stats["median_ns"], 30)
+        self.assertEqual(stats["iqr_ns"], 20)
+        self.assertEqual(stats["min_ns"], 10)
+        self.assertAlmostEqual(stats["p95_ns"], 48)
+        self.assertIsNone(summarize([])["median_ns"])
+
+    def test_runner(self):
+        grid = np.zeros((8, 8), dtype=int)
+        grid[2:6, 4] = 1
+        scenarios = [((0, 0), (7, 7), 9.9), ((3, 0), (3, 7), 7.8), ((0, 0), (0, 1), 1.0)]
+        runner = BenchmarkRunner(warmup=1, repeats=3)
+        results = runner.run({"A*": AStar(grid), "JPS": JPS(grid)}, scenarios, buckets=[1, 1, 0])
+        self.assertEqual(results["config"]["repeats"], 3)
+        self.assertEqual(len(results["scenarios"]), 3)
+        row = results["scenarios"][1]
+        self.assertEqual(row["bucket"], 1)
+        self.assertEqual(row["engines"]["A*"]["n"], 3)
+        self.assertAlmostEqual(row["engines"]["A*"]["length"], row["engines"]["JPS"]["length"])
+        self.assertEqual(set(results["buckets"]), {"0", "1"})
+        self.assertEqual(results["buckets"]["1"]["JPS"]["n"], 2)
+        self.assertEqual(results["engines"]["A*"]["n"], 3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "results.json")
+            save_json(results, filename)
+            with open(filename, encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["engines"]["A*"]["n"], 3)
+
+    def test_runner_cold_and_warm(self):
+        grid = np.zeros((8, 8), dtype=int)
+        grid[2:6, 4] = 1
+        jps = JPS(grid)
+        search = jps.find_path
+        cache_filled = []
+
+        def find_path(start, goal):
+            cache_filled.append(bool(jps.jump_cache.table.any()))
+            return search(start, goal)
+
+        jps.find_path = find_path
+        results = BenchmarkRunner(warmup=1, repeats=3).run({"JPS": jps}, [((0, 0), (7, 7), 9.9)])
+        self.assertTrue(results["config"]["cold"])
+        self.assertEqual(cache_filled, [False] * 4)
+        cache_filled.clear()
+        BenchmarkRunner(warmup=1, repeats=3, cold=False).run({"JPS": jps}, [((0, 0), (7, 7), 9.9)])
+        self.assertEqual(cache_filled, [True] * 4)
+
+    def test_clear_query_caches(self):
+        grid = np.zeros((8, 8), dtype=int)
+        grid[2:6, 4] = 1
+        prefilter = QueryPrefilter(grid, JPS(grid))
+        prefilter.find_path((3, 0), (3, 7))
+        self.assertEqual(len(prefilter._cache), 1)
+        clear_query_caches(prefilter)
+        self.assertFalse(prefilter.engine.jump_cache.table.any())
+        self.assertEqual(len(prefilter._cache), 0)
+        clear_query_caches(AStar(grid))
+
+    def test_trace_memory(self):
+        result, peak = trace_memory(lambda: len([0] * 100000))
+        self.assertEqual(result, 100000)
+        self.assertGreaterEqual(peak, 100000 * 8)
+
+    def test_runner_memory_profile(self):
+        grid = np.zeros((8, 8), dtype=int)
+        grid[2:6, 4] = 1
+        scenarios = [((0, 0), (7, 7), 9.9), ((3, 0), (3, 7), 7.8)]
+        astar = AStar(grid)
+        results = BenchmarkRunner(warmup=0, repeats=1, profile_memory=True).run(
+            {"A*": astar, "JPS": JPS(grid)}, scenarios)
+        self.assertTrue(results["config"]["profile_memory"])
+        stats = results["scenarios"][1]["engines"]["A*"]
+        path, closed_set, _ = astar.find_path((3, 0), (3, 7))
+        self.assertEqual(stats["closed_set_size"], len(closed_set))
+        self.assertEqual(stats["g_score_size"], astar.g_score_size)
+        self.assertGreaterEqual(stats["g_score_size"], stats["closed_set_size"])
+        self.assertEqual(stats["open_set_peak"], astar.open_set_peak)
+        self.assertNotIn("max_rss_bytes", stats)
+        self.assertEqual(results["engines"]["A*"]["max_open_set_peak"],
+                         max(row["engines"]["A*"]["open_set_peak"] for row in results["scenarios"]))
+        self.assertGreater(stats["peak_bytes"], 0)
+        self.assertAlmostEqual(stats["bytes_per_expanded"], stats["peak_bytes"] / len(closed_set))
+        self.assertEqual(results["engines"]["JPS"]["max_peak_bytes"],
+                         max(row["engines"]["JPS"]["peak_bytes"] for row in results["scenarios"]))
+        self.assertNotIn("peak_bytes", BenchmarkRunner(warmup=0, repeats=1).run(
+            {"A*": astar}, scenarios)["scenarios"][0]["engines"]["A*"])
+
+    def test_open_set_peak(self):
+        grid = np.zeros((12, 12), dtype=int)
+        grid[2:10, 6] = 1
+        grid[5, 1:6] = 1
+        for module, engine in (("astar", AStar(grid)), ("jps", JPS(grid))):
+            for start, goal in [((0, 0), (11, 11)), ((6, 2), (6, 10)), ((0, 11), (11, 0))]:
+                tracker = HeapTracker()
+                with mock.patch(f"{module}.heapq", tracker):
+                    engine.find_path(start, goal)
+                self.assertEqual(engine.open_set_peak, tracker.peak, (module, start, goal))
+
+    def test_runner_counters(self):
+        grid = np.zeros((8, 8), dtype=int)
+        grid[2:6, 4] = 1
+        scenarios = [((0, 0), (7, 7), 9.9), ((3, 0), (3, 7), 7.8)]
+        jps = JPS(grid)
+        results = BenchmarkRunner(warmup=0, repeats=1, collect_counters=True).run(
+            {"A*": AStar(grid), "JPS": jps}, scenarios)
+        self.assertIsNone(jps.counters)
+        rows = results["scenarios"]
+        self.assertEqual(rows[1]["engines"]["A*"]["counters"]["heap_pushes"], rows[1]["engines"]["A*"]["count"])
+        self.assertEqual(rows[0]["engines"]["JPS"]["counters"]["successors"], rows[0]["engines"]["JPS"]["count"])
+        self.assertEqual(results["engines"]["JPS"]["counters"]["jump_calls"],
+                         sum(row["engines"]["JPS"]["counters"]["jump_calls"] for row in rows))
+
+if __name__ == '__main__':
+    unittest.main()
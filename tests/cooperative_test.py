@@ -0,0 +1,111 @@
+import contextlib
+import io
+import unittest
+import numpy as np
+from cooperative import CooperativePlanner, ReservationTable, count_conflicts, run_cooperative_benchmark
+
+class TestReservationTable(unittest.TestCase):
+
+    def test_reserve_release_evict(self):
+        table = ReservationTable()
+        table.reserve([(0, 0), (0, 1), (0, 2)], 3, agent=1)
+        self.assertEqual(table.cell_owner((0, 1), 4), 1)
+        self.assertFalse(table.is_free((0, 1), 4, agent=2))
+        self.assertTrue(table.is_free((0, 1), 4, agent=1))
+        # Paikanvaihto samalla askeleella on kielletty
+        self.assertFalse(table.move_allowed((0, 1), (0, 0), 3, agent=2))
+        self.assertTrue(table.move_allowed((1, 1), (1, 0), 3, agent=2))
+        table.release(1, 5)
+        self.assertIsNone(table.cell_owner((0, 2), 5))
+        self.assertEqual(table.cell_owner((0, 1), 4), 1)
+        # Solut ja siirrot hetkillä 3 ja 4
+        self.assertEqual(table.evict_before(5), 4)
+        self.assertEqual(len(table), 0)
+
+    def test_release_keeps_other_agents(self):
+        table = ReservationTable()
+        table.reserve([(0, 0), (0, 1)], 0, agent=1)
+        # Agentti 2 ottaa saman solun; agentin 1 vapautus ei saa poistaa sitä
+        table.reserve([(0, 1)], 1, agent=2)
+        table.reserve([(5, 5), (5, 6)], 0, agent=3)
+        table.release(1, 0)
+        self.assertEqual(table.cell_owner((0, 1), 1), 2)
+        self.assertIsNone(table.cell_owner((0, 0), 0))
+        self.assertEqual(table.cell_owner((5, 6), 1), 3)
+        self.assertEqual(table._by_agent[1], [])
+
+
+class TestCooperativePlanner(unittest.TestCase):
+
+    def test_corridor_swap(self):
+        # Kaksi agenttia vaihtaa paikkaa käytävässä, jossa on yksi väistötila
+        grid = np.ones((3, 7), dtype=int)
+        grid[1, :] = 0
+        grid[0, 3] = 0
+        agents = [((1, 0), (1, 6)), ((1, 6), (1, 0))]
+        planner = CooperativePlanner(grid, window=12)
+        paths = planner.plan(agents, max_time=100)
+        self.assertEqual(count_conflicts(paths), (0, 0))
+        for path, (start, goal) in zip(paths, agents):
+            self.assertEqual(path[0], start)
+            self.assertEqual(path[-1], goal)
+            for a, b in zip(path, path[1:]):
+                self.assertLessEqual(max(abs(a[0] - b[0]), abs(a[1] - b[1])), 1)
+                self.assertEqual(grid[b], 0)
+
+    def test_many_agents_without_conflicts(self):
+        rng = np.random.default_rng(1)
+        grid = (rng.random((16, 16)) < 0.15).astype(int)
+        free = [tuple(map(int, cell)) for cell in np.argwhere(grid == 0)]
+        cells = rng.choice(len(free), size=16, replace=False)
+        agents = [(free[cells[i]], free[cells[8 + i]]) for i in range(8)]
+        planner = CooperativePlanner(grid, window=8)
+        paths = planner.plan(agents, max_time=200)
+        self.assertEqual(count_conflicts(paths), (0, 0))
+        self.assertEqual(len({len(path) for path in paths}), 1)
+        self.assertEqual([path[-1] for path in paths], [goal for _, goal in agents])
+        self.assertEqual(planner.fields.misses, 8)
+
+    def test_count_conflicts(self):
+        self.assertEqual(count_conflicts([[(0, 0), (0, 1)], [(0, 1), (0, 0)]]), (0, 1))
+        self.assertEqual(count_conflicts([[(0, 0), (0, 1)], [(0, 2), (0, 1)]]), (1, 0))
+        # Reitin päätyttyä agentti jää viimeiseen soluunsa
+        self.assertEqual(count_conflicts([[(0, 0)], [(0, 2), (0, 1), (0, 0)]]), (1, 0))
+    def test_padded_wait_respects_reservations(self):
+        # Haku keskeytyy heti, joten loppu täytetään odotuksella; agentin 5 varaus
+        # solussa (0, 0) hetkellä 2 katkaisee odotuksen
+        grid = np.zeros((1, 3), dtype=int)
+        planner = CooperativePlanner(grid, window=4, max_expansions=1)
+        planner.reservations.reserve([(0, 0)], 2, agent=5)
+        distance = planner.fields.get((0, 2)).distance
+        path = planner._windowed_search(0, (0, 0), (0, 2), 0, distance)
+        self.assertEqual(path, [(0, 0), (0, 0)])
+        self.assertEqual(planner.stats["blocked_waits"], 1)
+
+    def test_unfinished_agents_are_counted(self):
+        # Agentti ei pääse maaliin kahdessa askeleessa
+        grid = np.zeros((1, 8), dtype=int)
+        planner = CooperativePlanner(grid, window=4)
+        paths = planner.plan([((0, 0), (0, 7))], max_time=2)
+        self.assertEqual(len(paths[0]), 3)
+        self.assertEqual(planner.stats["unfinished"], 1)
+        planner = CooperativePlanner(grid, window=4)
+        planner.plan([((0, 0), (0, 7))])
+        self.assertEqual(planner.stats["unfinished"], 0)
+
+class TestCooperativeBenchmark(unittest.TestCase):
+
+    def test_rate_counts_agents(self):
+        grid = np.zeros((12, 12), dtype=int)
+        grid[3:9, 6] = 1
+        with contextlib.redirect_stdout(io.StringIO()):
+            rows = run_cooperative_benchmark(grid, agent_counts=(4,), window=4)
+        count, rate, searches, unfinished, _, _ = rows[0]
+        self.assertEqual(count, 4)
+        self.assertEqual(unfinished, 0)
+        # Lyhyellä ikkunalla agentit suunnitellaan useassa osassa, joten hakuja on enemmän kuin agentteja
+        self.assertGreater(searches, count)
+        self.assertGreater(rate, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+import corpus as corpus_module
+from corpus import MapCorpus, discover_pairs
+
+MAPS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'maps')
+
+class CountingExecutor:
+    """Synkroninen korvike prosessipoolille, joka laskee lähetetyt tehtävät."""
+
+    submitted = 0
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        CountingExecutor.submitted += 1
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+class TestCorpus(unittest.TestCase):
+
+    def setUp(self):
+        # Luodaan väliaikainen korpus MovingAI-tyylisillä tiedostonimillä
+        self.directory = tempfile.mkdtemp()
+        for name in ('a', 'b', 'c'):
+            shutil.copy(os.path.join(MAPS_DIR, 'rmtst03.map.txt'), os.path.join(self.directory, f'{name}.map'))
+            shutil.copy(os.path.join(MAPS_DIR, 'rmtst03.map.scen.txt'), os.path.join(self.directory, f'{name}.map.scen'))
+        # Kartta ilman skenaariotiedostoa jätetään pois
+        shutil.copy(os.path.join(MAPS_DIR, 'rmtst03.map.txt'), os.path.join(self.directory, 'orpo.map'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_discover_pairs(self):
+        self.assertEqual(list(discover_pairs(self.directory)), ['a', 'b', 'c'])
+        self.assertEqual(list(discover_pairs(MAPS_DIR)), ['rmtst03'])
+
+    def test_lazy_load(self):
+        corpus = MapCorpus(self.directory)
+        np_map, scenarios = corpus.load('b')
+        self.assertEqual(np_map.shape, (49, 182))
+        self.assertEqual(len(scenarios), 450)
+        # Toinen lataus palauttaa saman välimuistissa olevan olion
+        self.assertIs(corpus.load('b')[0], np_map)
+
+    def test_iter_maps(self):
+        corpus = MapCorpus(self.directory, max_workers=2)
+        corpus.load('a')
+        map_ids = [map_id for map_id, np_map, scenarios in corpus]
+        self.assertEqual(map_ids, ['a', 'b', 'c'])
+
+    def test_iter_maps_bounded_lookahead(self):
+        for name in 'defgh':
+            for suffix in ('.map', '.map.scen'):
+                shutil.copy(os.path.join(self.directory, 'a' + suffix), os.path.join(self.directory, name + suffix))
+        corpus = MapCorpus(self.directory, max_workers=1)
+        CountingExecutor.submitted = 0
+        with mock.patch.object(corpus_module, 'ProcessPoolExecutor', CountingExecutor):
+            maps = corpus.iter_maps()
+            self.assertEqual(next(maps)[0], 'a')
+            # Yksi työntekijä: enintään kaksi karttaa jonossa palautetun lisäksi
+            self.assertEqual(CountingExecutor.submitted, 3)
+            self.assertEqual([map_id for map_id, _, _ in maps], list('bcdefgh'))
+        self.assertEqual(CountingExecutor.submitted, 8)
+
+    def test_iter_maps_load_during_iteration(self):
+        shutil.copy(os.path.join(self.directory, 'a.map'), os.path.join(self.directory, 'd.map'))
+        shutil.copy(os.path.join(self.directory, 'a.map.scen'), os.path.join(self.directory, 'd.map.scen'))
+        corpus = MapCorpus(self.directory, max_workers=1)
+        with mock.patch.object(corpus_module, 'ProcessPoolExecutor', CountingExecutor):
+            maps = corpus.iter_maps()
+            self.assertEqual(next(maps)[0], 'a')
+            # Kesken läpikäynnin ladattu kartta ei saa siirtää tuloksia seuraaville kartoille
+            corpus.load('c')
+            self.assertEqual([map_id for map_id, _, _ in maps], ['b', 'c', 'd'])
+
+if __name__ == '__main__':
+    unittest.main()
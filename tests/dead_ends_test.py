@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+from astar import AStar
+from dead_ends import DeadEndIndex
+from jps import JPS
+
+class TestDeadEnds(unittest.TestCase):
+
+    def setUp(self):
+        # Vasemmalla yhden solun oviaukon takana oleva huone ja sen sisällä toinen umpikuja
+        self.grid = np.array([
+            [0, 0, 1, 1, 1, 0, 0, 0],
+            [0, 0, 0, 1, 1, 0, 0, 0],
+            [1, 1, 0, 0, 0, 0, 0, 0],
+            [1, 1, 1, 1, 1, 0, 0, 0],
+            [1, 1, 1, 1, 1, 0, 0, 0],
+        ])
+        self.index = DeadEndIndex.build(self.grid)
+
+    def test_labels(self):
+        # Oven (2, 4) takana oleva käytävä on umpikuja ja huone sen sisällä
+        self.assertGreater(self.index.labels[0, 0], 0)
+        self.assertEqual(self.index.labels[2, 7], self.index.labels[0, 7])
+        room = self.index.labels[0, 0]
+        corridor = self.index.labels[2, 3]
+        self.assertNotEqual(room, corridor)
+        self.assertEqual(self.index.parents[room], corridor)
+
+    def test_pruned_mask(self):
+        # Oikean puolen kyselyssä koko vasen puoli karsitaan
+        mask = self.index.pruned_mask((0, 5), (4, 7))
+        self.assertTrue(mask[0, 0])
+        self.assertTrue(mask[2, 3])
+        self.assertFalse(mask[2, 5])
+        # Huoneeseen päättyvä kysely sallii huoneen ja sitä ympäröivän käytävän
+        mask = self.index.pruned_mask((4, 7), (0, 0))
+        self.assertFalse(mask.any())
+
+    def test_engines_skip_dead_ends(self):
+        start, goal = (0, 5), (4, 7)
+        path, closed_set, _ = AStar(self.grid, dead_ends=self.index).find_path(start, goal)
+        self.assertEqual(path[-1], goal)
+        for x, y in closed_set:
+            self.assertGreaterEqual(y, 4)
+
+        path, _, _ = JPS(self.grid, dead_ends=self.index).find_path((0, 0), goal)
+        self.assertEqual(path[0], (0, 0))
+        self.assertEqual(path[-1], goal)
+
+if __name__ == '__main__':
+    unittest.main()
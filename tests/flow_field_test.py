@@ -0,0 +1,88 @@
+import unittest
+import numpy as np
+from astar import AStar
+from flow_field import NO_DIRECTION, FlowField, FlowFieldCache
+from path_result import path_cost
+
+class TestFlowField(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = np.zeros((10, 12), dtype=int)
+        self.grid[1:9, 5] = 1
+        self.grid[4, 1:5] = 1
+        self.astar = AStar(self.grid)
+        self.field = FlowField(self.grid, (5, 10))
+
+    def test_distances_match_astar(self):
+        for start in [(0, 0), (9, 0), (5, 2), (8, 11), (3, 3)]:
+            expected, _, _ = self.astar.find_path(start, (5, 10))
+            self.assertAlmostEqual(self.field.distance[start], path_cost(expected))
+            path = self.field.path_from(start)
+            self.assertEqual(path[0], start)
+            self.assertEqual(path[-1], (5, 10))
+            self.assertAlmostEqual(path_cost(path), path_cost(expected))
+
+    def test_directions(self):
+        self.assertEqual(self.field.directions.dtype, np.int8)
+        self.assertIsNone(self.field.direction_at((5, 10)))
+        self.assertIsNone(self.field.direction_at((2, 5)))
+        self.assertEqual(self.field.direction_at((5, 9)), (0, 1))
+        self.assertTrue(np.isinf(self.field.distance[2, 5]))
+        self.assertEqual(self.field.directions[2, 5], NO_DIRECTION)
+
+    def test_goal_set(self):
+        field = FlowField(self.grid, [(0, 0), (9, 11)])
+        self.assertEqual(field.distance[0, 0], 0.0)
+        self.assertEqual(field.distance[9, 11], 0.0)
+        self.assertEqual(field.path_from((9, 9))[-1], (9, 11))
+        self.assertEqual(field.path_from((1, 1))[-1], (0, 0))
+
+    def test_unreachable(self):
+        grid = np.zeros((5, 5), dtype=int)
+        grid[:, 2] = 1
+        field = FlowField(grid, (0, 0))
+        self.assertIsNone(field.path_from((0, 4)))
+        self.assertEqual(field.path_from((0, 0)), [(0, 0)])
+
+    def test_moved_matches_full_recompute(self):
+        for new_goal in [(5, 11), (0, 0), (9, 4)]:
+            moved = self.field.moved(new_goal)
+            full = FlowField(self.grid, new_goal)
+            np.testing.assert_allclose(moved.distance, full.distance)
+            self.assertEqual(moved.goals, (new_goal,))
+
+    def test_cost_grid(self):
+        cost_grid = np.ones(self.grid.shape, dtype=np.float32)
+        cost_grid[:, 6:] = 3
+        field = FlowField(self.grid, (5, 10), cost_grid=cost_grid)
+        astar = AStar(self.grid, cost_grid=cost_grid)
+        path, _, _ = astar.find_path((0, 0), (5, 10))
+        expected = sum(np.hypot(b[0] - a[0], b[1] - a[1]) * cost_grid[b] for a, b in zip(path, path[1:]))
+        self.assertAlmostEqual(field.distance[0, 0], expected, places=5)
+        moved = field.moved((5, 11))
+        full = FlowField(self.grid, (5, 11), cost_grid=cost_grid)
+        np.testing.assert_allclose(moved.distance, full.distance)
+
+
+class TestFlowFieldCache(unittest.TestCase):
+
+    def test_cache(self):
+        grid = np.zeros((6, 6), dtype=int)
+        cache = FlowFieldCache(grid, max_size=2)
+        first = cache.get((0, 0))
+        self.assertIs(cache.get((0, 0)), first)
+        self.assertIs(cache.get([(0, 0)]), first)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        moved = cache.move_goal((0, 0), (1, 1))
+        self.assertEqual(moved.goals, ((1, 1),))
+        self.assertIs(cache.get((1, 1)), moved)
+        cache.get((5, 5))
+        # Vanhin kenttä poistuu, kun välimuisti täyttyy
+        cache.get((0, 0))
+        self.assertEqual(cache.misses, 4)
+        cache.invalidate()
+        cache.get((5, 5))
+        self.assertEqual(cache.misses, 5)
+
+if __name__ == '__main__':
+    unittest.main()
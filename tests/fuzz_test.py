@@ -0,0 +1,134 @@
+import contextlib
+import io
+import unittest
+import numpy as np
+from astar import AStar
+from fuzz import (ENGINES, check_path, find_failure, format_case, main, parse_case,
+                  reference_cost, run_fuzz, shrink)
+
+# Fuzzerin löytämä ja pienentämä tapaus, jossa JPS palauttaa liian pitkän reitin:
+# optimaalinen reitti kulkee diagonaalisesti esteen kulman ohi kohdissa (2, 5) -> (3, 4)
+# ja (3, 4) -> (4, 3), mutta JPS:n karsintasäännöt eivät tuota näitä hyppypisteitä.
+JPS_COUNTEREXAMPLE = """
+G#.....
+.#.##..
+...#...
+...#.#.
+.....#.
+...###.
+...#.S.
+"""
+
+
+class StraightLine:
+    """Tahallaan rikkinäinen algoritmi, joka kulkee suoraan esteiden läpi."""
+
+    def __init__(self, grid):
+        self.grid = grid
+
+    def find_path(self, start, goal):
+        return [start, goal], set(), 0
+
+
+class FailingPreprocessing(StraightLine):
+    """Algoritmi, jonka esikäsittely kaatuu, jos ruudukossa on vähintään kaksi riviä."""
+
+    def __init__(self, grid):
+        if len(grid) > 1:
+            raise RuntimeError("esikäsittely epäonnistui")
+        super().__init__(grid)
+
+
+class TestFuzz(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = np.zeros((6, 6), dtype=int)
+        self.grid[2, 3] = 1
+        self.grid[4, 1:5] = 1
+        self.grid[0, 5] = 1
+
+    def test_reference_cost(self):
+        astar = AStar(self.grid)
+        for start, goal in [((0, 0), (5, 5)), ((2, 0), (2, 5)), ((5, 0), (3, 3))]:
+            path = astar.find_path(start, goal)[0]
+            self.assertIsNone(check_path(self.grid, start, goal, path, reference_cost(self.grid, start, goal)))
+        self.grid[:, 2] = 1
+        self.assertEqual(reference_cost(self.grid, (0, 0), (0, 5)), float("inf"))
+
+    def test_check_path(self):
+        expected = reference_cost(self.grid, (2, 0), (2, 5))
+        self.assertIn("ei löytynyt", check_path(self.grid, (2, 0), (2, 5), None, expected))
+        self.assertIn("kulkee", check_path(self.grid, (2, 0), (2, 5), [(2, 0), (2, 2)], expected))
+        self.assertIn("este", check_path(self.grid, (2, 0), (2, 5), [(2, 0), (2, 5)], expected))
+        detour = [(2, 0), (3, 0), (3, 5), (2, 5)]
+        self.assertIn("optimaalinen", check_path(self.grid, (2, 0), (2, 5), detour, expected))
+        self.assertIn("vaikka", check_path(self.grid, (2, 0), (2, 5), detour, float("inf")))
+        self.assertIsNone(check_path(self.grid, (2, 0), (2, 5), None, float("inf")))
+
+    def test_shrink(self):
+        grid, start, goal, error = shrink(StraightLine, self.grid, (2, 0), (2, 5))
+        self.assertEqual(grid.tolist(), [[0, 1, 0]])
+        self.assertEqual((start, goal), ((0, 0), (0, 2)))
+        self.assertIsNotNone(error)
+        with self.assertRaises(ValueError):
+            shrink(AStar, self.grid, (2, 0), (2, 5))
+
+    def test_format_and_parse_case(self):
+        text = format_case(self.grid, (2, 0), (5, 5))
+        self.assertEqual(text.splitlines()[2], "S..#..")
+        grid, start, goal = parse_case(text)
+        self.assertEqual(grid.tolist(), self.grid.tolist())
+        self.assertEqual((start, goal), ((2, 0), (5, 5)))
+
+    def test_run_fuzz(self):
+        engines = {name: ENGINES[name] for name in ("A*", "RSR", "A*+umpikujat", "Esisuodatin")}
+        result = run_fuzz(maps=8, queries=5, seed=3, engines=engines, max_size=12)
+        self.assertEqual(result["failures"], [])
+        self.assertEqual(result["queries"], 40)
+        for stats in result["timings"].values():
+            self.assertEqual(stats["n"], 40)
+
+    def test_run_fuzz_finds_broken_engine(self):
+        result = run_fuzz(maps=10, queries=5, seed=3, engines={"suora": StraightLine},
+                          max_size=12, max_failures=2)
+        self.assertEqual(len(result["failures"]), 2)
+        failure = result["failures"][0]
+        self.assertIsNotNone(find_failure(StraightLine, failure["grid"], failure["start"], failure["goal"]))
+        # Suora hyppy voi olla vino, joten pienin ruudukko on enintään 3 x 3
+        self.assertLessEqual(failure["grid"].size, 9)
+
+    def test_preprocessing_error_is_recorded(self):
+        result = run_fuzz(maps=2, queries=3, seed=3, engines={"kaatuva": FailingPreprocessing},
+                          min_size=4, max_size=8, max_failures=100)
+        # Jokainen kartan kysely kirjataan virheeksi, ja ajo jatkuu seuraavaan karttaan
+        self.assertEqual(len(result["failures"]), 6)
+        self.assertEqual({failure["map"] for failure in result["failures"]}, {0, 1})
+        for failure in result["failures"]:
+            self.assertEqual(failure["error"], "poikkeus RuntimeError: esikäsittely epäonnistui")
+            # Pienennys säilyttää vain lähdön ja maalin rivit
+            self.assertLessEqual(failure["grid"].shape[0], 2)
+        self.assertEqual(result["timings"]["kaatuva"]["n"], 0)
+
+    def test_seed_is_deterministic(self):
+        engines = {"A*": ENGINES["A*"]}
+        first = run_fuzz(maps=3, queries=3, seed=7, engines={"suora": StraightLine}, max_failures=100,
+                         minimize=False)
+        second = run_fuzz(maps=3, queries=3, seed=7, engines={"suora": StraightLine}, max_failures=100,
+                          minimize=False)
+        self.assertEqual([(f["start"], f["goal"]) for f in first["failures"]],
+                         [(f["start"], f["goal"]) for f in second["failures"]])
+        self.assertEqual(run_fuzz(maps=3, queries=3, seed=7, engines=engines)["failures"], [])
+
+    def test_main_exit_code(self):
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(main(["--maps", "2", "--queries", "2", "--engines", "A*", "RSR"]), 0)
+        self.assertIn("0 virhettä", output.getvalue())
+
+    @unittest.expectedFailure
+    def test_jps_counterexample(self):
+        grid, start, goal = parse_case(JPS_COUNTEREXAMPLE)
+        self.assertIsNone(find_failure(ENGINES["JPS"], grid, start, goal))
+
+
+if __name__ == '__main__':
+    unittest.main()
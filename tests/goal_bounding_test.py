@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from astar import AStar, octile_distance
+from goal_bounding import GoalBounds, build_goal_bounds, DIRECTION_INDEX
+from jps import JPS
+
+class TestGoalBounding(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = np.array([
+            [0, 0, 0, 0, 0, 0],
+            [0, 1, 1, 1, 1, 0],
+            [0, 0, 0, 0, 1, 0],
+            [1, 1, 1, 0, 1, 0],
+            [0, 0, 0, 0, 0, 0]
+        ])
+        self.bounds = GoalBounds.build(self.grid, max_workers=1)
+
+    def path_length(self, path):
+        return sum(octile_distance(path[i], path[i + 1]) for i in range(len(path) - 1))
+
+    def test_bounds_shape_and_obstacles(self):
+        self.assertEqual(self.bounds.bounds.shape, (5, 6, 8, 4))
+        self.assertEqual(self.bounds.bounds.dtype, np.int16)
+        # Esteen suorakulmiot ovat tyhjiä
+        for d in range(8):
+            self.assertFalse(self.bounds.allows((1, 1), list(DIRECTION_INDEX)[d], (0, 0)))
+
+    def test_allows(self):
+        # Solusta (2, 0) pääsee umpikujaan (2, 3) vain itään
+        self.assertTrue(self.bounds.allows((2, 0), (0, 1), (2, 3)))
+        self.assertFalse(self.bounds.allows((2, 0), (-1, 0), (2, 3)))
+
+    def test_astar_keeps_optimal_cost(self):
+        plain = AStar(self.grid)
+        bounded = AStar(self.grid, goal_bounds=self.bounds)
+        free = [tuple(map(int, cell)) for cell in np.argwhere(self.grid == 0)]
+        for start in free:
+            for goal in free:
+                path, closed_set, _ = plain.find_path(start, goal)
+                bounded_path, bounded_closed, _ = bounded.find_path(start, goal)
+                self.assertAlmostEqual(self.path_length(path), self.path_length(bounded_path))
+                self.assertLessEqual(len(bounded_closed), len(closed_set))
+
+    def test_jps_with_bounds(self):
+        jps = JPS(self.grid, goal_bounds=self.bounds)
+        path, _, _ = jps.find_path((4, 0), (2, 3))
+        self.assertEqual(path[0], (4, 0))
+        self.assertEqual(path[-1], (2, 3))
+        self.assertAlmostEqual(self.path_length(path), 3 + 2 ** 0.5)
+
+    def test_parallel_build_and_save(self):
+        parallel = build_goal_bounds(self.grid, max_workers=2, chunk_size=4)
+        np.testing.assert_array_equal(parallel, self.bounds.bounds)
+
+        filename = os.path.join(tempfile.mkdtemp(), 'bounds.npy')
+        self.bounds.save(filename)
+        np.testing.assert_array_equal(GoalBounds.load(filename).bounds, self.bounds.bounds)
+        os.remove(filename)
+
+if __name__ == '__main__':
+    unittest.main()
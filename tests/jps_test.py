@@ -1,6 +1,7 @@
 import unittest
 import numpy as np
-from jps import JPS, is_valid, get_neighbors, get_direction, get_forced_neighbors, has_forced_neighbors, jump, identify_successors, octile_distance
+from grid_preprocessing import PreprocessedGrid
+from jps import JPS, JumpCache, is_valid, get_neighbors, get_direction, get_forced_neighbors, has_forced_neighbors, jump, identify_successors, octile_distance
 
 class TestJPS(unittest.TestCase):
 
@@ -216,5 +217,57 @@ class TestJPS(unittest.TestCase):
             # Polun pitäisi olla kohtuullisen lähellä suoraa etäisyyttä
             self.assertLessEqual(total_distance, direct_distance * 2)
 
+    def test_jump_cache_matches_jump(self):
+        # Välimuistin kautta tehdyt hypyt antavat saman tuloksen kuin jump ilman välimuistia
+        rng = np.random.default_rng(7)
+        directions = [(-1, 0), (1, 0), (0, -1), (0, 1), (1, 1), (-1, 1), (1, -1), (-1, -1)]
+        for _ in range(20):
+            grid = (rng.random((8, 11)) < 0.3).astype(int)
+            cache = JumpCache(grid)
+            free = [tuple(cell) for cell in np.argwhere(grid == 0)]
+            for _ in range(20):
+                pos = free[rng.integers(len(free))]
+                goal = free[rng.integers(len(free))]
+                for direction in directions:
+                    self.assertEqual(jump(pos, direction, goal, grid, cache),
+                                     jump(pos, direction, goal, grid))
+
+    def test_jump_cache_invalidation(self):
+        # Ruudukon muutoksen jälkeen välimuisti ei saa palauttaa vanhoja tuloksia
+        grid = np.zeros((3, 5), dtype=int)
+        jps = JPS(grid)
+        path, _, _ = jps.find_path((1, 0), (1, 4))
+        self.assertEqual(path, [(1, 0), (1, 4)])
+        self.assertEqual(jps.jump_cache.scan((1, 0), (0, 1)), -5)
+
+        grid[1, 2] = 1
+        jps.set_grid(grid)
+        self.assertEqual(jps.jump_cache.scan((1, 0), (0, 1)), -2)
+        path, _, _ = jps.find_path((1, 0), (1, 4))
+        self.assertEqual(path[0], (1, 0))
+        self.assertEqual(path[-1], (1, 4))
+        self.assertNotIn((1, 2), path)
+
+    def test_preprocessed_grid_lines(self):
+        # Pystysuuntainen liike luetaan transponoidun kopion riviltä
+        pre = PreprocessedGrid(self.grid)
+        self.assertTrue(pre.blocked_t.flags['C_CONTIGUOUS'])
+        line, stop_line, index = pre.lines((0, 1), (1, 0))
+        self.assertEqual(list(line), [1, 0, 0, 0, 1, 1, 1])
+        self.assertEqual(index, 1)
+        # Vaakasuuntainen liike luetaan reunustetun ruudukon riviltä
+        line, stop_line, index = pre.lines((3, 0), (0, 1))
+        self.assertEqual(list(line), [1, 0, 1, 0, 0, 0, 1])
+        self.assertEqual(index, 1)
+
+    def test_preprocessed_scan(self):
+        # Negatiivinen tulos on este, positiivinen pakotetun naapurin hyppypiste
+        pre = PreprocessedGrid(self.grid)
+        self.assertEqual(pre.scan((0, 1), (1, 0)), -3)
+        self.assertEqual(pre.scan((4, 0), (-1, 0)), 1)
+        self.assertEqual(pre.scan((2, 0), (0, 1)), 1)
+        self.assertEqual(pre.scan((2, 4), (0, -1)), 3)
+        self.assertEqual(pre.scan((0, 0), (0, 1)), -5)
+
 if __name__ == '__main__':
     unittest.main()
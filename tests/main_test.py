@@ -0,0 +1,130 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+from main import main, run_comprehensive_comparison, run_parallel_comparison, write_rows
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestParallelComparison(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = np.zeros((10, 10), dtype=int)
+        self.grid[2:8, 5] = 1
+        self.scenarios = [((0, 0), (9, 9), 9 + 9 * (2 ** 0.5 - 1)), ((4, 0), (4, 9), 10.0),
+                          ((0, 0), (0, 1), 1.0), ((9, 0), (0, 9), 12.7)]
+
+    def assert_same_results(self, parallel, serial):
+        self.assertEqual(len(parallel), len(serial))
+        for row, expected in zip(parallel, serial):
+            # Ajat vaihtelevat, muiden sarakkeiden pitää täsmätä
+            self.assertEqual(set(row), set(expected))
+            for key in row:
+                if not key.endswith("aika"):
+                    self.assertEqual(row[key], expected[key], key)
+
+    def test_parallel_matches_serial(self):
+        serial = run_comprehensive_comparison(self.scenarios, self.grid, warmup=0, repeats=1)
+        parallel = run_parallel_comparison(self.scenarios, self.grid, max_workers=2,
+                                           warmup=0, repeats=1)
+        self.assert_same_results(parallel, serial)
+        self.assertEqual([row["Skenaario"] for row in parallel], [1, 2, 3, 4])
+
+    def test_split_engines_with_rsr(self):
+        serial = run_comprehensive_comparison(self.scenarios, self.grid, include_rsr=True,
+                                              warmup=0, repeats=1)
+        parallel = run_parallel_comparison(self.scenarios, self.grid, max_workers=3,
+                                           split_engines=True, pin_cpus=True, include_rsr=True,
+                                           warmup=0, repeats=1)
+        self.assert_same_results(parallel, serial)
+        self.assertIn("RSR solmut", parallel[0])
+
+    def test_validate(self):
+        # Viimeisen skenaarion optimaalinen pituus on tarkoituksella väärä
+        scenarios = [((0, 0), (9, 0), 9.0), ((0, 0), (0, 1), 1.0), ((9, 0), (0, 9), 12.7)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            serial = run_comprehensive_comparison(scenarios, self.grid, warmup=0, repeats=1,
+                                                  validate=True)
+            parallel = run_parallel_comparison(scenarios, self.grid, max_workers=2,
+                                               warmup=0, repeats=1, validate=True)
+        self.assert_same_results(parallel, serial)
+        self.assertEqual([row["JPS kelvollinen"] for row in serial], [True] * 3)
+        self.assertEqual([row["A* optimaalinen"] for row in serial], [True, True, False])
+
+class TestComprehensiveComparison(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = np.zeros((10, 10), dtype=int)
+        self.grid[2:8, 5] = 1
+        self.scenarios = [((0, 0), (9, 9), 9 + 9 * (2 ** 0.5 - 1)), ((4, 0), (4, 9), 10.0),
+                          ((0, 0), (0, 1), 1.0), ((9, 0), (0, 9), 12.7)]
+
+    def test_prefilter_counts_each_scenario_once(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            rows = run_comprehensive_comparison(self.scenarios, self.grid, use_prefilter=True)
+        # Oletuksena jokainen kysely ajetaan neljästi, mutta lasketaan kerran
+        self.assertEqual([row["A* suodatin"] for row in rows], ["engine", "engine", "adjacent", "engine"])
+        self.assertIn("A* esisuodatin: trivial: 0, adjacent: 1, line_of_sight: 0, cache: 0, engine: 3",
+                      output.getvalue())
+
+class TestCommandLine(unittest.TestCase):
+
+    def run_main(self, argv):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main(argv)
+        return output.getvalue()
+
+    def test_no_plotting_import(self):
+        code = "import sys, main; print('matplotlib' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(result.stdout.strip(), "False")
+
+    def test_query(self):
+        rows = json.loads(self.run_main(["query", "40", "170", "41", "167", "--engine", "A*"]))
+        self.assertEqual(len(rows), 1)
+        self.assertTrue(rows[0]["found"])
+        self.assertAlmostEqual(rows[0]["length"], 2 ** 0.5 + 2, places=4)
+        self.assertEqual(rows[0]["path"][0], [40, 170])
+
+    def test_batch_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            queries = os.path.join(directory, "queries.csv")
+            with open(queries, "w", encoding="utf-8") as f:
+                f.write("# sx,sy,gx,gy\n40,170,41,167\n13,169,13,167\n")
+            output = os.path.join(directory, "out.csv")
+            main(["batch", "--queries", queries, "--format", "csv", "--output", output])
+            with open(output, encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual([row["start"] for row in rows], ["40 170", "13 169"])
+        self.assertEqual([row["length"] for row in rows], ["3.4142", "2.0"])
+
+    def test_bench(self):
+        rows = json.loads(self.run_main(["bench", "--limit", "2", "--warmup", "0", "--repeats", "1"]))
+        self.assertEqual([row["Skenaario"] for row in rows], [1, 2])
+        self.assertEqual(rows[0]["JPS pituus"], rows[0]["A* pituus"])
+        rows = json.loads(self.run_main(["bench", "--limit", "2", "--warmup", "0", "--repeats", "1",
+                                         "--validate"]))
+        self.assertTrue(rows[0]["JPS kelvollinen"])
+
+    def test_bench_rejects_prefilter_with_workers(self):
+        errors = io.StringIO()
+        with contextlib.redirect_stderr(errors), self.assertRaises(SystemExit):
+            main(["bench", "--workers", "2", "--prefilter"])
+        self.assertIn("--prefilter ei ole tuettu --workers kanssa", errors.getvalue())
+
+    def test_write_rows_json(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            write_rows([{"a": (1, 2)}])
+        self.assertEqual(json.loads(output.getvalue()), [{"a": [1, 2]}])
+
+if __name__ == '__main__':
+    unittest.main()
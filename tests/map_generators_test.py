@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+from flow_field import FlowField
+from map_generators import (GENERATORS, main, maze, open_field, random_obstacles, random_queries,
+                            rooms, run_scaling_benchmark)
+
+def is_connected(grid):
+    # Kaikkien vapaiden solujen etäisyys yhteen vapaaseen soluun on äärellinen
+    free = np.argwhere(grid == 0)
+    field = FlowField(grid, tuple(int(v) for v in free[0]))
+    return bool(np.isfinite(field.distance[grid == 0]).all())
+
+class TestMapGenerators(unittest.TestCase):
+
+    def test_seeded_and_shaped(self):
+        for name, generator in GENERATORS.items():
+            grid = generator(65, 0.3, seed=4)
+            self.assertEqual(grid.shape, (65, 65), name)
+            self.assertTrue(set(np.unique(grid)) <= {0, 1}, name)
+            np.testing.assert_array_equal(grid, generator(65, 0.3, seed=4))
+            self.assertFalse(np.array_equal(grid, generator(65, 0.3, seed=5)), name)
+            self.assertEqual(generator((40, 70), 0.3).shape, (40, 70))
+
+    def test_density_increases_obstacles(self):
+        for name, generator in GENERATORS.items():
+            sparse = generator(128, 0.1).sum()
+            dense = generator(128, 0.9).sum()
+            self.assertLess(sparse, dense, name)
+        self.assertAlmostEqual(random_obstacles(256, 0.25).mean(), 0.25, delta=0.01)
+
+    def test_connected_generators(self):
+        for density in (0.0, 0.5, 1.0):
+            self.assertTrue(is_connected(maze(41, density)))
+            self.assertTrue(is_connected(rooms(70, density, room_size=10)))
+            self.assertTrue(is_connected(open_field(70, density)))
+
+    def test_perfect_maze_is_tree(self):
+        # Täydellisessä labyrintissa vapaiden solujen välisiä 4-naapuruuksia on yksi vähemmän kuin soluja
+        grid = maze(31, 1.0)
+        free = grid == 0
+        edges = (free[1:, :] & free[:-1, :]).sum() + (free[:, 1:] & free[:, :-1]).sum()
+        self.assertEqual(edges, free.sum() - 1)
+
+    def test_large_map(self):
+        grid = rooms(1024, 0.5)
+        self.assertEqual(grid.shape, (1024, 1024))
+
+    def test_random_queries(self):
+        grid = random_obstacles(32, 0.3)
+        pairs = random_queries(grid, 10, seed=1)
+        self.assertEqual(len(pairs), 10)
+        self.assertEqual(pairs, random_queries(grid, 10, seed=1))
+        self.assertTrue(all(grid[start] == 0 and grid[goal] == 0 for start, goal in pairs))
+
+    def test_scaling_benchmark(self):
+        rows = run_scaling_benchmark(generators=["open_field", "maze"], sizes=(16, 32), densities=(0.2,),
+                                     queries=2, repeats=1)
+        self.assertEqual(len(rows), 2 * 2 * 4)
+        for row in rows:
+            self.assertEqual(row["found"], 2)
+            self.assertGreater(row["median_ns"], 0)
+
+    def test_size_limits(self):
+        rows = run_scaling_benchmark(generators=["maze"], sizes=(16, 32), densities=(0.2,),
+                                     engines=["A*", "JPS"], queries=1, repeats=1, size_limits={"A*": 16})
+        self.assertEqual([(row["engine"], row["size"]) for row in rows],
+                         [("A*", 16), ("JPS", 16), ("JPS", 32)])
+
+    def test_main(self):
+        rows = main(["--sizes", "16", "--engines", "JPS", "RSR", "--generators", "rooms",
+                     "--densities", "0.2", "--queries", "2", "--repeats", "1", "--no-plot"])
+        self.assertEqual([(row["engine"], row["size"], row["found"]) for row in rows],
+                         [("JPS", 16, 2), ("RSR", 16, 2)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+from astar import AStar
+from jps import JPS, octile_distance
+from path_result import PathResult, path_cost
+
+class TestPathResult(unittest.TestCase):
+
+    def setUp(self):
+        self.result = PathResult.from_waypoints([(0, 0), (3, 3), (3, 5), (1, 5)])
+
+    def test_cost(self):
+        expected = octile_distance((0, 0), (3, 3)) + 2 + 2
+        self.assertAlmostEqual(self.result.cost, expected)
+        self.assertAlmostEqual(path_cost([(0, 0), (3, 4)]), octile_distance((0, 0), (3, 4)))
+        self.assertEqual(path_cost([(1, 1)]), 0.0)
+        self.assertEqual(path_cost([]), 0.0)
+
+    def test_iter_cells(self):
+        cells = list(self.result.iter_cells())
+        self.assertEqual(cells, [(0, 0), (1, 1), (2, 2), (3, 3), (3, 4), (3, 5), (2, 5), (1, 5)])
+        self.assertEqual(self.result.cell_count, len(cells))
+        self.assertEqual(self.result.cells().tolist(), [list(cell) for cell in cells])
+
+    def test_waypoints_view(self):
+        view = self.result.waypoints
+        self.assertEqual(view.dtype, np.int32)
+        self.assertEqual(view.shape, (4, 2))
+        self.assertTrue(np.shares_memory(view, self.result.waypoints))
+        with self.assertRaises(ValueError):
+            view[0, 0] = 1
+        self.assertEqual(self.result.to_list(), [(0, 0), (3, 3), (3, 5), (1, 5)])
+        self.assertEqual((self.result.start, self.result.goal), ((0, 0), (1, 5)))
+
+    def test_single_point_and_none(self):
+        single = PathResult.from_waypoints([(2, 2)])
+        self.assertEqual(list(single.iter_cells()), [(2, 2)])
+        self.assertEqual(single.cost, 0.0)
+        self.assertIsNone(PathResult.from_waypoints(None))
+
+    def test_jps_find_path_result(self):
+        grid = np.zeros((8, 8), dtype=int)
+        grid[2:6, 4] = 1
+        result, closed_set, _ = JPS(grid).find_path_result((3, 0), (4, 7))
+        astar_path, _, _ = AStar(grid).find_path((3, 0), (4, 7))
+        self.assertAlmostEqual(result.cost, path_cost(astar_path))
+        cells = list(result.iter_cells())
+        self.assertEqual(cells[0], (3, 0))
+        self.assertEqual(cells[-1], (4, 7))
+        for a, b in zip(cells, cells[1:]):
+            self.assertEqual(max(abs(a[0] - b[0]), abs(a[1] - b[1])), 1)
+            self.assertEqual(grid[b], 0)
+        self.assertIsNone(JPS(grid).find_path_result((2, 4), (0, 0))[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import numpy as np
+from astar import AStar
+from jps import JPS
+from rsr import RSR
+from path_validation import (pack_paths, validate_paths, describe_flags,
+                             BAD_STEP, OUT_OF_BOUNDS, BLOCKED, CORNER_CUT)
+
+class TestPathValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = np.zeros((10, 10), dtype=int)
+        self.grid[2:8, 5] = 1
+        self.grid[8, 2] = 1
+
+    def validate(self, paths, **kwargs):
+        points, offsets = pack_paths(paths)
+        return validate_paths(points, offsets, self.grid, **kwargs)
+
+    def test_pack_paths(self):
+        points, offsets = pack_paths([[(0, 0), (1, 1)], None, [], [(2, 2)]])
+        self.assertEqual(points.shape, (3, 2))
+        self.assertEqual(offsets.tolist(), [0, 2, 2, 2, 3])
+
+    def test_engine_paths_are_legal(self):
+        queries = [((0, 0), (9, 9)), ((4, 0), (4, 9)), ((9, 0), (0, 9)), ((3, 3), (3, 3))]
+        for engine in (AStar(self.grid), JPS(self.grid), RSR(self.grid)):
+            paths = [engine.find_path(start, goal)[0] for start, goal in queries]
+            result = self.validate(paths)
+            self.assertTrue(result["legal"].all(), type(engine).__name__)
+            self.assertEqual(result["flags"].tolist(), [0, 0, 0, 0])
+
+    def test_jump_point_length_matches_cells(self):
+        # Käännöspisteinä ja soluittain annetun reitin pituus on sama
+        cells = [(0, 0), (1, 1), (2, 2), (2, 3), (2, 4)]
+        result = self.validate([cells, [(0, 0), (2, 2), (2, 4)]])
+        expected = 2 + 2 * 2 ** 0.5
+        np.testing.assert_allclose(result["length"], [expected, expected])
+
+    def test_bad_step(self):
+        result = self.validate([[(0, 0), (1, 2)], [(0, 0), (0, 0)]])
+        self.assertEqual(result["flags"].tolist(), [BAD_STEP, BAD_STEP])
+        self.assertFalse(result["legal"].any())
+
+    def test_blocked_cell(self):
+        # Osuuden välisolu (4, 5) on este, vaikka päätepisteet ovat vapaita
+        result = self.validate([[(4, 4), (4, 6)], [(0, 0), (0, 4)]])
+        self.assertEqual(result["flags"].tolist(), [BLOCKED, 0])
+
+    def test_out_of_bounds(self):
+        result = self.validate([[(9, 9), (10, 10)], [(0, 0), (-1, 0)]])
+        self.assertEqual(result["flags"].tolist(), [OUT_OF_BOUNDS, OUT_OF_BOUNDS])
+
+    def test_corner_rules(self):
+        self.grid[0, 1] = 1
+        squeeze = [(7, 2), (8, 3)]
+        self.grid[7, 3] = 1
+        one_side = [(0, 0), (1, 1)]
+        paths = [squeeze, one_side]
+        self.assertEqual(self.validate(paths)["flags"].tolist(), [0, 0])
+        self.assertEqual(self.validate(paths, corner_rule="no_squeeze")["flags"].tolist(), [CORNER_CUT, 0])
+        self.assertEqual(self.validate(paths, corner_rule="strict")["flags"].tolist(), [CORNER_CUT, CORNER_CUT])
+        with self.assertRaises(ValueError):
+            self.validate(paths, corner_rule="never")
+
+    def test_optimal_mismatch(self):
+        paths = [[(0, 0), (0, 4)], [(0, 0), (0, 4)], [(0, 0), (1, 2)]]
+        result = self.validate(paths, optimal=[4.0, 5.0, 2.0])
+        self.assertEqual(result["optimal_ok"].tolist(), [True, False, False])
+
+    def test_missing_paths(self):
+        result = self.validate([None, [], [(1, 1)]], optimal=[1.0, 0.0, 0.0])
+        self.assertEqual(result["found"].tolist(), [False, False, True])
+        self.assertEqual(result["legal"].tolist(), [False, False, True])
+        self.assertEqual(result["optimal_ok"].tolist(), [False, False, True])
+        result = self.validate([])
+        self.assertEqual(len(result["legal"]), 0)
+
+    def test_describe_flags(self):
+        self.assertEqual(describe_flags(0), "ok")
+        self.assertEqual(describe_flags(BAD_STEP | BLOCKED), "virheellinen askel, este")
+
+
+if __name__ == '__main__':
+    unittest.main()
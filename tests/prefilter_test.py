@@ -0,0 +1,92 @@
+import unittest
+import numpy as np
+from astar import AStar
+from jps import JPS, octile_distance
+from path_result import path_cost
+from prefilter import QueryPrefilter, monotone_corridor
+
+class TestQueryPrefilter(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = np.array([
+            [0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 1, 0, 0],
+            [0, 0, 0, 1, 0, 0],
+            [0, 0, 0, 0, 0, 0]
+        ])
+        self.astar = QueryPrefilter(self.grid, AStar(self.grid))
+        self.jps = QueryPrefilter(self.grid, JPS(self.grid))
+
+    def test_monotone_corridor(self):
+        cells, bend = monotone_corridor((0, 0), (2, 5))
+        self.assertEqual(bend, (2, 2))
+        self.assertEqual(cells.tolist(), [[1, 1], [2, 2], [2, 3], [2, 4], [2, 5]])
+        cells, bend = monotone_corridor((0, 0), (2, 5), diagonal_first=False)
+        self.assertEqual(bend, (0, 3))
+        self.assertEqual(cells.tolist(), [[0, 1], [0, 2], [0, 3], [1, 4], [2, 5]])
+
+    def test_trivial_and_adjacent(self):
+        self.assertEqual(self.astar.find_path((1, 1), (1, 1)), ([(1, 1)], set(), 0))
+        self.assertEqual(self.astar.find_path((1, 1), (2, 2)), ([(1, 1), (2, 2)], set(), 0))
+        self.assertEqual(self.astar.stats["trivial"], 1)
+        self.assertEqual(self.astar.stats["adjacent"], 1)
+
+    def test_line_of_sight(self):
+        path, closed_set, count = self.astar.find_path((4, 0), (0, 4))
+        self.assertEqual(path, [(4, 0), (3, 1), (2, 2), (1, 3), (0, 4)])
+        self.assertEqual((closed_set, count), (set(), 0))
+        # Diagonaali ensin on tukossa, suora osuus ensin on vapaa
+        path, _, _ = self.jps.find_path((0, 0), (2, 5))
+        self.assertEqual(path, [(0, 0), (0, 3), (2, 5)])
+        self.assertEqual(self.jps.stats["line_of_sight"], 1)
+        self.assertEqual(self.jps.stats["engine"], 0)
+
+    def test_engine_and_cache(self):
+        path, closed_set, _ = self.astar.find_path((2, 2), (3, 5))
+        self.assertTrue(closed_set)
+        self.assertAlmostEqual(path_cost(path), path_cost(AStar(self.grid).find_path((2, 2), (3, 5))[0]))
+        cached, closed_set, _ = self.astar.find_path((2, 2), (3, 5))
+        self.assertEqual(cached, path)
+        self.assertEqual(closed_set, set())
+        self.assertEqual(self.astar.stats["engine"], 1)
+        self.assertEqual(self.astar.stats["cache"], 1)
+        self.astar.invalidate()
+        self.astar.find_path((2, 2), (3, 5))
+        self.assertEqual(self.astar.stats["engine"], 2)
+
+    def test_cache_size(self):
+        prefilter = QueryPrefilter(self.grid, AStar(self.grid), cache_size=1)
+        prefilter.find_path((2, 2), (3, 5))
+        prefilter.find_path((3, 2), (2, 5))
+        prefilter.find_path((2, 2), (3, 5))
+        self.assertEqual(prefilter.stats["cache"], 0)
+        self.assertEqual(prefilter.stats["engine"], 3)
+
+    def test_matches_engine_costs(self):
+        rng = np.random.default_rng(3)
+        grid = (rng.random((12, 12)) < 0.25).astype(int)
+        astar = AStar(grid)
+        prefilter = QueryPrefilter(grid, AStar(grid), cache_size=0)
+        free = [tuple(map(int, cell)) for cell in np.argwhere(grid == 0)]
+        for _ in range(200):
+            start, goal = (free[i] for i in rng.choice(len(free), 2))
+            expected, _, _ = astar.find_path(start, goal)
+            path, _, _ = prefilter.find_path(start, goal)
+            if expected is None:
+                self.assertIsNone(path)
+                continue
+            self.assertAlmostEqual(path_cost(path), path_cost(expected))
+            for a, b in zip(path, path[1:]):
+                self.assertEqual(octile_distance(a, b) <= 1.5, True)
+        self.assertGreater(prefilter.stats["line_of_sight"], 0)
+
+    def test_invalid_positions_go_to_engine(self):
+        path, _, _ = self.astar.find_path((2, 3), (0, 0))
+        self.assertEqual(path, AStar(self.grid).find_path((2, 3), (0, 0))[0])
+        self.assertIsNone(self.jps.find_path((2, 3), (0, 0))[0])
+        self.assertEqual(self.astar.stats["engine"], 1)
+        self.assertEqual(self.jps.stats["engine"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import pstats
+import tempfile
+import unittest
+import numpy as np
+from astar import AStar
+from jps import JPS
+from profiling import SamplingProfiler, _run_queries, profile_buckets
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = np.zeros((30, 30), dtype=int)
+        self.grid[5:25, 15] = 1
+        self.engines = {"A*": AStar(self.grid), "JPS": JPS(self.grid)}
+        self.scenarios = [((0, 0), (29, 29), 0), ((15, 0), (15, 29), 0), ((0, 29), (29, 0), 0)]
+        self.buckets = [1, 1, 2]
+
+    def read_collapsed(self, filename):
+        with open(filename, encoding="utf-8") as f:
+            lines = [line.rsplit(" ", 1) for line in f.read().splitlines()]
+        return [(stack.split(";"), int(weight)) for stack, weight in lines]
+
+    def test_cprofile_mode(self):
+        with tempfile.TemporaryDirectory() as directory:
+            rows = profile_buckets(self.engines, self.scenarios, self.buckets, selected=[1, 3],
+                                   output_dir=directory)
+            self.assertEqual([(name, bucket, count) for name, bucket, count, _ in rows],
+                             [("A*", 1, 2), ("JPS", 1, 2)])
+            self.assertEqual(sorted(os.listdir(directory)),
+                             ["astar_bucket1.collapsed", "astar_bucket1.pstats",
+                              "jps_bucket1.collapsed", "jps_bucket1.pstats"])
+
+            functions = {func[2] for func in pstats.Stats(os.path.join(directory, "jps_bucket1.pstats")).stats}
+            self.assertIn("jump", functions)
+
+            stacks = self.read_collapsed(os.path.join(directory, "jps_bucket1.collapsed"))
+            self.assertTrue(stacks)
+            for frames, weight in stacks:
+                self.assertEqual(frames[0], "JPS")
+                self.assertTrue(frames[1].startswith("find_path (jps.py:"))
+                self.assertGreater(weight, 0)
+            self.assertTrue(any(frame.startswith("jump (") for frames, _ in stacks for frame in frames))
+
+    def test_sampling_profiler(self):
+        profiler = SamplingProfiler(interval=0.0005)
+        profiler.start()
+        try:
+            _run_queries(self.engines["A*"], [(start, goal) for start, goal, _ in self.scenarios] * 20)
+        finally:
+            profiler.stop()
+        samples = profiler.collapsed()
+        self.assertTrue(samples)
+        for stack in samples:
+            self.assertTrue(stack[0].startswith("find_path (astar.py:"))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            profile_buckets(self.engines, self.scenarios, self.buckets, mode="perf")
+
+if __name__ == '__main__':
+    unittest.main()
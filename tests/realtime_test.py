@@ -0,0 +1,88 @@
+import unittest
+import numpy as np
+from astar import AStar
+from path_result import path_cost
+from realtime import FAILED, FOUND, RUNNING, IncrementalSearch, SearchScheduler
+
+class TestIncrementalSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = np.zeros((20, 20), dtype=int)
+        self.grid[2:18, 10] = 1
+        self.astar = AStar(self.grid)
+
+    def test_step_budget(self):
+        search = IncrementalSearch(self.astar, (10, 0), (10, 19))
+        self.assertEqual(search.step(max_expansions=5), RUNNING)
+        self.assertEqual(search.expansions, 5)
+        self.assertEqual(len(search.closed_set), 5)
+        while search.step(max_expansions=5) == RUNNING:
+            pass
+        self.assertEqual(search.status, FOUND)
+        expected, _, _ = self.astar.find_path((10, 0), (10, 19))
+        self.assertAlmostEqual(path_cost(search.path), path_cost(expected))
+        self.assertEqual(search.result()[0], search.path)
+        # Päättynyt haku ei enää etene
+        self.assertEqual(search.step(max_expansions=5), FOUND)
+
+    def test_time_budget(self):
+        search = IncrementalSearch(self.astar, (10, 0), (10, 19))
+        search.step(max_time_us=0)
+        self.assertEqual(search.expansions, 1)
+        search.step()
+        self.assertEqual(search.status, FOUND)
+
+    def test_progress_and_partial_path(self):
+        search = IncrementalSearch(self.astar, (10, 0), (10, 19))
+        self.assertEqual(search.progress()["fraction"], 0.0)
+        search.step(max_expansions=30)
+        progress = search.progress()
+        self.assertEqual(progress["expansions"], 30)
+        self.assertGreater(progress["fraction"], 0.0)
+        self.assertLess(progress["fraction"], 1.0)
+        partial = search.best_partial_path()
+        self.assertEqual(partial[0], (10, 0))
+        for a, b in zip(partial, partial[1:]):
+            self.assertEqual(max(abs(a[0] - b[0]), abs(a[1] - b[1])), 1)
+        search.step()
+        self.assertEqual(search.progress()["fraction"], 1.0)
+        self.assertEqual(search.best_partial_path(), search.path)
+
+    def test_no_path(self):
+        grid = np.zeros((5, 5), dtype=int)
+        grid[:, 2] = 1
+        search = IncrementalSearch(AStar(grid), (0, 0), (0, 4))
+        search.step()
+        self.assertEqual(search.status, FAILED)
+        self.assertIsNone(search.result()[0])
+
+
+class TestSearchScheduler(unittest.TestCase):
+
+    def test_runs_all_searches(self):
+        grid = np.zeros((20, 20), dtype=int)
+        grid[2:18, 10] = 1
+        astar = AStar(grid)
+        scheduler = SearchScheduler(tick_budget_us=200, min_slice_us=10)
+        queries = [((i, 0), (19 - i, 19)) for i in range(6)]
+        searches = [scheduler.submit(IncrementalSearch(astar, start, goal)) for start, goal in queries]
+        self.assertEqual(scheduler.active, 6)
+        finished = scheduler.run(max_ticks=10000)
+        self.assertEqual(len(finished), 6)
+        self.assertEqual(scheduler.active, 0)
+        for search, (start, goal) in zip(searches, queries):
+            expected, _, _ = astar.find_path(start, goal)
+            self.assertAlmostEqual(path_cost(search.path), path_cost(expected))
+        stats = scheduler.jitter()
+        self.assertEqual(stats["ticks"], len(scheduler.tick_times_us))
+        self.assertGreater(stats["ticks"], 1)
+        self.assertGreaterEqual(stats["max_us"], stats["mean_us"])
+
+    def test_empty_scheduler(self):
+        scheduler = SearchScheduler(pause_gc=True)
+        self.assertEqual(scheduler.tick(), [])
+        self.assertEqual(scheduler.jitter()["ticks"], 1)
+        self.assertEqual(SearchScheduler().jitter()["ticks"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
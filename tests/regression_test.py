@@ -0,0 +1,97 @@
+import contextlib
+import io
+import copy
+import os
+import tempfile
+import unittest
+import numpy as np
+from regression import META_KEY, calibrate, compare, main, measure, print_report
+
+class TestRegression(unittest.TestCase):
+
+    def setUp(self):
+        grid = np.zeros((6, 6), dtype=int)
+        grid[1:5, 3] = 1
+        self.suites = {"small": (grid, [("a", (0, 0), (5, 5)), ("b", (2, 0), (2, 5))])}
+        self.baseline = measure(self.suites, warmup=0, repeats=3)
+
+    def regressions(self, current):
+        return [row[0] for row in compare(current, self.baseline) if row[4]]
+
+    def test_measure(self):
+        self.assertEqual(set(self.baseline), {"small/A*", "small/JPS"})
+        for result in self.baseline.values():
+            self.assertEqual(set(result["queries"]), {"a", "b"})
+            self.assertGreater(result["peak_memory"], 0)
+            self.assertGreater(result["time_median_ns"], 0)
+        # Solumäärät ovat deterministisiä
+        again = measure(self.suites, warmup=0, repeats=1)
+        for key, result in again.items():
+            self.assertEqual(result["queries"], self.baseline[key]["queries"])
+
+    def test_no_regression_against_itself(self):
+        self.assertEqual(self.regressions(self.baseline), [])
+
+    def test_expansion_regression(self):
+        current = copy.deepcopy(self.baseline)
+        current["small/A*"]["queries"]["a"]["expanded"] += 1
+        self.assertEqual(self.regressions(current), ["small/A* a expanded"])
+
+    def test_time_regression_is_noise_aware(self):
+        current = copy.deepcopy(self.baseline)
+        base = self.baseline["small/JPS"]
+        base["time_iqr_ns"] = 0.0
+        current["small/JPS"]["time_median_ns"] = base["time_median_ns"] * 1.5
+        self.assertEqual(self.regressions(current), ["small/JPS aika (ns)"])
+        # Kohinainen perustaso sallii suuremman vaihtelun
+        base["time_iqr_ns"] = base["time_median_ns"] * 0.5
+        self.assertEqual(self.regressions(current), [])
+
+    def test_time_is_scaled_by_calibration(self):
+        current = copy.deepcopy(self.baseline)
+        self.baseline["small/JPS"]["time_iqr_ns"] = 0.0
+        current["small/JPS"]["time_median_ns"] = self.baseline["small/JPS"]["time_median_ns"] * 1.5
+        self.baseline[META_KEY] = {"calibration_ns": 1e6, "machine": "kone"}
+        # Puolitoista kertaa hitaampi kone: aika on normalisoituna ennallaan
+        current[META_KEY] = {"calibration_ns": 1.5e6, "machine": "kone"}
+        self.assertEqual(self.regressions(current), [])
+        current[META_KEY] = {"calibration_ns": 1e6, "machine": "kone"}
+        self.assertEqual(self.regressions(current), ["small/JPS aika (ns)"])
+
+    def test_time_and_memory_are_advisory_on_other_machine(self):
+        current = copy.deepcopy(self.baseline)
+        current["small/A*"]["time_median_ns"] *= 3
+        current["small/A*"]["peak_memory"] = current["small/A*"]["peak_memory"] * 2 + 10000
+        current["small/A*"]["queries"]["b"]["nodes_added"] += 1
+        self.baseline[META_KEY] = {"calibration_ns": 1e6, "machine": "kone"}
+        current[META_KEY] = {"calibration_ns": 1e6, "machine": "toinen kone"}
+        rows = compare(current, self.baseline)
+        self.assertEqual([row[0] for row in rows if row[4]], ["small/A* b nodes_added"])
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            print_report(rows)
+        self.assertIn("hidas (ohjeellinen)", output.getvalue())
+        self.assertIn("suuri (ohjeellinen)", output.getvalue())
+
+    def test_calibrate(self):
+        meta = calibrate(warmup=0, repeats=1)
+        self.assertGreater(meta["calibration_ns"], 0)
+        self.assertEqual(meta["machine"], calibrate(warmup=0, repeats=1)["machine"])
+
+    def test_memory_and_missing_results(self):
+        current = copy.deepcopy(self.baseline)
+        current["small/A*"]["peak_memory"] *= 2
+        current["small/A*"]["peak_memory"] += 10000
+        del current["small/JPS"]
+        self.assertEqual(self.regressions(current), ["small/A* muisti (B)", "small/JPS puuttuu"])
+
+    def test_main_missing_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            with open(os.devnull, "w") as devnull:
+                with contextlib.redirect_stdout(devnull):
+                    self.assertEqual(main(["--baseline", path]), 2)
+            self.assertFalse(os.path.exists(path))
+
+if __name__ == '__main__':
+    unittest.main()
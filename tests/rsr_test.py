@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+from astar import AStar, octile_distance
+from rsr import RSR, decompose_rectangles, perimeter_cells
+
+class TestRSR(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = np.array([
+            [0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0],
+            [0, 0, 1, 1, 0, 0],
+            [0, 0, 1, 1, 0, 0],
+            [0, 0, 0, 0, 0, 0]
+        ])
+        self.rsr = RSR(self.grid)
+
+    def path_length(self, path):
+        return sum(octile_distance(path[i], path[i + 1]) for i in range(len(path) - 1))
+
+    def test_decompose_rectangles(self):
+        rect_ids, rectangles = decompose_rectangles(self.grid)
+        # Jokainen vapaa solu kuuluu täsmälleen yhteen esteettömään suorakulmioon
+        self.assertTrue(((rect_ids >= 0) == (self.grid == 0)).all())
+        for rect_id, (x0, y0, x1, y1) in enumerate(rectangles):
+            self.assertTrue((rect_ids[x0:x1 + 1, y0:y1 + 1] == rect_id).all())
+        self.assertEqual(rectangles[0], (0, 0, 1, 5))
+
+    def test_perimeter_cells(self):
+        cells = perimeter_cells((0, 0, 3, 2))
+        self.assertEqual(len(cells), len(set(cells)))
+        self.assertEqual(len(cells), 10)
+        self.assertNotIn((1, 1), cells)
+
+    def test_find_path_matches_astar(self):
+        astar = AStar(self.grid)
+        free = [tuple(map(int, cell)) for cell in np.argwhere(self.grid == 0)]
+        for start in free:
+            for goal in free:
+                path, _, _ = self.rsr.find_path(start, goal)
+                expected, _, _ = astar.find_path(start, goal)
+                self.assertEqual(path[0], start)
+                self.assertEqual(path[-1], goal)
+                self.assertAlmostEqual(self.path_length(path), self.path_length(expected))
+
+    def test_waypoints_are_straight_lines(self):
+        grid = np.zeros((12, 9), dtype=int)
+        grid[5, 1:] = 1
+        path, _, _ = RSR(grid).find_path((1, 7), (10, 6))
+        for a, b in zip(path, path[1:]):
+            dx, dy = abs(b[0] - a[0]), abs(b[1] - a[1])
+            self.assertTrue(dx == 0 or dy == 0 or dx == dy)
+
+    def test_no_path_and_invalid(self):
+        blocked = np.array([
+            [0, 1, 0],
+            [0, 1, 0],
+            [0, 1, 0]
+        ])
+        path, closed_set, _ = RSR(blocked).find_path((0, 0), (0, 2))
+        self.assertIsNone(path)
+        self.assertIsNone(self.rsr.find_path((2, 2), (0, 0))[0])
+        self.assertEqual(self.rsr.find_path((0, 0), (0, 0))[0], [(0, 0)])
+
+if __name__ == '__main__':
+    unittest.main()
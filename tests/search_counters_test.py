@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+from astar import AStar
+from jps import JPS
+from search_counters import SearchCounters, sum_counters
+
+class TestSearchCounters(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = np.zeros((12, 12), dtype=int)
+        self.grid[2:10, 6] = 1
+        self.grid[5, 1:6] = 1
+        self.queries = [((0, 0), (11, 11)), ((6, 2), (6, 10)), ((0, 11), (11, 0)), ((3, 3), (3, 3))]
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(AStar(self.grid).counters)
+        self.assertIsNone(JPS(self.grid).counters)
+
+    def test_astar_counters(self):
+        astar = AStar(self.grid, instrument=True)
+        for start, goal in self.queries:
+            path, closed_set, nodes_added = astar.find_path(start, goal)
+            c = astar.counters
+            self.assertEqual(c.heap_pushes, nodes_added)
+            self.assertEqual(c.expansions, len(closed_set))
+            self.assertEqual(c.heap_pops, c.expansions + c.stale_pops + (path is not None))
+            self.assertGreaterEqual(c.stale_pops, 0)
+            self.assertLessEqual(c.neighbor_checks, 8 * (c.expansions + c.stale_pops))
+            self.assertEqual(c.jump_calls, 0)
+
+    def test_jps_counters(self):
+        jps = JPS(self.grid, instrument=True)
+        for start, goal in self.queries[:3]:
+            path, closed_set, jump_points = jps.find_path(start, goal)
+            c = jps.counters
+            self.assertEqual(c.successors, jump_points)
+            self.assertEqual(c.expansions, len(closed_set) - 1)
+            self.assertEqual(c.heap_pops, c.expansions + c.stale_pops + 1)
+            self.assertGreaterEqual(c.heap_pushes, c.heap_pops)
+            self.assertGreaterEqual(c.jump_calls, c.neighbor_checks)
+            self.assertGreater(c.cells_scanned, 0)
+            self.assertGreater(c.forced_checks, 0)
+        # Laskurit kuvaavat vain viimeisintä hakua
+        jps.find_path((3, 3), (3, 3))
+        self.assertEqual(jps.counters.as_dict(), SearchCounters().as_dict())
+
+    def test_results_unchanged(self):
+        for engine in (AStar, JPS):
+            plain, counted = engine(self.grid), engine(self.grid, instrument=True)
+            for start, goal in self.queries:
+                self.assertEqual(plain.find_path(start, goal), counted.find_path(start, goal))
+
+    def test_sum_and_add(self):
+        a = SearchCounters()
+        a.jump_calls, a.cells_scanned = 2, 10
+        b = SearchCounters()
+        b.jump_calls, b.cells_scanned, b.expansions = 3, 5, 1
+        total = sum_counters([a.as_dict(), b.as_dict()])
+        self.assertEqual(total["jump_calls"], 5)
+        self.assertEqual(total["cells_per_jump"], 3.0)
+        a += b
+        self.assertEqual(a.as_dict(), total)
+        self.assertIsNone(SearchCounters().as_dict()["cells_per_jump"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+from astar import AStar
+from jps import JPS
+from smoothing import batch_line_of_sight, string_pull
+from theta_star import line_of_sight, smooth_path
+
+class TestSmoothing(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = np.zeros((12, 12), dtype=int)
+        self.grid[2:9, 5] = 1
+        self.grid[6, 7:11] = 1
+
+    def test_batch_line_of_sight_matches_walk(self):
+        rng = np.random.default_rng(0)
+        grid = rng.random((20, 20)) < 0.3
+        starts = rng.integers(0, 20, (500, 2))
+        ends = rng.integers(0, 20, (500, 2))
+        visible = batch_line_of_sight(starts, ends, grid)
+        blocked = grid.tolist()
+        expected = [line_of_sight(tuple(a), tuple(b), blocked) for a, b in zip(starts, ends)]
+        self.assertEqual(visible.tolist(), expected)
+
+    def test_batch_line_of_sight_special_cases(self):
+        blocked = np.array([[False, True], [True, False]])
+        # Kulman kautta kulkeva jana ja nollan pituinen jana
+        visible = batch_line_of_sight([(0, 0), (1, 1), (0, 0)], [(1, 1), (1, 1), (0, 1)], blocked)
+        self.assertEqual(visible.tolist(), [True, True, False])
+        self.assertEqual(batch_line_of_sight(np.empty((0, 2)), np.empty((0, 2)), blocked).tolist(), [])
+
+    def test_string_pull_matches_greedy(self):
+        blocked = (self.grid != 0).tolist()
+        astar = AStar(self.grid)
+        jps = JPS(self.grid)
+        queries = [((4, 0), (4, 11)), ((0, 0), (11, 11)), ((11, 0), (5, 9)), ((7, 8), (0, 11))]
+        for engine in (astar, jps):
+            paths = [engine.find_path(start, goal)[0] for start, goal in queries]
+            for window in (1, 2, 4, 32):
+                pulled = string_pull(paths, self.grid, window=window)
+                self.assertEqual(pulled, [smooth_path(path, blocked) for path in paths])
+
+    def test_string_pull_keeps_short_and_missing_paths(self):
+        paths = [None, [(0, 0)], [(0, 0), (1, 1)], [(0, 0), (0, 1), (0, 2)]]
+        self.assertEqual(string_pull(paths, self.grid), [None, [(0, 0)], [(0, 0), (1, 1)], [(0, 0), (0, 2)]])
+        self.assertEqual(string_pull([], self.grid), [])
+
+if __name__ == '__main__':
+    unittest.main()
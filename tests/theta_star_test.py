@@ -0,0 +1,67 @@
+import math
+import unittest
+import numpy as np
+from astar import AStar
+from path_result import path_cost
+from theta_star import LazyThetaStar, line_of_sight, path_length, smooth_path
+
+class TestLazyThetaStar(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = np.zeros((10, 10), dtype=int)
+        self.grid[2:8, 5] = 1
+        self.blocked = (self.grid != 0).tolist()
+        self.theta = LazyThetaStar(self.grid)
+
+    def test_line_of_sight(self):
+        self.assertTrue(line_of_sight((0, 0), (9, 4), self.blocked))
+        self.assertFalse(line_of_sight((0, 0), (9, 9), self.blocked))
+        self.assertTrue(line_of_sight((4, 0), (4, 4), self.blocked))
+        self.assertFalse(line_of_sight((4, 0), (4, 9), self.blocked))
+        self.assertFalse(line_of_sight((2, 0), (7, 9), self.blocked))
+        self.assertTrue(line_of_sight((3, 3), (3, 3), self.blocked))
+
+    def test_line_of_sight_corners(self):
+        blocked = [[False, True], [True, False]]
+        # Täsmälleen kulman kautta kulkeva jana sallitaan kuten diagonaalinen siirto
+        self.assertTrue(line_of_sight((0, 0), (1, 1), blocked))
+        blocked = [[False, False, True], [False, True, False]]
+        self.assertFalse(line_of_sight((0, 0), (1, 2), blocked))
+
+    def test_any_angle_path(self):
+        path, closed_set, nodes_added = self.theta.find_path((4, 0), (4, 9))
+        self.assertEqual(path[0], (4, 0))
+        self.assertEqual(path[-1], (4, 9))
+        for a, b in zip(path, path[1:]):
+            self.assertTrue(line_of_sight(a, b, self.blocked))
+        astar_path, _, _ = AStar(self.grid).find_path((4, 0), (4, 9))
+        self.assertLess(len(path), len(astar_path))
+        self.assertLessEqual(path_length(path), path_cost(astar_path))
+        self.assertTrue(closed_set)
+        self.assertGreater(nodes_added, 0)
+
+    def test_straight_line(self):
+        path, _, _ = self.theta.find_path((0, 0), (9, 3))
+        self.assertEqual(path, [(0, 0), (9, 3)])
+        self.assertAlmostEqual(path_length(path), math.hypot(9, 3))
+
+    def test_no_path_and_trivial(self):
+        grid = np.zeros((5, 5), dtype=int)
+        grid[:, 2] = 1
+        theta = LazyThetaStar(grid)
+        self.assertIsNone(theta.find_path((0, 0), (0, 4))[0])
+        self.assertIsNone(theta.find_path((0, 2), (0, 4))[0])
+        self.assertEqual(theta.find_path((1, 1), (1, 1))[0], [(1, 1)])
+
+    def test_smooth_path(self):
+        astar_path, _, _ = AStar(self.grid).find_path((4, 0), (4, 9))
+        smoothed = smooth_path(astar_path, self.blocked)
+        self.assertEqual(smoothed[0], (4, 0))
+        self.assertEqual(smoothed[-1], (4, 9))
+        self.assertLess(len(smoothed), len(astar_path))
+        for a, b in zip(smoothed, smoothed[1:]):
+            self.assertTrue(line_of_sight(a, b, self.blocked))
+        self.assertEqual(smooth_path([(0, 0), (1, 1)], self.blocked), [(0, 0), (1, 1)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,255 @@
+"""
+Lazy Theta* -algoritmi kulmavapaaseen reitinhakuun.
+
+A* ja JPS tuottavat 8-suuntaisia reittejä, jotka liikkumiskoodi joutuu
+silti suoristamaan. Theta* sallii solmun edeltäjäksi minkä tahansa solun,
+josta on näköyhteys, joten reitti koostuu suoraan käännöspisteistä. Lazy
+Theta* olettaa näköyhteyden solmua avoimeen joukkoon lisättäessä ja
+tarkistaa sen vasta, kun solmu laajennetaan. Tarkistuksia tehdään näin
+huomattavasti vähemmän.
+
+Näköyhteys tarkistetaan kokonaislukuaritmetiikalla kulkemalla kaikki solut,
+joiden läpi solukeskipisteiden välinen jana kulkee. Jos jana kulkee
+täsmälleen solujen kulman kautta, siirrytään suoraan diagonaalisesti
+kuten kulmia leikkaavassa 8-suuntaisessa liikkumismallissa.
+"""
+
+import heapq
+import math
+import time
+
+import numpy as np
+
+import map_loader as ml
+from astar import AStar, get_neighbors
+
+
+def euclidean_distance(a, b):
+    """
+    Laskee euklidisen etäisyyden kahden pisteen välillä.
+
+    Args:
+        a (tuple): Ensimmäinen piste (x, y)
+        b (tuple): Toinen piste (x, y)
+
+    Returns:
+        float: Euklidinen etäisyys
+    """
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+def line_of_sight(a, b, blocked):
+    """
+    Tarkistaa onko solukeskipisteiden a ja b välinen jana esteetön.
+
+    Args:
+        a (tuple): Alkusolu (x, y)
+        b (tuple): Loppusolu (x, y)
+        blocked (list): Estetaulukko listana riveistä (tosi = este)
+
+    Returns:
+        bool: True jos janan kaikki solut ovat vapaita
+    """
+    x, y = a
+    dx, dy = abs(b[0] - x), abs(b[1] - y)
+    sx = 1 if b[0] > x else -1
+    sy = 1 if b[1] > y else -1
+    ix = iy = 0
+    while ix < dx or iy < dy:
+        # Verrataan, kumman akselin solurajan jana ylittää ensin: (ix + ½) / dx vs. (iy + ½) / dy
+        decision = (2 * ix + 1) * dy - (2 * iy + 1) * dx
+        if decision == 0:
+            x += sx
+            y += sy
+            ix += 1
+            iy += 1
+        elif decision < 0:
+            x += sx
+            ix += 1
+        else:
+            y += sy
+            iy += 1
+        if blocked[x][y]:
+            return False
+    return True
+
+
+def smooth_path(path, blocked):
+    """
+    Suoristaa reitin ahneesti: jokaisesta käännöspisteestä hypätään kauimmaiseen näkyvään reitin pisteeseen.
+
+    Args:
+        path (list or None): Reitin solut (x, y)
+        blocked (list): Estetaulukko listana riveistä (tosi = este)
+
+    Returns:
+        list or None: Käännöspisteet
+    """
+    if not path or len(path) < 3:
+        return path
+    smoothed = [path[0]]
+    anchor = path[0]
+    for i in range(1, len(path) - 1):
+        if not line_of_sight(anchor, path[i + 1], blocked):
+            anchor = path[i]
+            smoothed.append(anchor)
+    smoothed.append(path[-1])
+    return smoothed
+
+
+def path_length(path):
+    """Laskee käännöspisteiden välisten janojen pituuksien summan."""
+    return sum(euclidean_distance(a, b) for a, b in zip(path, path[1:]))
+
+
+class LazyThetaStar:
+    """
+    Lazy Theta* -algoritmin toteutus.
+
+    Palauttaa saman muotoisen tuloksen kuin AStar ja JPS, mutta reitti
+    koostuu pelkistä käännöspisteistä, joiden väliset janat ovat esteettömiä.
+
+    Attributes:
+        grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+        heuristic (function): Heuristiikkafunktio, oletuksena euklidinen etäisyys
+        blocked (list): Estetaulukko listana riveistä näköyhteystarkistuksia varten
+        los_checks (int): Viimeisimmän haun näköyhteystarkistusten määrä
+    """
+
+    def __init__(self, grid, heuristic=euclidean_distance):
+        """
+        Args:
+            grid (numpy.ndarray): 2D ruudukko jossa 0 = vapaa, 1 = este
+            heuristic (function, optional): Heuristiikkafunktio. Oletuksena euclidean_distance.
+        """
+        self.grid = grid
+        self.heuristic = heuristic
+        self.blocked = (np.asarray(grid) != 0).tolist()
+        self.los_checks = 0
+
+    def find_path(self, start, goal):
+        """
+        Etsii kulmavapaan reitin aloitussolmusta maalisolmuun.
+
+        Args:
+            start (tuple): Aloitussolmu (x, y)
+            goal (tuple): Maalisolmu (x, y)
+
+        Returns:
+            tuple: Sisältää kolme elementtiä:
+                - path (list or None): Käännöspisteet, tai None jos reittiä ei löydy
+                - closed_set (set): Joukko tutkituista solmuista
+                - nodes_added (int): Avoimeen joukkoon lisättyjen solmujen määrä
+        """
+        blocked = self.blocked
+        rows, cols = len(blocked), len(blocked[0])
+        for x, y in (start, goal):
+            if not (0 <= x < rows and 0 <= y < cols) or blocked[x][y]:
+                return None, set(), 0
+        if start == goal:
+            return [start], set(), 0
+
+        heuristic = self.heuristic
+        g_scores = {start: 0.0}
+        parents = {start: start}
+        closed_set = set()
+        open_set = [(heuristic(start, goal), start)]
+        nodes_added = 1
+        los_checks = 0
+
+        while open_set:
+            current = heapq.heappop(open_set)[1]
+            if current in closed_set:
+                continue
+
+            # Viivästetty näköyhteystarkistus: jos oletettu edeltäjä ei näy,
+            # valitaan paras jo suljettu naapuri
+            parent = parents[current]
+            if parent != current:
+                los_checks += 1
+                if not line_of_sight(parent, current, blocked):
+                    best = None
+                    for neighbor in get_neighbors(current, self.grid):
+                        if neighbor in closed_set:
+                            g = g_scores[neighbor] + euclidean_distance(neighbor, current)
+                            if best is None or g < best[0]:
+                                best = (g, neighbor)
+                    g_scores[current], parents[current] = best
+
+            if current == goal:
+                path = [current]
+                while parents[current] != current:
+                    current = parents[current]
+                    path.append(current)
+                self.los_checks = los_checks
+                return path[::-1], closed_set, nodes_added
+
+            closed_set.add(current)
+            parent = parents[current]
+            parent_g = g_scores[parent]
+
+            for neighbor in get_neighbors(current, self.grid):
+                if neighbor in closed_set:
+                    continue
+                # Oletetaan näköyhteys nykyisen solmun edeltäjästä
+                tentative_g = parent_g + euclidean_distance(parent, neighbor)
+                if tentative_g < g_scores.get(neighbor, math.inf):
+                    g_scores[neighbor] = tentative_g
+                    parents[neighbor] = parent
+                    heapq.heappush(open_set, (tentative_g + heuristic(neighbor, goal), neighbor))
+                    nodes_added += 1
+
+        self.los_checks = los_checks
+        return None, closed_set, nodes_added
+
+
+def run_theta_star_benchmark(np_map, scenarios):
+    """
+    Vertailee Lazy Theta*:a A*-hakuun, jonka reitti suoristetaan jälkikäteen.
+
+    Args:
+        np_map (numpy.ndarray): Karttadata numpy-taulukkona
+        scenarios (list): Lista skenaarioita (alku, loppu, optimaalinen_pituus)
+
+    Returns:
+        dict: {"A* + suoristus": (aika, käännöspisteet, pituus), "Lazy Theta*": (...)}
+    """
+    astar = AStar(np_map)
+    theta = LazyThetaStar(np_map)
+    blocked = theta.blocked
+
+    astar_waypoints = astar_smoothed = astar_length = 0.0
+    start_time = time.perf_counter()
+    for start, goal, _ in scenarios:
+        path, _, _ = astar.find_path(start, goal)
+        if path:
+            astar_waypoints += len(path)
+            smoothed = smooth_path(path, blocked)
+            astar_smoothed += len(smoothed)
+            astar_length += path_length(smoothed)
+    astar_time = time.perf_counter() - start_time
+
+    theta_waypoints = theta_length = 0.0
+    start_time = time.perf_counter()
+    for start, goal, _ in scenarios:
+        path, _, _ = theta.find_path(start, goal)
+        if path:
+            theta_waypoints += len(path)
+            theta_length += path_length(path)
+    theta_time = time.perf_counter() - start_time
+
+    count = len(scenarios)
+    print(f"{'Algoritmi':<18}{'Aika (s)':<10}{'Pisteet/reitti':<16}{'Pituus yht.':<12}")
+    print(f"{'A* (ruudukko)':<18}{'':<10}{astar_waypoints / count:<16.1f}")
+    print(f"{'A* + suoristus':<18}{astar_time:<10.3f}{astar_smoothed / count:<16.1f}{astar_length:<12.1f}")
+    print(f"{'Lazy Theta*':<18}{theta_time:<10.3f}{theta_waypoints / count:<16.1f}{theta_length:<12.1f}")
+    return {
+        "A* + suoristus": (astar_time, astar_smoothed, astar_length),
+        "Lazy Theta*": (theta_time, theta_waypoints, theta_length),
+    }
+
+
+if __name__ == "__main__":
+    np_map = ml.map_to_numpy(ml.load_map('maps/rmtst03.map.txt'))
+    scenarios = ml.load_scenarios('maps/rmtst03.map.scen.txt')
+    run_theta_star_benchmark(np_map, scenarios)